@@ -48,6 +48,23 @@ def formatar_numero_brasileiro(numero, decimais=1):
     
     return texto
 
+# Troca ponto e vírgula numa única passada
+_TROCA_SEPARADORES = str.maketrans(',.', '.,')
+
+def formatar_numeros_brasileiro(valores, decimais=1):
+    """
+    Formata vários números de uma vez no padrão brasileiro
+
+    Args:
+        valores: iterável de números
+        decimais: quantidade de casas decimais
+
+    Returns:
+        lista de strings formatadas (mesmo resultado de formatar_numero_brasileiro)
+    """
+    formato = f",.{decimais}f"
+    return [format(valor, formato).translate(_TROCA_SEPARADORES) for valor in valores]
+
 def formatar_energia_brasileiro(energia_kWh, decimais=1):
     """Formata energia em kWh no padrão brasileiro"""
     return f"{formatar_numero_brasileiro(energia_kWh, decimais)} kWh"
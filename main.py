@@ -9,7 +9,8 @@ from src import calculations as calc
 from src import visualization as viz
 # from src import formatacao_brasileira
 from formatacao_brasileira import *
-from copy import deepcopy
+from src.cenarios import sobrepor_equipamentos
+import os
 
 def main():
     print("="*60)
@@ -122,15 +123,12 @@ def main():
     print("\n3. ATUALIZANDO POTÊNCIAS CALCULADAS")
     print("-" * 40)
     
-    # Fazer cópia dos equipamentos para não modificar o original
-    equipamentos_atualizados = deepcopy(C.equipamentos_processo)
-    
-    # Atualizar chiller
-    equipamentos_atualizados['FT-101']['P_nom'] = potencia_media_chiller
+    # Sobrepor as potências calculadas aos equipamentos base (sem copiar o original)
+    equipamentos_atualizados = sobrepor_equipamentos(C.equipamentos_processo, {
+        'FT-101': {'P_nom': potencia_media_chiller},
+        'TDR-101': {'P_nom': potencia_media_secador}
+    })
     print(f"FT-101 (Chiller): {formatar_potencia_brasileiro(potencia_media_chiller)}")
-    
-    # Atualizar secador
-    equipamentos_atualizados['TDR-101']['P_nom'] = potencia_media_secador
     print(f"TDR-101 (Secador): {formatar_potencia_brasileiro(potencia_media_secador)}")
     
     # ================================================================
@@ -147,7 +145,8 @@ def main():
     for codigo, energia in energias_equipamentos.items():
         if codigo != 'TOTAL':
             dados = equipamentos_atualizados[codigo]
-            print(f"{codigo:12} | {formatar_potencia_brasileiro(dados['P_nom'], 2):>10} × {dados['tempo']:3.0f} h = {formatar_energia_brasileiro(energia, 2):>12}")
+            potencia_media = energia / dados['tempo']   # = P_nom sem perfil de carga
+            print(f"{codigo:12} | {formatar_potencia_brasileiro(potencia_media, 2):>10} × {dados['tempo']:3.0f} h = {formatar_energia_brasileiro(energia, 2):>12}")
             total_processo += energia
     
     print("-" * 65)
@@ -285,7 +284,10 @@ def main():
     }
 
 if __name__ == "__main__":
+    from src.relatorios import gerar_relatorios_lote
+
     resultados = main()
+    gerar_relatorios_lote(resultados, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results', 'reports'))
     print(f"\n🎯 EXECUÇÃO FINALIZADA COM SUCESSO!")
     print(f"📈 Energia Total: {formatar_energia_brasileiro(resultados['energia_total'], 1)}/lote")
     print(f"⚡ Consumo Específico: {formatar_numero_brasileiro(resultados['consumo_especifico'], 1)} kWh/kg")
@@ -1,8 +1,54 @@
 """
 calculations.py - Funções para Balanço Energético dos Soforolipídeos
 Todas as fórmulas baseadas em primeiros princípios termodinâmicos
+Unidades declaradas com @unidades (src.unidades) e conferidas na importação
 """
 
+import sys
+
+from src.constants import kWh_para_kJ
+from src.perfis import como_perfil, fator_medio
+from src.resultados import ResultadoChiller, ResultadoSecador
+from src.unidades import unidades, unidades_por_sufixo, verificar_modulo
+
+
+@unidades(retorno='1', COP='1', calor_removido_kJ='kJ', tempo_h='h')
+def resolver_cop(COP, calor_removido_kJ, tempo_h):
+    """
+    Resolve o COP efetivo: número fixo ou mapa de desempenho (src.desempenho.MapaCOPChiller)
+
+    Args:
+        COP: COP constante ou objeto com método cop_na_carga(carga_kW)
+        calor_removido_kJ: calor total a ser removido (kJ)
+        tempo_h: tempo de operação (h)
+
+    Returns:
+        COP efetivo na carga média do período
+    """
+    if hasattr(COP, 'cop_na_carga'):
+        return COP.cop_na_carga(calor_removido_kJ / kWh_para_kJ / tempo_h)
+    return COP
+
+
+@unidades(retorno='1', eficiencia='1', calor_fornecido_kJ='kJ', tempo_h='h')
+def resolver_eficiencia(eficiencia, calor_fornecido_kJ, tempo_h):
+    """
+    Resolve a eficiência efetiva: número fixo ou mapa (src.desempenho.MapaEficienciaSecador)
+
+    Args:
+        eficiencia: eficiência constante ou objeto com método eficiencia_na_carga(carga_kW)
+        calor_fornecido_kJ: calor total a ser fornecido (kJ)
+        tempo_h: tempo de operação (h)
+
+    Returns:
+        Eficiência efetiva na carga média do período
+    """
+    if hasattr(eficiencia, 'eficiencia_na_carga'):
+        return eficiencia.eficiencia_na_carga(calor_fornecido_kJ / kWh_para_kJ / tempo_h)
+    return eficiencia
+
+
+@unidades(retorno='kJ', massa_kg='kg', cp_kJ_kg_K='kJ/(kg·K)', delta_T_K='K')
 def calcular_calor_sensivel(massa_kg, cp_kJ_kg_K, delta_T_K):
     """
     Calcula calor sensível: Q = m × Cp × ΔT
@@ -18,6 +64,7 @@ def calcular_calor_sensivel(massa_kg, cp_kJ_kg_K, delta_T_K):
     return massa_kg * cp_kJ_kg_K * delta_T_K
 
 
+@unidades(retorno='kJ', massa_kg='kg', L_kJ_kg='kJ/kg')
 def calcular_calor_latente(massa_kg, L_kJ_kg):
     """
     Calcula calor latente: Q = m × L
@@ -32,33 +79,52 @@ def calcular_calor_latente(massa_kg, L_kJ_kg):
     return massa_kg * L_kJ_kg
 
 
-def calcular_energia_eletrica_equipamento(potencia_kW, tempo_h):
+@unidades(retorno='kWh', potencia_kW='kW', tempo_h='h', perfil=None)
+def calcular_energia_eletrica_equipamento(potencia_kW, tempo_h, perfil=None):
     """
     Calcula energia elétrica: E = P × t
     
     Args:
         potencia_kW: potência do equipamento (kW)
         tempo_h: tempo de operação (h)
+        perfil: perfil de carga opcional (src.perfis: trechos ou segmentos, fração de P_nom) - dá só a
+                forma; é reescalado para durar tempo_h, então E = P × carga média × tempo_h
     
     Returns:
         Energia elétrica em kWh
     """
+    if perfil is not None:
+        return potencia_kW * fator_medio(como_perfil(perfil)) * tempo_h
     return potencia_kW * tempo_h
 
 
+@unidades(retorno='kWh', dados={'P_nom': 'kW', 'tempo': 'h'})
+def calcular_energia_equipamento(dados):
+    """
+    Energia elétrica de uma entrada de equipamentos_processo ({'P_nom', 'tempo'[, 'perfil']})
+    
+    Returns:
+        Energia elétrica em kWh
+    """
+    return calcular_energia_eletrica_equipamento(dados['P_nom'], dados['tempo'], dados.get('perfil'))
+
+
+@unidades(retorno=unidades_por_sufixo(['potencia_media_kW', 'energia_total_kWh', 'calor_removido_kWh']),
+          calor_removido_kJ='kJ', COP='1', tempo_h='h')
 def calcular_potencia_chiller(calor_removido_kJ, COP, tempo_h):
     """
     Calcula potência elétrica do chiller: P = Q_removido / (COP × tempo)
     
     Args:
         calor_removido_kJ: calor total a ser removido (kJ)
-        COP: coeficiente de performance do chiller
+        COP: coeficiente de performance do chiller (número ou MapaCOPChiller)
         tempo_h: tempo de operação (h)
     
     Returns:
         dict com potência média (kW) e energia total (kWh)
     """
-    calor_removido_kWh = calor_removido_kJ / 3600  # conversão kJ → kWh
+    COP = resolver_cop(COP, calor_removido_kJ, tempo_h)
+    calor_removido_kWh = calor_removido_kJ / kWh_para_kJ
     energia_eletrica_kWh = calor_removido_kWh / COP
     potencia_media_kW = energia_eletrica_kWh / tempo_h
     
@@ -69,19 +135,22 @@ def calcular_potencia_chiller(calor_removido_kJ, COP, tempo_h):
     }
 
 
+@unidades(retorno=unidades_por_sufixo(['potencia_media_kW', 'energia_total_kWh', 'calor_util_kWh']),
+          calor_fornecido_kJ='kJ', eficiencia='1', tempo_h='h')
 def calcular_potencia_secador(calor_fornecido_kJ, eficiencia, tempo_h):
     """
     Calcula potência elétrica do secador: P = Q_fornecido / (eficiência × tempo)
     
     Args:
         calor_fornecido_kJ: calor total a ser fornecido (kJ)
-        eficiencia: eficiência do secador (0-1)
+        eficiencia: eficiência do secador (0-1 ou MapaEficienciaSecador)
         tempo_h: tempo de operação (h)
     
     Returns:
         dict com potência média (kW) e energia total (kWh)
     """
-    calor_fornecido_kWh = calor_fornecido_kJ / 3600  # conversão kJ → kWh
+    eficiencia = resolver_eficiencia(eficiencia, calor_fornecido_kJ, tempo_h)
+    calor_fornecido_kWh = calor_fornecido_kJ / kWh_para_kJ
     energia_eletrica_kWh = calor_fornecido_kWh / eficiencia
     potencia_media_kW = energia_eletrica_kWh / tempo_h
     
@@ -92,6 +161,7 @@ def calcular_potencia_secador(calor_fornecido_kJ, eficiencia, tempo_h):
     }
 
 
+@unidades(retorno='kJ', energia_eletrica_kWh='kWh', fator_dissipacao='1')
 def calcular_dissipacao_mecanica(energia_eletrica_kWh, fator_dissipacao):
     """
     Calcula calor gerado por dissipação mecânica
@@ -103,9 +173,10 @@ def calcular_dissipacao_mecanica(energia_eletrica_kWh, fator_dissipacao):
     Returns:
         Calor dissipado em kJ
     """
-    return energia_eletrica_kWh * fator_dissipacao * 3600  # kWh → kJ
+    return energia_eletrica_kWh * fator_dissipacao * kWh_para_kJ
 
 
+@unidades(retorno='kJ', potencia_perdas_kW='kW', tempo_h='h')
 def calcular_perdas_termicas(potencia_perdas_kW, tempo_h):
     """
     Calcula perdas térmicas para o ambiente
@@ -117,18 +188,26 @@ def calcular_perdas_termicas(potencia_perdas_kW, tempo_h):
     Returns:
         Perdas térmicas em kJ
     """
-    return potencia_perdas_kW * tempo_h * 3600  # kW×h → kJ
+    return potencia_perdas_kW * tempo_h * kWh_para_kJ
 
 
+@unidades(retorno='kWh', Q_removido_kJ='kJ', COP='1')
 def calcular_energia_chiller(Q_removido_kJ, COP):
     """
     Calcula energia elétrica do chiller: E = Q_removido / COP
     Conversão automática kJ → kWh
     """
-    energia_kWh = Q_removido_kJ / (COP * 3600)
+    energia_kWh = Q_removido_kJ / (COP * kWh_para_kJ)
     return energia_kWh
 
 
+@unidades(retorno=unidades_por_sufixo(ResultadoChiller.CAMPOS),
+          m_sf_inicial='kg', m_biomassa_inicial='kg', m_HCl_inicial='kg', m_biomassa_residual='kg',
+          m_HCl_residual='kg', m_sf_cristalizar='kg', m_etanol_lavagem='kg',
+          Cp_soforolipideos='kJ/(kg·K)', Cp_biomassa='kJ/(kg·K)', Cp_HCl_solucao='kJ/(kg·K)',
+          Cp_etanol_70='kJ/(kg·K)', T_inicial='K', T_final='K', T_ambiente='K', L_cristalizacao_SL='kJ/kg',
+          perdas_ambiente_kW='kW', t_resfriamento_28_4='h', t_manutencao_cristalizacao='h',
+          t_manutencao_lavagem='h', COP='1')
 def balanco_chiller_completo(m_sf_inicial, m_biomassa_inicial, m_HCl_inicial,
                             m_biomassa_residual, m_HCl_residual, m_sf_cristalizar, m_etanol_lavagem,
                             Cp_soforolipideos, Cp_biomassa, Cp_HCl_solucao, Cp_etanol_70,
@@ -141,6 +220,8 @@ def balanco_chiller_completo(m_sf_inicial, m_biomassa_inicial, m_HCl_inicial,
     PARTE 1 (5h): Resfriamento 28°C → 4°C + cristalização SF
     PARTE 2 (6h): Manutenção componentes residuais a 4°C  
     PARTE 3 (2h): Resfriamento etanol + manutenção total a 4°C
+    
+    COP pode ser um número ou um MapaCOPChiller (avaliado na carga média das 3 partes)
     """
     
     # PARTE 1: Resfriamento inicial + cristalização (5h)
@@ -148,42 +229,49 @@ def balanco_chiller_completo(m_sf_inicial, m_biomassa_inicial, m_HCl_inicial,
     Q_sf_latente = m_sf_inicial * (-L_cristalizacao_SL)  # negativo = energia liberada
     Q_biomassa_inicial = m_biomassa_inicial * Cp_biomassa * (T_inicial - T_final)
     Q_HCl_inicial = m_HCl_inicial * Cp_HCl_solucao * (T_inicial - T_final)
-    Q_perdas_resfriamento = perdas_ambiente_kW * t_resfriamento_28_4 * 3600
+    Q_perdas_resfriamento = perdas_ambiente_kW * t_resfriamento_28_4 * kWh_para_kJ
     
     Q_part1 = Q_sf_sensivel - Q_sf_latente + Q_biomassa_inicial + Q_HCl_inicial + Q_perdas_resfriamento
     
     # PARTE 2: Manutenção componentes residuais (6h)
-    Q_perdas_cristalizacao = perdas_ambiente_kW * t_manutencao_cristalizacao * 3600
+    Q_perdas_cristalizacao = perdas_ambiente_kW * t_manutencao_cristalizacao * kWh_para_kJ
     Q_part2 = Q_perdas_cristalizacao
     
     # PARTE 3: Resfriamento etanol + manutenção (2h)
     Q_etanol_sensivel = m_etanol_lavagem * Cp_etanol_70 * (T_ambiente - T_final)
-    Q_perdas_lavagem = perdas_ambiente_kW * t_manutencao_lavagem * 3600
+    Q_perdas_lavagem = perdas_ambiente_kW * t_manutencao_lavagem * kWh_para_kJ
     Q_part3 = Q_etanol_sensivel + Q_perdas_lavagem
     
     # Total
     Q_total_remover = Q_part1 + Q_part2 + Q_part3
     
     # Energia elétrica
+    tempo_total = t_resfriamento_28_4 + t_manutencao_cristalizacao + t_manutencao_lavagem
+    COP = resolver_cop(COP, Q_total_remover, tempo_total)
     E_eletrica_total = calcular_energia_chiller(Q_total_remover, COP)
     
-    return {
-        'Q_sf_sensivel_kJ': Q_sf_sensivel,
-        'Q_sf_latente_kJ': Q_sf_latente,
-        'Q_biomassa_inicial_kJ': Q_biomassa_inicial,
-        'Q_HCl_inicial_kJ': Q_HCl_inicial,
-        'Q_etanol_sensivel_kJ': Q_etanol_sensivel,
-        'Q_perdas_total_kJ': Q_perdas_resfriamento + Q_perdas_cristalizacao + Q_perdas_lavagem,
-        'Q_part1_kJ': Q_part1,
-        'Q_part2_kJ': Q_part2,
-        'Q_part3_kJ': Q_part3,
-        'Q_total_remover_kJ': Q_total_remover,
-        'E_eletrica_total_kWh': E_eletrica_total,
-        'm_parte2_kg': m_biomassa_residual + m_HCl_residual + m_sf_cristalizar,
-        'm_parte3_kg': m_biomassa_residual + m_HCl_residual + m_sf_cristalizar + m_etanol_lavagem
-    }
+    return ResultadoChiller(
+        Q_sf_sensivel_kJ=Q_sf_sensivel,
+        Q_sf_latente_kJ=Q_sf_latente,
+        Q_biomassa_inicial_kJ=Q_biomassa_inicial,
+        Q_HCl_inicial_kJ=Q_HCl_inicial,
+        Q_etanol_sensivel_kJ=Q_etanol_sensivel,
+        Q_perdas_total_kJ=Q_perdas_resfriamento + Q_perdas_cristalizacao + Q_perdas_lavagem,
+        Q_part1_kJ=Q_part1,
+        Q_part2_kJ=Q_part2,
+        Q_part3_kJ=Q_part3,
+        Q_total_remover_kJ=Q_total_remover,
+        E_eletrica_total_kWh=E_eletrica_total,
+        m_parte2_kg=m_biomassa_residual + m_HCl_residual + m_sf_cristalizar,
+        m_parte3_kg=m_biomassa_residual + m_HCl_residual + m_sf_cristalizar + m_etanol_lavagem
+    )
 
 
+@unidades(retorno=unidades_por_sufixo(ResultadoSecador.CAMPOS),
+          m_cristais_umidos='kg', m_agua_evaporar='kg', m_etanol_evaporar='kg',
+          Cp_soforolipideos='kJ/(kg·K)', Cp_agua='kJ/(kg·K)', Cp_etanol_70='kJ/(kg·K)',
+          T_inicial='K', T_final='K', L_vap_agua_45C='kJ/kg', L_etanol_70='kJ/kg',
+          perdas_ambiente_kW='kW', tempo_h='h', eficiencia='1')
 def balanco_secador_completo(m_cristais_umidos, m_agua_evaporar, m_etanol_evaporar,
                            Cp_soforolipideos, Cp_agua, Cp_etanol_70,
                            T_inicial, T_final, L_vap_agua_45C, L_etanol_70,
@@ -194,6 +282,8 @@ def balanco_secador_completo(m_cristais_umidos, m_agua_evaporar, m_etanol_evapor
     Cristais: aquecimento 4°C → 45°C
     Água: aquecimento + vaporização  
     Etanol: aquecimento + vaporização
+    
+    eficiencia pode ser um número ou um MapaEficienciaSecador (avaliado na carga média)
     """
     # Calor sensível para aquecer cristais
     Q_cristais_sensivel = m_cristais_umidos * Cp_soforolipideos * (T_final - T_inicial)
@@ -210,37 +300,41 @@ def balanco_secador_completo(m_cristais_umidos, m_agua_evaporar, m_etanol_evapor
     Q_total_util = Q_cristais_sensivel + Q_agua_sensivel + Q_agua_latente + Q_etanol_sensivel + Q_etanol_latente
     
     # Perdas para ambiente
-    Q_perdas = perdas_ambiente_kW * tempo_h * 3600  # kW×h → kJ
+    Q_perdas = perdas_ambiente_kW * tempo_h * kWh_para_kJ
     
     # Calor total a fornecer
     Q_total_fornecer = Q_total_util + Q_perdas
     
     # Energia elétrica (considerando eficiência)
-    E_eletrica_total = Q_total_fornecer / (eficiencia * 3600)  # kJ → kWh
-    
-    return {
-        'Q_cristais_sensivel_kJ': Q_cristais_sensivel,
-        'Q_agua_sensivel_kJ': Q_agua_sensivel,
-        'Q_agua_latente_kJ': Q_agua_latente,
-        'Q_etanol_sensivel_kJ': Q_etanol_sensivel,
-        'Q_etanol_latente_kJ': Q_etanol_latente,
-        'Q_total_util_kJ': Q_total_util,
-        'Q_perdas_kJ': Q_perdas,
-        'Q_total_fornecer_kJ': Q_total_fornecer,
-        'E_eletrica_total_kWh': E_eletrica_total
-    }
+    eficiencia = resolver_eficiencia(eficiencia, Q_total_fornecer, tempo_h)
+    E_eletrica_total = Q_total_fornecer / (eficiencia * kWh_para_kJ)
+    
+    return ResultadoSecador(
+        Q_cristais_sensivel_kJ=Q_cristais_sensivel,
+        Q_agua_sensivel_kJ=Q_agua_sensivel,
+        Q_agua_latente_kJ=Q_agua_latente,
+        Q_etanol_sensivel_kJ=Q_etanol_sensivel,
+        Q_etanol_latente_kJ=Q_etanol_latente,
+        Q_total_util_kJ=Q_total_util,
+        Q_perdas_kJ=Q_perdas,
+        Q_total_fornecer_kJ=Q_total_fornecer,
+        E_eletrica_total_kWh=E_eletrica_total
+    )
 
 
+@unidades(retorno='kWh', valor_kJ='kJ')
 def converter_kJ_para_kWh(valor_kJ):
     """Converte kJ para kWh"""
-    return valor_kJ / 3600
+    return valor_kJ / kWh_para_kJ
 
 
+@unidades(retorno='kJ', valor_kWh='kWh')
 def converter_kWh_para_kJ(valor_kWh):
     """Converte kWh para kJ"""
-    return valor_kWh * 3600
+    return valor_kWh * kWh_para_kJ
 
 
+@unidades(retorno={'*': 'kWh', 'TOTAL': 'kWh'}, equipamentos_dict={'*': {'P_nom': 'kW', 'tempo': 'h'}})
 def calcular_energia_total_equipamentos(equipamentos_dict):
     """
     Calcula energia total de uma lista de equipamentos
@@ -255,9 +349,13 @@ def calcular_energia_total_equipamentos(equipamentos_dict):
     total = 0
     
     for codigo, dados in equipamentos_dict.items():
-        energia = calcular_energia_eletrica_equipamento(dados['P_nom'], dados['tempo'])
+        energia = calcular_energia_equipamento(dados)
         energias[codigo] = energia
         total += energia
     
     energias['TOTAL'] = total
-    return energias
\ No newline at end of file
+    return energias
+
+
+# Unidades de todas as fórmulas acima conferidas uma vez, na importação (as funções não mudam)
+verificar_modulo(sys.modules[__name__])
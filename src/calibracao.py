@@ -0,0 +1,264 @@
+"""
+calibracao.py - Calibração Bayesiana das Constantes Incertas
+Ajusta distribuições a posteriori de fator_agitacao_calor, Q_perdas_V102,
+Q_perdas_TDR101, COP_chiller e eficiencia_secador às energias medidas do
+chiller e do secador por lote. Amostrador de ensemble (stretch move) que
+avalia o balanço de meia população × todos os lotes numa única chamada.
+"""
+
+import warnings
+
+import numpy as np
+
+from src import constants as C
+from src.cenarios import criar_cenario
+from src.lotes import avaliar_lotes
+
+NOMES_PADRAO = ('fator_agitacao_calor', 'Q_perdas_V102', 'Q_perdas_TDR101', 'COP_chiller', 'eficiencia_secador')
+
+
+def log_posterior(theta, nomes, priores, medido_chiller, medido_secador, parametros_lotes=None,
+                  erro_relativo=None):
+    """
+    Log da densidade a posteriori (a menos de constante) para uma população de vetores
+
+    Priores uniformes; verossimilhança gaussiana com desvio relativo em cada
+    energia medida (NaN = lote sem medição). Com fator_agitacao_calor entre os
+    nomes, a dissipação do agitador do V-102 entra na carga do chiller - ela é
+    confundida com Q_perdas_V102 (só a soma é identificável) e a priori decide a partição.
+
+    Args:
+        theta: array (W, d) de vetores de parâmetros
+        nomes: nomes das d constantes
+        priores: {nome: (mín, máx)}
+        medido_chiller, medido_secador: energias medidas por lote (kWh) - arrays (L,)
+        parametros_lotes: entradas conhecidas por lote {constante: array (L,)}
+        erro_relativo: desvio-padrão relativo da medição (padrão: C.erro_relativo_medicao)
+
+    Returns:
+        array (W,) - -inf fora do suporte da priori
+    """
+    erro_relativo = C.erro_relativo_medicao if erro_relativo is None else erro_relativo
+    theta = np.atleast_2d(theta)
+    limites = np.array([priores[n] for n in nomes], dtype=float)
+    dentro = np.all((theta >= limites[:, 0]) & (theta <= limites[:, 1]), axis=1)
+    log_p = np.full(len(theta), -np.inf)
+    if not dentro.any():
+        return log_p
+
+    parametros = {nome: np.asarray(v)[None, :] for nome, v in (parametros_lotes or {}).items()}
+    parametros.update({nome: theta[dentro, j][:, None] for j, nome in enumerate(nomes)})
+    resultado = avaliar_lotes(parametros, dissipacao_agitacao_chiller='fator_agitacao_calor' in nomes)
+
+    residuos = 0.0
+    for previsto, medido in ((resultado['chiller.E_eletrica_total_kWh'], medido_chiller),
+                             (resultado['secador.E_eletrica_total_kWh'], medido_secador)):
+        medido = np.asarray(medido, dtype=float)[None, :]
+        r = (previsto - medido) / (erro_relativo * medido)
+        residuos = residuos + np.where(np.isnan(r), 0.0, r ** 2).sum(axis=1)
+    log_p[dentro] = -0.5 * residuos
+    return log_p
+
+
+def amostrar_ensemble(log_prob, inicio, n_passos, a=2.0, semente=0):
+    """
+    Amostrador afim-invariante de Goodman & Weare (stretch move), vetorizado
+
+    A população é dividida em duas metades; cada metade é atualizada com
+    propostas a partir da outra e avaliada numa única chamada de log_prob.
+
+    Args:
+        log_prob: função (W, d) → (W,)
+        inicio: posições iniciais (W, d), W par
+        n_passos: número de passos
+        a: escala do stretch move
+        semente: semente aleatória
+
+    Returns:
+        (cadeia (n_passos, W, d), log_prob (n_passos, W), taxa de aceitação por caminhante)
+    """
+    rng = np.random.default_rng(semente)
+    posicoes = np.array(inicio, dtype=float)
+    W, d = posicoes.shape
+    metades = (np.arange(0, W // 2), np.arange(W // 2, W))
+    lp = log_prob(posicoes)
+    cadeia = np.empty((n_passos, W, d))
+    cadeia_lp = np.empty((n_passos, W))
+    aceitos = np.zeros(W)
+
+    for passo in range(n_passos):
+        for ativa, complementar in (metades, metades[::-1]):
+            n = len(ativa)
+            z = ((a - 1) * rng.random(n) + 1) ** 2 / a
+            parceiros = posicoes[complementar[rng.integers(len(complementar), size=n)]]
+            proposta = parceiros + z[:, None] * (posicoes[ativa] - parceiros)
+            lp_proposta = log_prob(proposta)
+            log_razao = (d - 1) * np.log(z) + lp_proposta - lp[ativa]
+            aceita = np.log(rng.random(n)) < log_razao
+            posicoes[ativa[aceita]] = proposta[aceita]
+            lp[ativa[aceita]] = lp_proposta[aceita]
+            aceitos[ativa] += aceita
+        cadeia[passo], cadeia_lp[passo] = posicoes, lp
+
+    return cadeia, cadeia_lp, aceitos / n_passos
+
+
+def tempo_autocorrelacao(cadeia, c=5.0):
+    """
+    Tempo de autocorrelação integrado por parâmetro (média das funções de
+    autocorrelação dos caminhantes, via FFT, com janela automática de Sokal)
+
+    Args:
+        cadeia: (n_passos, W, d)
+
+    Returns:
+        array (d,)
+    """
+    n = cadeia.shape[0]
+    x = cadeia - cadeia.mean(axis=0)
+    f = np.fft.rfft(x, n=2 * n, axis=0)
+    acf = np.fft.irfft(f * np.conj(f), axis=0)[:n].mean(axis=1)
+    acf /= np.where(acf[0] > 0, acf[0], 1.0)
+    taus = 2.0 * np.cumsum(acf, axis=0) - 1.0
+    janela = np.arange(n)[:, None] < c * taus
+    m = np.minimum(np.argmin(janela, axis=0), n - 1)
+    return taus[m, np.arange(cadeia.shape[2])]
+
+
+def r_hat(cadeia):
+    """
+    R̂ de Gelman-Rubin com divisão das cadeias ao meio (cada caminhante é uma cadeia)
+
+    Args:
+        cadeia: (n_passos, W, d)
+
+    Returns:
+        array (d,) - valores próximos de 1 indicam convergência
+    """
+    n = cadeia.shape[0] // 2
+    divididas = np.concatenate([cadeia[:n], cadeia[n:2 * n]], axis=1)   # (n, 2W, d)
+    medias = divididas.mean(axis=0)
+    variancia_intra = divididas.var(axis=0, ddof=1).mean(axis=0)
+    variancia_entre = n * medias.var(axis=0, ddof=1)
+    variancia_posterior = (n - 1) / n * variancia_intra + variancia_entre / n
+    return np.sqrt(variancia_posterior / variancia_intra)
+
+
+def calibrar(medido_chiller, medido_secador, parametros_lotes=None, nomes=NOMES_PADRAO, priores=None,
+             n_caminhantes=32, n_passos=30000, descarte=None, erro_relativo=None, semente=0):
+    """
+    Calibra as constantes incertas contra as energias medidas por lote
+
+    A convergência é conferida antes de montar o cenário: R̂ < C.R_hat_maximo_calibracao
+    e cadeia mantida ≥ C.passos_por_tau_calibracao × τ para todas as constantes. Se
+    falhar, emite um aviso e o cenário registra convergiu=False em detalhes. Constantes
+    confundidas (ex. COP_chiller × Q_perdas_V102 × fator_agitacao_calor, que só aparecem
+    juntas na energia do chiller) podem convergir com medianas longe dos valores reais:
+    ver 'correlacao'.
+
+    Args:
+        medido_chiller, medido_secador: kWh medidos por lote (arrays (L,), NaN = sem medição)
+        parametros_lotes: entradas conhecidas por lote {constante: array (L,)}
+        nomes: constantes calibradas
+        priores: {nome: (mín, máx)} (padrão: C.priores_calibracao)
+        n_caminhantes: tamanho da população (par)
+        n_passos: passos do amostrador
+        descarte: passos iniciais descartados (padrão: metade)
+        erro_relativo: desvio-padrão relativo da medição
+        semente: semente aleatória
+
+    Returns:
+        dict com 'amostras' (N, d), 'nomes', 'media', 'mediana', 'intervalo_95', 'R_hat',
+        'tau', 'n_efetivo', 'aceitacao', 'convergiu', 'correlacao' (d, d) e 'cenario'
+        (medianas prontas para avaliar_cenario)
+    """
+    priores = C.priores_calibracao if priores is None else priores
+    descarte = n_passos // 2 if descarte is None else descarte
+    limites = np.array([priores[n] for n in nomes], dtype=float)
+
+    log_prob = lambda theta: log_posterior(theta, nomes, priores, medido_chiller, medido_secador,
+                                           parametros_lotes, erro_relativo)
+
+    # Partida: bola estreita em torno dos valores atuais (dentro da priori)
+    rng = np.random.default_rng(semente)
+    centro = np.clip([getattr(C, n) for n in nomes], limites[:, 0], limites[:, 1])
+    largura = 0.01 * (limites[:, 1] - limites[:, 0])
+    inicio = np.clip(centro + largura * rng.standard_normal((n_caminhantes, len(nomes))),
+                     limites[:, 0], limites[:, 1])
+
+    cadeia, _, aceitacao = amostrar_ensemble(log_prob, inicio, n_passos, semente=semente)
+    cadeia = cadeia[descarte:]
+    amostras = cadeia.reshape(-1, len(nomes))
+    tau = tempo_autocorrelacao(cadeia)
+    R_hat = r_hat(cadeia)
+    mediana = np.median(amostras, axis=0)
+    intervalo = np.percentile(amostras, [2.5, 97.5], axis=0).T
+
+    convergiu = bool(np.all(R_hat < C.R_hat_maximo_calibracao)
+                     and cadeia.shape[0] >= C.passos_por_tau_calibracao * tau.max())
+    if not convergiu:
+        warnings.warn(f"Calibração não convergiu: R̂ máx {R_hat.max():.3f} "
+                      f"(limite {C.R_hat_maximo_calibracao}), cadeia mantida {cadeia.shape[0]} passos = "
+                      f"{cadeia.shape[0] / tau.max():.0f} τ (mínimo {C.passos_por_tau_calibracao}); "
+                      f"aumente n_passos", RuntimeWarning, stacklevel=2)
+
+    cenario = criar_cenario(
+        'calibrado', dict(zip(nomes, mediana)),
+        opcoes={'dissipacao_agitacao_chiller': 'fator_agitacao_calor' in nomes},
+        origem='calibracao',
+        detalhes={'intervalo_95': {n: intervalo[j].tolist() for j, n in enumerate(nomes)},
+                  'n_lotes': int(np.size(medido_chiller)),
+                  'convergiu': convergiu,
+                  'R_hat_maximo': float(R_hat.max())}
+    )
+    return {
+        'amostras': amostras,
+        'nomes': tuple(nomes),
+        'media': dict(zip(nomes, amostras.mean(axis=0))),
+        'mediana': dict(zip(nomes, mediana)),
+        'intervalo_95': dict(zip(nomes, map(tuple, intervalo))),
+        'R_hat': dict(zip(nomes, R_hat)),
+        'tau': dict(zip(nomes, tau)),
+        'n_efetivo': dict(zip(nomes, cadeia.shape[0] * cadeia.shape[1] / tau)),
+        'aceitacao': float(aceitacao.mean()),
+        'convergiu': convergiu,
+        'correlacao': np.corrcoef(amostras, rowvar=False),
+        'cenario': cenario
+    }
+
+
+# Exemplo de uso
+if __name__ == "__main__":
+    import time
+
+    from src.cenarios import avaliar_cenario
+
+    # Lotes sintéticos: massas variando ±10 %, energias "medidas" com parâmetros verdadeiros + 5 % de ruído
+    rng = np.random.default_rng(1)
+    n_lotes = 1000
+    lotes = {nome: getattr(C, nome) * rng.uniform(0.9, 1.1, n_lotes)
+             for nome in ('m_sf_inicial', 'm_cristais_umidos', 'm_etanol_lavagem')}
+    verdadeiro = {'fator_agitacao_calor': 0.30, 'Q_perdas_V102': 0.35, 'Q_perdas_TDR101': 2.6,
+                  'COP_chiller': 2.6, 'eficiencia_secador': 0.75}
+    referencia = avaliar_lotes({**lotes, **verdadeiro}, dissipacao_agitacao_chiller=True)
+    medido_chiller = referencia['chiller.E_eletrica_total_kWh'] * (1 + 0.05 * rng.standard_normal(n_lotes))
+    medido_secador = referencia['secador.E_eletrica_total_kWh'] * (1 + 0.05 * rng.standard_normal(n_lotes))
+
+    t0 = time.perf_counter()
+    resultado = calibrar(medido_chiller, medido_secador, parametros_lotes=lotes)
+    print(f"=== CALIBRAÇÃO ({n_lotes} lotes, {time.perf_counter() - t0:.1f} s, "
+          f"aceitação {resultado['aceitacao']:.2f}, convergiu: {resultado['convergiu']}) ===")
+    for nome in resultado['nomes']:
+        lo, hi = resultado['intervalo_95'][nome]
+        print(f"{nome:22} mediana {resultado['mediana'][nome]:6.3f}  IC95 [{lo:6.3f}, {hi:6.3f}]  "
+              f"verdadeiro {verdadeiro[nome]:6.3f}  R̂ {resultado['R_hat'][nome]:.3f}  "
+              f"τ {resultado['tau'][nome]:5.1f}")
+
+    # Constantes que só aparecem juntas na energia do chiller ficam correlacionadas a posteriori
+    correlacao = resultado['correlacao'] - np.eye(len(resultado['nomes']))
+    i, j = np.unravel_index(np.abs(correlacao).argmax(), correlacao.shape)
+    print(f"Maior correlação: {resultado['nomes'][i]} × {resultado['nomes'][j]} = {correlacao[i, j]:+.2f}")
+
+    calibrado = avaliar_cenario(resultado['cenario'])
+    print(f"Chiller calibrado: {float(calibrado['chiller.E_eletrica_total_kWh']):.2f} kWh/lote")
+    print(f"Secador calibrado: {float(calibrado['secador.E_eletrica_total_kWh']):.2f} kWh/lote")
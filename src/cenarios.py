@@ -0,0 +1,266 @@
+"""
+cenarios.py - Cenários de Parâmetros Reutilizáveis
+Um cenário é um conjunto de substituições de constantes (e opções do modelo)
+salvo em JSON, que pode ser avaliado diretamente com avaliar_lotes.
+Alterações de equipamentos são sobreposições esparsas ({codigo: {campo: valor}})
+resolvidas por consulta sobre a configuração base, que nunca é copiada; muitos
+cenários compartilham a mesma base e podem ser achatados em arrays para uma
+única chamada de avaliar_lotes.
+"""
+
+import json
+import os
+import tempfile
+from collections import ChainMap
+from collections.abc import Mapping
+from types import MappingProxyType
+
+import numpy as np
+
+from src import constants as C
+from src.lotes import CALCULADOS, avaliar_lotes
+
+
+class EquipamentosSobrepostos(Mapping):
+    """
+    Equipamentos base + camadas de alterações esparsas, somente leitura
+
+    equipamentos[codigo] devolve os campos resolvidos da camada mais recente
+    para a base; nada é copiado. Novas alterações criam outra camada
+    (sobrepor), sem modificar esta.
+    """
+
+    __slots__ = ('base', 'camadas')
+
+    def __init__(self, base, *camadas):
+        self.base = base
+        self.camadas = camadas
+
+    def __getitem__(self, codigo):
+        alteracoes = [camada[codigo] for camada in reversed(self.camadas) if codigo in camada]
+        if not alteracoes:
+            return MappingProxyType(self.base[codigo])
+        return MappingProxyType(ChainMap(*alteracoes, self.base[codigo]))
+
+    def __iter__(self):
+        return iter(self.base)
+
+    def __len__(self):
+        return len(self.base)
+
+    def __contains__(self, codigo):
+        return codigo in self.base
+
+    def sobrepor(self, alteracoes):
+        """Nova visão com mais uma camada de alterações {codigo: {campo: valor}}"""
+        return sobrepor_equipamentos(self, alteracoes)
+
+    def alteracoes(self):
+        """Todas as camadas combinadas em um único dict esparso"""
+        combinadas = {}
+        for camada in self.camadas:
+            for codigo, campos in camada.items():
+                combinadas.setdefault(codigo, {}).update(campos)
+        return combinadas
+
+    def como_dict(self):
+        """Cópia resolvida em dicts comuns"""
+        return {codigo: dict(self[codigo]) for codigo in self.base}
+
+
+def sobrepor_equipamentos(base, alteracoes):
+    """
+    Sobrepõe alterações esparsas a uma configuração de equipamentos, sem copiá-la
+
+    Args:
+        base: {codigo: {'P_nom', 'tempo'}} ou EquipamentosSobrepostos
+        alteracoes: {codigo: {campo: valor}} (apenas o que muda)
+
+    Returns:
+        EquipamentosSobrepostos
+    """
+    desconhecidos = set(alteracoes) - set(base)
+    if desconhecidos:
+        raise KeyError(f"Equipamentos desconhecidos: {sorted(desconhecidos)}")
+    if isinstance(base, EquipamentosSobrepostos):
+        return EquipamentosSobrepostos(base.base, *base.camadas, alteracoes)
+    return EquipamentosSobrepostos(base, alteracoes)
+
+
+def achatar_sobreposicoes(lista_alteracoes, base=None):
+    """
+    Achata N conjuntos de alterações em arrays (N,) para avaliar_lotes
+
+    Só os campos alterados em algum cenário viram arrays; os demais continuam
+    escalares da base. FT-101/TDR-101 são calculados e ficam de fora.
+
+    Args:
+        lista_alteracoes: sequência de {codigo: {campo: valor}}
+        base: equipamentos base (padrão: C.equipamentos_processo)
+
+    Returns:
+        {codigo: {'P_nom', 'tempo'}} com arrays nos campos alterados
+    """
+    base = C.equipamentos_processo if base is None else base
+    n = len(lista_alteracoes)
+    equipamentos = dict(base)
+    arrays = {}
+    for i, alteracoes in enumerate(lista_alteracoes):
+        for codigo, campos in alteracoes.items():
+            if codigo in CALCULADOS:
+                continue
+            for campo, valor in campos.items():
+                if (codigo, campo) not in arrays:
+                    arrays[codigo, campo] = np.full(n, base[codigo][campo], dtype=float)
+                arrays[codigo, campo][i] = valor
+    for codigo in {codigo for codigo, _ in arrays}:
+        equipamentos[codigo] = dict(base[codigo])
+    for (codigo, campo), valores in arrays.items():
+        equipamentos[codigo][campo] = valores
+    return equipamentos
+
+
+def criar_cenario(nome, parametros, opcoes=None, origem=None, detalhes=None, equipamentos=None):
+    """
+    Monta um cenário
+
+    Args:
+        nome: identificação do cenário
+        parametros: {constante: valor} sobrepondo src.constants
+        equipamentos: alterações esparsas {codigo: {campo: valor}} sobre C.equipamentos_processo
+        opcoes: argumentos extras de avaliar_lotes (ex. dissipacao_agitacao_chiller)
+        origem: de onde veio (ex. 'calibracao')
+        detalhes: informações adicionais serializáveis (ex. intervalos a posteriori)
+
+    Returns:
+        dict do cenário
+    """
+    return {
+        'nome': nome,
+        'origem': origem,
+        'parametros': {k: float(v) for k, v in parametros.items()},
+        'equipamentos': {codigo: {campo: float(v) for campo, v in campos.items()}
+                         for codigo, campos in (equipamentos or {}).items()},
+        'opcoes': dict(opcoes or {}),
+        'detalhes': detalhes or {}
+    }
+
+
+def salvar_cenario(cenario, caminho):
+    """Salva o cenário em JSON (escrita atômica)"""
+    pasta = os.path.dirname(os.path.abspath(caminho))
+    with tempfile.NamedTemporaryFile('w', dir=pasta, suffix='.tmp', delete=False, encoding='utf-8') as f:
+        json.dump(cenario, f, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(f.name, caminho)
+
+
+def carregar_cenario(caminho):
+    """Carrega um cenário salvo com salvar_cenario"""
+    with open(caminho, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def avaliar_cenario(cenario, parametros=None, **kwargs):
+    """
+    Avalia o balanço com as substituições do cenário
+
+    Args:
+        cenario: dict do cenário
+        parametros: substituições adicionais (têm prioridade sobre o cenário)
+        **kwargs: repassados a avaliar_lotes
+
+    Returns:
+        Colunas de avaliar_lotes
+    """
+    combinados = dict(cenario['parametros'])
+    combinados.update(parametros or {})
+    opcoes = dict(cenario.get('opcoes', {}))
+    opcoes.update(kwargs)
+    if cenario.get('equipamentos'):
+        base = opcoes.get('equipamentos', C.equipamentos_processo)
+        opcoes['equipamentos'] = sobrepor_equipamentos(base, cenario['equipamentos'])
+    return avaliar_lotes(combinados, **opcoes)
+
+
+def avaliar_cenarios(cenarios, **kwargs):
+    """
+    Avalia N cenários numa única chamada vetorizada (um elemento por cenário)
+
+    Parâmetros e alterações de equipamentos de todos os cenários são achatados
+    em arrays (N,); o que nenhum cenário altera vem das constantes/base.
+    As opções dos cenários devem coincidir (ex. dissipacao_agitacao_chiller).
+
+    Args:
+        cenarios: sequência de dicts de cenário
+        **kwargs: repassados a avaliar_lotes (equipamentos = base das alterações)
+
+    Returns:
+        Colunas de avaliar_lotes com arrays (N,)
+    """
+    opcoes = {tuple(sorted(c.get('opcoes', {}).items())) for c in cenarios}
+    if len(opcoes) > 1:
+        raise ValueError("Cenários com opções diferentes não podem ser avaliados juntos")
+    opcoes = dict(opcoes.pop()) if opcoes else {}
+    opcoes.update(kwargs)
+
+    n = len(cenarios)
+    parametros = {}
+    for i, cenario in enumerate(cenarios):
+        for nome, valor in cenario['parametros'].items():
+            if nome not in parametros:
+                parametros[nome] = np.full(n, getattr(C, nome), dtype=float)
+            parametros[nome][i] = valor
+    opcoes['equipamentos'] = achatar_sobreposicoes([c.get('equipamentos', {}) for c in cenarios],
+                                                   opcoes.get('equipamentos'))
+    colunas = avaliar_lotes(parametros, **opcoes)
+    return {nome: np.broadcast_to(valor, (n,)) for nome, valor in colunas.items()}
+
+
+# Exemplo de uso
+if __name__ == "__main__":
+    import time
+    import tracemalloc
+    from copy import deepcopy
+
+    rng = np.random.default_rng(0)
+    n_cenarios = 10_000
+    fatores = rng.uniform(0.8, 1.2, n_cenarios)
+
+    def medir(criar):
+        t0 = time.perf_counter()
+        cenarios = [criar(f) for f in fatores]
+        duracao = time.perf_counter() - t0
+        del cenarios
+        tracemalloc.start()
+        cenarios = [criar(f) for f in fatores]
+        memoria = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del cenarios
+        return duracao / n_cenarios * 1e6, memoria / n_cenarios
+
+    def por_copia(fator):
+        equipamentos = deepcopy(C.equipamentos_processo)
+        equipamentos['FR-101']['P_nom'] = fator * 3.0
+        equipamentos['BLW-101']['P_nom'] = fator * 1.0
+        return equipamentos
+
+    def por_sobreposicao(fator):
+        return sobrepor_equipamentos(C.equipamentos_processo,
+                                     {'FR-101': {'P_nom': fator * 3.0}, 'BLW-101': {'P_nom': fator * 1.0}})
+
+    print(f"=== {n_cenarios} CENÁRIOS DE EQUIPAMENTOS ===")
+    for nome, criar in (('deepcopy', por_copia), ('sobreposição', por_sobreposicao)):
+        us, memoria = medir(criar)
+        print(f"{nome:13}: {us:6.1f} µs/cenário | {memoria:6.0f} B/cenário")
+
+    cenarios = [criar_cenario(f'agitacao_{i}', {'COP_chiller': 2.5 + f},
+                              equipamentos={'FR-101': {'P_nom': f * 3.0}})
+                for i, f in enumerate(fatores)]
+    t0 = time.perf_counter()
+    em_lote = avaliar_cenarios(cenarios)
+    duracao_lote = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    um_a_um = [float(avaliar_cenario(c)['energia_total']) for c in cenarios[:500]]
+    duracao_laco = (time.perf_counter() - t0) / 500 * n_cenarios
+    print(f"\navaliar_cenarios: {duracao_lote * 1e3:.1f} ms (laço estimado: {duracao_laco * 1e3:.0f} ms) | "
+          f"mesmo resultado: {np.allclose(em_lote['energia_total'][:500], um_a_um)}")
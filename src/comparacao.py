@@ -0,0 +1,233 @@
+"""
+comparacao.py - Diferenças entre Dois Conjuntos de Resultados
+Compara resultados gravados antes e depois de uma mudança no modelo
+(constants.py, calculations.py): junção pela identificação do lote/cenário,
+deltas vetorizados de todos os campos e resumo das maiores mudanças por
+equipamento, componente do chiller/secador e kWh/kg. Os conjuntos ficam em
+disco (um .npy por coluna, lidos por mmap) e são percorridos em faixas de
+identificação correspondentes, com memória limitada ao tamanho do bloco.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+COLUNA_ID = 'id'
+
+GRUPOS = (
+    ('equipamento.', 'equipamento'),
+    ('potencia.', 'potencia'),
+    ('chiller.', 'chiller'),
+    ('secador.', 'secador')
+)
+
+
+def grupo_campo(campo):
+    """Grupo de uma coluna de avaliar_lotes (equipamento, chiller, secador, potencia ou total)"""
+    for prefixo, grupo in GRUPOS:
+        if campo.startswith(prefixo):
+            return grupo
+    return 'total'
+
+
+def gravar_resultados(pasta, colunas, ids=None):
+    """
+    Grava um conjunto de resultados: <pasta>/<coluna>.npy, mais id.npy
+
+    Args:
+        pasta: diretório do conjunto (criado se preciso)
+        colunas: dict {coluna: array (N,)} (ex. avaliar_lotes, mesclar_resultados)
+        ids: identificação de cada linha (padrão: 0..N-1)
+    """
+    os.makedirs(pasta, exist_ok=True)
+    n = max(np.size(v) for v in colunas.values())
+    ids = np.arange(n) if ids is None else np.asarray(ids)
+    np.save(os.path.join(pasta, f'{COLUNA_ID}.npy'), ids.astype(np.int64))
+    for nome, valor in colunas.items():
+        np.save(os.path.join(pasta, f'{nome}.npy'), np.broadcast_to(np.asarray(valor, dtype=float), (n,)))
+
+
+def abrir_resultados(pasta):
+    """Conjunto gravado por gravar_resultados como dict de arrays mapeados em memória"""
+    return {nome[:-4]: np.load(os.path.join(pasta, nome), mmap_mode='r')
+            for nome in sorted(os.listdir(pasta)) if nome.endswith('.npy')}
+
+
+def _faixas(ids, tamanho_bloco):
+    """
+    Ids em ordem crescente e a permutação para ler as colunas nessa ordem
+
+    Se os ids já estão ordenados (verificado bloco a bloco), as faixas são
+    fatias contíguas do mmap e a permutação é None; senão, só os ids (8 bytes
+    por linha) são ordenados em memória e as colunas são lidas por índice.
+
+    Returns:
+        (ids ordenados, permutação ou None)
+
+    Raises:
+        ValueError se algum id se repete (a junção exige ids únicos)
+    """
+    ordenado = all(np.all(np.diff(ids[i:i + tamanho_bloco + 1]) > 0) for i in range(0, len(ids), tamanho_bloco))
+    if ordenado:
+        return ids, None
+    ordem = np.argsort(ids, kind='stable')
+    ids = ids[ordem]
+    for i in range(0, len(ids), tamanho_bloco):
+        faixa = ids[i:i + tamanho_bloco + 1]
+        repetidos = np.flatnonzero(np.diff(faixa) == 0)
+        if len(repetidos):
+            raise ValueError(f"{COLUNA_ID} repetido: {int(faixa[repetidos[0]])} (a junção exige ids únicos)")
+    return ids, ordem
+
+
+def _ler(conjunto, nome, ordem, inicio, fim):
+    coluna = conjunto[nome]
+    return np.asarray(coluna[inicio:fim] if ordem is None else coluna[ordem[inicio:fim]], dtype=float)
+
+
+def comparar_resultados(antes, depois, tamanho_bloco=1_000_000, tolerancia=1e-9, n_lotes=10,
+                        campo_lotes='consumo_especifico'):
+    """
+    Junção por id e deltas (depois − antes) de todos os campos comuns
+
+    Os dois conjuntos (em ordem de id) são percorridos juntos, como num merge:
+    cada passo lê no máximo tamanho_bloco linhas de cada lado, até o menor dos
+    últimos ids dos dois blocos, de modo que ids iguais caem sempre no mesmo
+    passo e a memória não depende de quão esparso um lado é em relação ao outro.
+
+    Args:
+        antes, depois: dicts de colunas com COLUNA_ID único por linha (ex. abrir_resultados)
+        tamanho_bloco: linhas de cada conjunto por bloco
+        tolerancia: |delta| relativo acima do qual a linha conta como alterada
+        n_lotes: quantos lotes com maior |delta| de campo_lotes listar
+        campo_lotes: campo usado no ranking de lotes
+
+    Returns:
+        dict com 'resumo' (DataFrame por campo), 'lotes' (DataFrame dos maiores deltas
+        de campo_lotes), 'n_comuns', 'apenas_antes', 'apenas_depois',
+        'campos_novos', 'campos_removidos'
+    """
+    campos = sorted((set(antes) & set(depois)) - {COLUNA_ID})
+    ids_antes, ordem_antes = _faixas(antes[COLUNA_ID], tamanho_bloco)
+    ids_depois, ordem_depois = _faixas(depois[COLUNA_ID], tamanho_bloco)
+
+    k = len(campos)
+    n_alterados, soma, soma_abs = np.zeros(k, dtype=np.int64), np.zeros(k), np.zeros(k)
+    maximo, maximo_rel, id_maximo = np.zeros(k), np.zeros(k), np.full(k, -1, dtype=np.int64)
+    n_comuns = 0
+    melhores_ids, melhores_deltas = np.empty(0, dtype=np.int64), np.empty(0)
+
+    i1 = j1 = 0
+    while i1 < len(ids_antes) and j1 < len(ids_depois):
+        i0, j0 = i1, j1
+        # Passo até o menor dos últimos ids dos dois blocos: um lado avança um bloco inteiro
+        limite = min(ids_antes[min(i0 + tamanho_bloco, len(ids_antes)) - 1],
+                     ids_depois[min(j0 + tamanho_bloco, len(ids_depois)) - 1])
+        i1 = i0 + int(np.searchsorted(ids_antes[i0:i0 + tamanho_bloco], limite, 'right'))
+        j1 = j0 + int(np.searchsorted(ids_depois[j0:j0 + tamanho_bloco], limite, 'right'))
+        ids_comuns, ia, ib = np.intersect1d(np.asarray(ids_antes[i0:i1]), np.asarray(ids_depois[j0:j1]),
+                                            assume_unique=True, return_indices=True)
+        if len(ids_comuns) == 0:
+            continue
+        n_comuns += len(ids_comuns)
+
+        for c, campo in enumerate(campos):
+            a = _ler(antes, campo, ordem_antes, i0, i1)[ia]
+            b = _ler(depois, campo, ordem_depois, j0, j1)[ib]
+            delta = b - a
+            absoluto = np.abs(delta)
+            relativo = absoluto / np.maximum(np.abs(a), 1e-300)
+            n_alterados[c] += np.count_nonzero(relativo > tolerancia)
+            soma[c] += delta.sum()
+            soma_abs[c] += absoluto.sum()
+            i = int(np.argmax(absoluto))
+            if absoluto[i] > abs(maximo[c]):
+                maximo[c], id_maximo[c] = delta[i], ids_comuns[i]
+            maximo_rel[c] = max(maximo_rel[c], float(relativo.max()))
+            if campo == campo_lotes:
+                melhores_ids = np.concatenate([melhores_ids, ids_comuns])
+                melhores_deltas = np.concatenate([melhores_deltas, delta])
+                manter = np.argsort(-np.abs(melhores_deltas), kind='stable')[:n_lotes]
+                melhores_ids, melhores_deltas = melhores_ids[manter], melhores_deltas[manter]
+
+    n = max(n_comuns, 1)
+    resumo = pd.DataFrame({
+        'campo': campos,
+        'grupo': [grupo_campo(c) for c in campos],
+        'n_alterados': n_alterados,
+        'delta_medio': soma / n,
+        'delta_abs_medio': soma_abs / n,
+        'delta_max': maximo,
+        'delta_rel_max_pct': maximo_rel * 100,
+        'id_delta_max': id_maximo
+    }).sort_values('delta_abs_medio', ascending=False, kind='stable').reset_index(drop=True)
+
+    return {
+        'resumo': resumo,
+        'lotes': pd.DataFrame({COLUNA_ID: melhores_ids, f'delta_{campo_lotes}': melhores_deltas}),
+        'n_comuns': n_comuns,
+        'apenas_antes': len(ids_antes) - n_comuns,
+        'apenas_depois': len(ids_depois) - n_comuns,
+        'campos_novos': sorted(set(depois) - set(antes)),
+        'campos_removidos': sorted(set(antes) - set(depois))
+    }
+
+
+def maiores_mudancas(comparacao, grupo=None, n=10):
+    """
+    Campos com maior |delta| médio, opcionalmente de um grupo
+
+    Args:
+        comparacao: retorno de comparar_resultados
+        grupo: 'equipamento', 'chiller', 'secador', 'potencia', 'total' ou None (todos)
+        n: linhas
+
+    Returns:
+        DataFrame
+    """
+    resumo = comparacao['resumo']
+    if grupo is not None:
+        resumo = resumo[resumo['grupo'] == grupo]
+    return resumo[resumo['n_alterados'] > 0].head(n)
+
+
+# Exemplo de uso
+if __name__ == "__main__":
+    import tempfile
+    import time
+
+    from src import constants as C
+    from src.cenarios import sobrepor_equipamentos
+    from src.lotes import avaliar_lotes
+
+    rng = np.random.default_rng(0)
+    n = 1_000_000
+    parametros = {'m_sf_inicial': C.m_sf_inicial * rng.uniform(0.9, 1.1, n),
+                  'COP_chiller': rng.uniform(2.5, 3.5, n)}
+
+    # "Mudança no modelo": FR-101 de 3,0 para 2,5 kW e perdas do V-102 de 0,5 para 0,6 kW
+    antes = avaliar_lotes(parametros)
+    depois = avaliar_lotes({**parametros, 'Q_perdas_V102': 0.6},
+                           equipamentos=sobrepor_equipamentos(C.equipamentos_processo, {'FR-101': {'P_nom': 2.5}}))
+
+    with tempfile.TemporaryDirectory() as pasta:
+        # 'depois' embaralhado e sem os 1000 primeiros lotes: exige ordenação e junção por id
+        ordem = rng.permutation(np.arange(1000, n))
+        gravar_resultados(os.path.join(pasta, 'antes'), antes)
+        embaralhado = {c: np.broadcast_to(v, (n,))[ordem] for c, v in depois.items()}
+        gravar_resultados(os.path.join(pasta, 'depois'), embaralhado, ids=ordem)
+
+        t0 = time.perf_counter()
+        comparacao = comparar_resultados(abrir_resultados(os.path.join(pasta, 'antes')),
+                                         abrir_resultados(os.path.join(pasta, 'depois')), tamanho_bloco=250_000)
+        duracao = time.perf_counter() - t0
+
+    print(f"=== {comparacao['n_comuns']:,} lotes comparados em {duracao:.1f} s "
+          f"(apenas antes: {comparacao['apenas_antes']}, apenas depois: {comparacao['apenas_depois']}) ===")
+    colunas = ['campo', 'n_alterados', 'delta_medio', 'delta_max', 'delta_rel_max_pct']
+    for grupo in ('equipamento', 'chiller', 'total'):
+        print(f"\n{grupo.upper()}:")
+        print(maiores_mudancas(comparacao, grupo, n=5)[colunas].to_string(index=False, float_format='%.4f'))
+    print("\nLotes com maior variação de kWh/kg:")
+    print(comparacao['lotes'].head(3).to_string(index=False))
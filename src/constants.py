@@ -44,11 +44,33 @@ COP_chiller = 3.0                    # coeficiente de performance
 # Eficiência do secador
 eficiencia_secador = 0.8             # 80% eficiente (20% perdas)
 
+# Mapas de desempenho em carga parcial (src/desempenho.py)
+T_evaporador_chiller = 4             # temperatura de evaporação do FT-101 (°C)
+T_condensacao_chiller = 35           # condensação a ar (ambiente + ~10 K) (°C)
+capacidade_chiller_kW = 15.0         # capacidade frigorífica nominal (5 kW elétricos × COP 3)
+fracao_carga_minima_chiller = 0.10   # abaixo disso o compressor cicla liga/desliga
+coef_degradacao_ciclagem = 0.25      # Cd - perda por ciclagem abaixo da carga mínima
+curva_EIR_carga_parcial = (0.06369, 0.58488, 0.35280)  # EIR(PLR) = a + b·PLR + c·PLR² (DOE-2)
+P_nominal_secador_kW = 6.0           # potência elétrica nominal do TDR-101
+fracao_perdas_fixas_secador = 0.10   # ventilador/controles - penaliza carga parcial
+
 # Fatores de dissipação mecânica (fração que vira calor)
 fator_agitacao_calor = 0.35         # agitador FR-101
 fator_aeracao_calor = 0.20          # soprador BLW-101  
 fator_bomba_calor = 0.20            # bombas PUMPS
 
+# Fração da energia elétrica de cada equipamento que vira calor (diagrama de fluxos)
+fatores_dissipacao = {
+    'FR-101': fator_agitacao_calor,
+    'BLW-101': fator_aeracao_calor,
+    'PUMPS': fator_bomba_calor
+}
+fator_dissipacao_padrao = 0.70      # demais equipamentos mecânicos
+
+# Integração térmica (src/integracao_termica.py)
+dT_min_integracao = 10              # diferença mínima de temperatura entre correntes (K)
+T_dissipacao_mecanica = 30          # calor de agitação/aeração removido na temperatura do caldo (°C)
+
 # Perdas térmicas para o ambiente (estimadas)
 Q_perdas_V102 = 0.5                # tanque cristalização (kW)
 Q_perdas_TDR101 = 2.0              # secador de bandeja (kW)
@@ -74,7 +96,8 @@ Q_perdas_TDR101 = 2.0              # secador de bandeja (kW)
 
 equipamentos_processo = {
     'SFR-101':   {'P_nom': 0.15, 'tempo': 24},    # Shake-flask – valor Grok
-    'SFR-102':   {'P_nom': 1.00, 'tempo': 48},    # Seed fermentor – valor Grok
+    'SFR-102':   {'P_nom': 1.00, 'tempo': 48,     # Seed fermentor – valor Grok
+                  'perfil': ((48, 0.5, 1.0),)},  # trechos (src.perfis): rampa 50→100 % (P_avg 0,75 kW)
     'V-104':     {'P_nom': 0.50, 'tempo': 8},     # Tanque de óleo – valor Grok
     'DE-101':    {'P_nom': 0.40, 'tempo': 2},     # Filtro cartucho – valor Grok
     'FR-101':    {'P_nom': 3.00, 'tempo': 168},   # Biorreator (agitador) – consenso GPT / Gemini
@@ -90,6 +113,141 @@ equipamentos_processo = {
     'PUMPS':     {'P_nom': 5.00, 'tempo': 2}      # Bombas de transferência – valor Grok
 }
 
+# Escalonamento (scale-up) a partir do FR-101 de referência
+V_reator_referencia_m3 = 1.0         # "Agitador 1 m³"
+
+# Expoentes das leis de potência P ∝ (V/V_ref)^n por equipamento
+expoentes_potencia_escalonamento = {
+    'SFR-101':   0.0,                # shake-flasks não mudam com a escala
+    'SFR-102':   1.0,                # trem de inóculo proporcional ao volume
+    'V-104':     1.0,
+    'DE-101':    0.8,
+    'FR-101':    1.0,                # P/V constante
+    'BLW-101':   1.0,                # vvm constante
+    'AF-101':    1.0,
+    'V-109':     0.8,
+    'SC-101':    0.8,
+    'V-102':     1.0,
+    'BCFBD-101': 0.8,
+    'DS-101':    0.8,
+    'PUMPS':     0.8
+}
+
+expoente_perdas_escalonamento = 2 / 3        # perdas térmicas ∝ área ∝ V^(2/3)
+expoente_utilidades_escalonamento = 0.6      # utilidades ∝ porte da instalação
+
+# Sequência nominal do lote: início de cada equipamento (h após a inoculação do SFR-101)
+inicio_equipamentos = {
+    'SFR-101':   0,
+    'SFR-102':   24,
+    'V-104':     64,
+    'DE-101':    70,
+    'FR-101':    72,
+    'BLW-101':   72,
+    'AF-101':    72,
+    'PUMPS':     240,                # transferência do caldo para o decantador
+    'V-109':     242,
+    'SC-101':    245,
+    'DS-101':    245,
+    'V-102':     246,
+    'FT-101':    246,                # 5h resfriamento + 6h cristalização + 2h lavagem
+    'BCFBD-101': 259,
+    'TDR-101':   263
+}
+
+duracao_lote_h = 275                 # da inoculação ao fim da secagem
+
+# Precedências (término → início) da sequência do processo
+precedencias_processo = [
+    ('FR-101', 'PUMPS'),
+    ('PUMPS', 'V-109'),
+    ('V-109', 'SC-101'),
+    ('V-109', 'DS-101'),
+    ('SC-101', 'V-102'),
+    ('SC-101', 'FT-101'),
+    ('FT-101', 'BCFBD-101'),
+    ('BCFBD-101', 'TDR-101')
+]
+
+# Equipamentos com início flexível: atraso máximo (h) após ficarem liberados
+folga_equipamentos = {
+    'PUMPS':     4,
+    'V-109':     4,
+    'DS-101':    8,
+    'FT-101':    2,                  # cristais aguardam no V-102
+    'BCFBD-101': 6,
+    'TDR-101':   8
+}
+
+atraso_maximo_lote_h = 12            # atraso tolerado no término do lote
+
+# Recursos compartilhados entre lotes (src/simulacao.py): uma unidade de cada
+recursos_planta = {
+    'trem_chiller': {'equipamentos': ('V-102', 'FT-101'), 'unidades': 1, 'retem_lote': True,
+                     'perdas_espera': 'Q_perdas_V102'},   # cristais aguardam a BCFBD-101 no V-102 refrigerado
+    'DS-101':       {'equipamentos': ('DS-101',), 'unidades': 1},
+    'BCFBD-101':    {'equipamentos': ('BCFBD-101',), 'unidades': 1,
+                     'retem_lote': True},                 # torta úmida aguarda o TDR-101 (sem pulmão)
+    'TDR-101':      {'equipamentos': ('TDR-101',), 'unidades': 1}
+}
+
+# Ajustes controláveis do processo: limites (mín, máx) para otimização
+limites_otimizacao = {
+    't_secagem': (6, 24),                      # h
+    'T_secagem': (35, 60),                     # °C
+    't_manutencao_cristalizacao': (4, 10),     # h
+    'm_etanol_lavagem': (50, 100),             # kg
+    'T_cristalizacao': (2, 8)                  # °C
+}
+
+t_secagem_min_por_kg_agua = 10.0    # h de secagem por kg de água a evaporar (a 45 °C)
+razao_min_etanol_lavagem = 0.75     # kg etanol / kg SF cristalizado
+
+# Calibração bayesiana: faixas das distribuições a priori (uniformes)
+priores_calibracao = {
+    'fator_agitacao_calor': (0.0, 1.0),
+    'Q_perdas_V102': (0.0, 2.0),             # kW
+    'Q_perdas_TDR101': (0.5, 5.0),           # kW
+    'COP_chiller': (1.5, 6.0),
+    'eficiencia_secador': (0.5, 1.0)
+}
+
+erro_relativo_medicao = 0.05        # desvio-padrão relativo das energias medidas por lote
+R_hat_maximo_calibracao = 1.01      # convergência: R̂ de todas as constantes abaixo disto
+passos_por_tau_calibracao = 50      # e cadeia mantida com pelo menos 50 τ
+
+# Monitoramento em tempo real (src/monitoramento.py)
+janela_monitor_amostras = 300       # média móvel de 5 min em leituras a 1 Hz
+tolerancia_monitor_potencia = 0.25  # |P média − P modelo| / P média do equipamento que dispara alarme
+tolerancia_monitor_energia = 0.10   # |E acumulada − curva do modelo| / E do equipamento no lote
+intervalo_maximo_amostra_s = 10     # lacunas maiores entre leituras não são integradas
+
+# Modelo substituto (src/substituto.py): faixas de treino das entradas
+dominio_substituto = {
+    't_secagem': (6, 24),                      # h
+    'T_secagem': (35, 60),                     # °C
+    't_manutencao_cristalizacao': (4, 10),     # h
+    'm_etanol_lavagem': (50, 100),             # kg
+    'T_cristalizacao': (2, 8),                 # °C
+    'COP_chiller': (2.0, 5.0),
+    'Q_perdas_V102': (0.0, 2.0),               # kW
+    'Q_perdas_TDR101': (0.5, 5.0)              # kW
+}
+
+# Varreduras distribuídas (src/fila.py)
+lease_tarefa_s = 300                # prazo de reserva de um bloco; vencido, o bloco volta à fila
+max_tentativas_tarefa = 3           # reservas por bloco antes de marcá-lo como 'falhou'
+
+# Tarifa horo-sazonal (verde A4) e emissões da rede
+tarifa_energia = {
+    'ponta': 2.10,                   # R$/kWh (dias úteis, horas_ponta)
+    'fora_ponta': 0.48,              # R$/kWh
+    'horas_ponta': (18, 21),         # [início, fim) em hora local
+    'demanda': 38.0                  # R$/kW·mês sobre o pico medido no mês
+}
+
+fator_emissao_rede = 0.0385         # kg CO2/kWh (média do SIN)
+
 # Consumos independentes do processo
 utilidades_fixas = {
     'HVAC': 1596,                    # climatização (9.5 kW × 168h)
@@ -101,6 +259,7 @@ utilidades_fixas = {
 }
 
 E_utilidades_fixas_total = 3461     # kWh/lote
+horas_referencia_utilidades = 168   # utilidades_fixas = kW × 168 h (fermentação no FR-101) - src/rateio.py
 
 # Conversões energéticas
 kJ_para_kWh = 1/3600                # 1 kWh = 3600 kJ
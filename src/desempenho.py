@@ -0,0 +1,199 @@
+"""
+desempenho.py - Mapas de Desempenho do Chiller (FT-101) e do Secador (TDR-101)
+COP(T_evap, T_cond, fração de carga) e eficiência do secador vs carga,
+pré-calculados em grades e consultados por interpolação vetorizada
+"""
+
+import numpy as np
+
+from src import constants as C
+
+T_ZERO_ABSOLUTO = 273.15
+
+
+def _localizar(grade, valores):
+    """
+    Localiza valores numa grade crescente para interpolação linear
+
+    Args:
+        grade: array 1D crescente
+        valores: array de consulta (qualquer formato)
+
+    Returns:
+        (índice inferior, peso do ponto superior) - valores fora da grade são saturados
+    """
+    valores = np.clip(valores, grade[0], grade[-1])
+    i = np.clip(np.searchsorted(grade, valores, side='right') - 1, 0, len(grade) - 2)
+    peso = (valores - grade[i]) / (grade[i + 1] - grade[i])
+    return i, peso
+
+
+def interpolar_linear(grade, tabela, x):
+    """Interpolação linear vetorizada em grade 1D (saturada nas bordas)"""
+    i, wx = _localizar(grade, np.asarray(x, dtype=float))
+    return tabela[i] * (1 - wx) + tabela[i + 1] * wx
+
+
+def interpolar_bilinear(grade_x, grade_y, tabela, x, y):
+    """
+    Interpolação bilinear vetorizada em grade 2D (saturada nas bordas)
+
+    Args:
+        grade_x, grade_y: eixos crescentes da grade
+        tabela: array (len(grade_x), len(grade_y))
+        x, y: pontos de consulta (arrays com formatos compatíveis por broadcast)
+
+    Returns:
+        Valores interpolados no formato do broadcast de x e y
+    """
+    x, y = np.broadcast_arrays(np.asarray(x, dtype=float), np.asarray(y, dtype=float))
+    i, wx = _localizar(grade_x, x)
+    j, wy = _localizar(grade_y, y)
+    return (tabela[i, j] * (1 - wx) * (1 - wy) +
+            tabela[i + 1, j] * wx * (1 - wy) +
+            tabela[i, j + 1] * (1 - wx) * wy +
+            tabela[i + 1, j + 1] * wx * wy)
+
+
+def curva_carga_parcial_chiller(fracao_carga, coef_EIR=C.curva_EIR_carga_parcial,
+                                fracao_minima=C.fracao_carga_minima_chiller,
+                                coef_degradacao=C.coef_degradacao_ciclagem):
+    """
+    Fator multiplicativo do COP em carga parcial: COP(PLR) = COP_plena × fator(PLR)
+
+    Acima da carga mínima: fator = PLR / EIR(PLR), com EIR normalizado em PLR = 1.
+    Abaixo dela o compressor cicla e perde (1 - Cd·(1 - PLR/PLR_min)).
+
+    Args:
+        fracao_carga: PLR = carga térmica / capacidade nominal (0-1)
+        coef_EIR: coeficientes (a, b, c) da curva EIR(PLR)
+        fracao_minima: PLR mínimo de operação contínua
+        coef_degradacao: coeficiente de degradação por ciclagem Cd
+
+    Returns:
+        Fator de COP (adimensional)
+    """
+    a, b, c = coef_EIR
+    eir = lambda plr: a + b * plr + c * plr ** 2
+    plr = np.clip(np.asarray(fracao_carga, dtype=float), 0.0, 1.0)
+    plr_op = np.maximum(plr, fracao_minima)
+    fator = plr_op / eir(plr_op) * eir(1.0)
+    ciclagem = 1 - coef_degradacao * (1 - plr / fracao_minima)
+    return np.where(plr < fracao_minima, fator * ciclagem, fator)
+
+
+class MapaCOPChiller:
+    """
+    Mapa COP(T_evap, T_cond, fração de carga) do chiller FT-101
+
+    COP em plena carga numa grade (T_evap × T_cond) e fator de carga parcial
+    numa grade 1D - a consulta é bilinear × linear, vetorizada
+    """
+
+    def __init__(self, grade_T_evap, grade_T_cond, cop_plena_carga, grade_carga, fator_carga,
+                 capacidade_kW=C.capacidade_chiller_kW, T_evaporador=C.T_evaporador_chiller,
+                 T_condensacao=C.T_condensacao_chiller):
+        self.grade_T_evap = np.asarray(grade_T_evap, dtype=float)
+        self.grade_T_cond = np.asarray(grade_T_cond, dtype=float)
+        self.cop_plena_carga = np.asarray(cop_plena_carga, dtype=float)
+        self.grade_carga = np.asarray(grade_carga, dtype=float)
+        self.fator_carga = np.asarray(fator_carga, dtype=float)
+        self.capacidade_kW = capacidade_kW
+        self.T_evaporador = T_evaporador
+        self.T_condensacao = T_condensacao
+
+    @classmethod
+    def padrao(cls, COP_nominal=C.COP_chiller, T_evap_nominal=C.T_evaporador_chiller,
+               T_cond_nominal=C.T_condensacao_chiller, **kwargs):
+        """
+        Constrói o mapa a partir de uma fração de Carnot fixa, calibrada para
+        que COP(T_evap_nominal, T_cond_nominal, carga plena) = COP_nominal
+        """
+        grade_T_evap = np.arange(-15.0, 20.0 + 1, 1.0)
+        grade_T_cond = np.arange(20.0, 55.0 + 1, 1.0)
+        carnot = lambda te, tc: (te + T_ZERO_ABSOLUTO) / np.maximum(tc - te, 5.0)
+        fracao_carnot = COP_nominal / carnot(T_evap_nominal, T_cond_nominal)
+        cop_plena = fracao_carnot * carnot(grade_T_evap[:, None], grade_T_cond[None, :])
+
+        grade_carga = np.linspace(0.0, 1.0, 201)
+        fator_carga = curva_carga_parcial_chiller(grade_carga)
+        return cls(grade_T_evap, grade_T_cond, cop_plena, grade_carga, fator_carga,
+                   T_evaporador=T_evap_nominal, T_condensacao=T_cond_nominal, **kwargs)
+
+    def cop(self, T_evap, T_cond, fracao_carga):
+        """COP vetorizado para temperaturas (°C) e fração de carga (0-1)"""
+        return (interpolar_bilinear(self.grade_T_evap, self.grade_T_cond, self.cop_plena_carga,
+                                    T_evap, T_cond) *
+                interpolar_linear(self.grade_carga, self.fator_carga, fracao_carga))
+
+    def cop_na_carga(self, carga_kW, T_evap=None, T_cond=None):
+        """
+        COP na carga térmica média informada
+
+        Args:
+            carga_kW: calor removido médio (kW)
+            T_evap, T_cond: temperaturas (°C) - padrão: as de projeto do mapa
+
+        Returns:
+            COP efetivo
+        """
+        T_evap = self.T_evaporador if T_evap is None else T_evap
+        T_cond = self.T_condensacao if T_cond is None else T_cond
+        return self.cop(T_evap, T_cond, np.asarray(carga_kW, dtype=float) / self.capacidade_kW)
+
+
+class MapaEficienciaSecador:
+    """
+    Eficiência do secador TDR-101 em função da fração de carga térmica
+
+    η(x) = η_nom × x / (x + f0·(1 - x)), com f0 a fração de perdas fixas
+    (ventilador, controles), pré-calculada numa grade 1D
+    """
+
+    def __init__(self, grade_carga, eficiencia, potencia_nominal_kW=C.P_nominal_secador_kW,
+                 eficiencia_nominal=C.eficiencia_secador):
+        self.grade_carga = np.asarray(grade_carga, dtype=float)
+        self.tabela_eficiencia = np.asarray(eficiencia, dtype=float)
+        self.potencia_nominal_kW = potencia_nominal_kW
+        self.eficiencia_nominal = eficiencia_nominal
+
+    @classmethod
+    def padrao(cls, eficiencia_nominal=C.eficiencia_secador,
+               fracao_perdas_fixas=C.fracao_perdas_fixas_secador, **kwargs):
+        """Constrói a curva padrão η(x) a partir das constantes do projeto"""
+        grade_carga = np.linspace(0.0, 1.0, 201)
+        x = np.maximum(grade_carga, 1e-3)
+        eficiencia = eficiencia_nominal * x / (x + fracao_perdas_fixas * (1 - x))
+        return cls(grade_carga, eficiencia, eficiencia_nominal=eficiencia_nominal, **kwargs)
+
+    def eficiencia(self, fracao_carga):
+        """Eficiência vetorizada para fração de carga (0-1)"""
+        return interpolar_linear(self.grade_carga, self.tabela_eficiencia, fracao_carga)
+
+    def eficiencia_na_carga(self, carga_kW):
+        """
+        Eficiência na carga térmica média informada
+
+        Args:
+            carga_kW: calor fornecido médio (kW)
+
+        Returns:
+            Eficiência efetiva (0-1)
+        """
+        capacidade_termica_kW = self.potencia_nominal_kW * self.eficiencia_nominal
+        return self.eficiencia(np.asarray(carga_kW, dtype=float) / capacidade_termica_kW)
+
+
+# Exemplo de uso
+if __name__ == "__main__":
+    mapa_cop = MapaCOPChiller.padrao()
+    mapa_secador = MapaEficienciaSecador.padrao()
+
+    print("=== MAPA COP FT-101 ===")
+    for fracao in (1.0, 0.5, 0.1, 0.055):
+        print(f"PLR {fracao:5.3f}: COP = {float(mapa_cop.cop(4, 35, fracao)):.2f}")
+    print(f"Carga média 0,82 kW: COP = {float(mapa_cop.cop_na_carga(0.82)):.2f}")
+
+    print("\n=== EFICIÊNCIA TDR-101 ===")
+    for fracao in (1.0, 0.5, 0.2):
+        print(f"Carga {fracao:4.2f}: η = {float(mapa_secador.eficiencia(fracao)):.3f}")
@@ -0,0 +1,86 @@
+"""
+escalonamento.py - Balanço Energético para Vários Tamanhos de Reator
+Escala massas linearmente, potências de agitação/aeração por leis de potência,
+perdas térmicas pela área e utilidades pelo porte da instalação, avaliando a
+grade inteira de volumes numa única chamada vetorizada.
+"""
+
+import numpy as np
+
+from src import constants as C
+from src.lotes import PARAMETROS, avaliar_lotes
+
+PARAMETROS_MASSA = tuple(nome for nome in PARAMETROS if nome.startswith('m_'))
+PARAMETROS_PERDAS = ('Q_perdas_V102', 'Q_perdas_TDR101')
+
+
+def parametros_escalonados(volumes_m3, V_referencia_m3=None, expoentes_potencia=None,
+                           expoente_perdas=None, expoente_utilidades=None, equipamentos=None):
+    """
+    Parâmetros e equipamentos escalonados para uma grade de volumes de reator
+
+    Args:
+        volumes_m3: volumes do FR-101 (m³) - array
+        V_referencia_m3: volume de referência (padrão: C.V_reator_referencia_m3)
+        expoentes_potencia: {codigo: n} em P ∝ (V/V_ref)^n (padrão: C.expoentes_potencia_escalonamento;
+                            equipamentos ausentes escalam linearmente)
+        expoente_perdas: expoente das perdas Q_perdas_* (padrão: 2/3 - área)
+        expoente_utilidades: expoente das utilidades fixas (padrão: C.expoente_utilidades_escalonamento)
+        equipamentos: equipamentos de referência (padrão: C.equipamentos_processo)
+
+    Returns:
+        (parametros, equipamentos) prontos para avaliar_lotes, com arrays no formato de volumes_m3
+    """
+    V_referencia_m3 = C.V_reator_referencia_m3 if V_referencia_m3 is None else V_referencia_m3
+    expoentes_potencia = C.expoentes_potencia_escalonamento if expoentes_potencia is None else expoentes_potencia
+    expoente_perdas = C.expoente_perdas_escalonamento if expoente_perdas is None else expoente_perdas
+    expoente_utilidades = (C.expoente_utilidades_escalonamento if expoente_utilidades is None
+                           else expoente_utilidades)
+    equipamentos = C.equipamentos_processo if equipamentos is None else equipamentos
+
+    escala = np.asarray(volumes_m3, dtype=float) / V_referencia_m3
+
+    parametros = {nome: getattr(C, nome) * escala for nome in PARAMETROS_MASSA}
+    parametros.update({nome: getattr(C, nome) * escala ** expoente_perdas for nome in PARAMETROS_PERDAS})
+    parametros['E_utilidades_fixas_total'] = C.E_utilidades_fixas_total * escala ** expoente_utilidades
+
+    escalonados = {}
+    for codigo, dados in equipamentos.items():
+        if isinstance(dados['P_nom'], str):          # FT-101/TDR-101: calculados pelo balanço
+            escalonados[codigo] = dados
+        else:
+            escalonados[codigo] = {**dados, 'P_nom': dados['P_nom'] * escala ** expoentes_potencia.get(codigo, 1.0)}
+    return parametros, escalonados
+
+
+def balanco_escalonado(volumes_m3, **kwargs):
+    """
+    Curvas de energia e kWh/kg ao longo de uma grade de volumes de reator
+
+    Args:
+        volumes_m3: volumes do FR-101 (m³)
+        **kwargs: repassados a parametros_escalonados
+
+    Returns:
+        dict de colunas de avaliar_lotes, mais 'volume_m3'
+    """
+    parametros, equipamentos = parametros_escalonados(volumes_m3, **kwargs)
+    resultado = avaliar_lotes(parametros, equipamentos)
+    resultado['volume_m3'] = np.broadcast_to(np.asarray(volumes_m3, dtype=float),
+                                             resultado['energia_total'].shape)
+    return resultado
+
+
+# Exemplo de uso
+if __name__ == "__main__":
+    from formatacao_brasileira import formatar_energia_brasileiro, formatar_numero_brasileiro
+
+    volumes = np.array([0.5, 1.0, 2.0, 5.0, 10.0, 20.0])
+    curva = balanco_escalonado(volumes)
+
+    print("=== ESCALONAMENTO DO FR-101 ===")
+    for i, V in enumerate(volumes):
+        print(f"{formatar_numero_brasileiro(V, 1):>5} m³ | "
+              f"{formatar_energia_brasileiro(curva['energia_total'][i], 0):>12} | "
+              f"{formatar_numero_brasileiro(curva['massa_produto'][i], 1):>7} kg | "
+              f"{formatar_numero_brasileiro(curva['consumo_especifico'][i], 1):>6} kWh/kg")
@@ -0,0 +1,300 @@
+"""
+exportacao.py - Exportação em Bloco para Excel (.xlsx)
+Grava as tabelas por lote (energia por equipamento, componentes térmicos do
+chiller/secador e totais) em streaming: cada planilha é escrita bloco a bloco
+em XML num arquivo temporário e o .xlsx é montado no final, com memória
+constante. Os números ficam numéricos, com formatos pt-BR aplicados como
+estilo de célula.
+"""
+
+import os
+import shutil
+import tempfile
+import zipfile
+from xml.sax.saxutils import escape
+
+import numpy as np
+
+# Estilos de célula (índices de cellXfs em styles.xml)
+ESTILO_PADRAO = 0
+ESTILO_2_DECIMAIS = 1     # 1.234,57
+ESTILO_1_DECIMAL = 2      # 1.234,6
+ESTILO_INTEIRO = 3        # 1.235
+ESTILO_CABECALHO = 4      # negrito
+
+_STYLES_XML = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">
+<numFmts count="3">
+<numFmt numFmtId="164" formatCode="[$-416]#,##0.00"/>
+<numFmt numFmtId="165" formatCode="[$-416]#,##0.0"/>
+<numFmt numFmtId="166" formatCode="[$-416]#,##0"/>
+</numFmts>
+<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font><font><b/><sz val="11"/><name val="Calibri"/></font></fonts>
+<fills count="2"><fill><patternFill patternType="none"/></fill><fill><patternFill patternType="gray125"/></fill></fills>
+<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>
+<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>
+<cellXfs count="5">
+<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>
+<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>
+<xf numFmtId="165" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>
+<xf numFmtId="166" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>
+<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/>
+</cellXfs>
+<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>
+</styleSheet>"""
+
+MAX_LINHAS_EXCEL = 1_048_576        # incluindo o cabeçalho
+
+_NS_PLANILHA = 'xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"'
+_NS_REL = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+
+
+def _celula_texto(texto, estilo=ESTILO_PADRAO):
+    return f'<c t="inlineStr" s="{estilo}"><is><t>{escape(str(texto))}</t></is></c>'
+
+
+class EscritorXlsx:
+    """
+    Escritor .xlsx em streaming (somente escrita)
+
+    Uso:
+        with EscritorXlsx('saida.xlsx') as xlsx:
+            xlsx.planilha('Resumo', ['Lote', 'Energia (kWh)'], [ESTILO_INTEIRO, ESTILO_1_DECIMAL])
+            xlsx.escrever('Resumo', [lotes, energias])      # quantas vezes for preciso
+
+    Colunas numéricas são gravadas como números (NaN e ±inf viram célula vazia,
+    booleanos 0/1); colunas de texto (dtype object/str) como texto em linha.
+
+    OOXML escrito à mão (em vez do modo write_only do openpyxl) por velocidade;
+    o exemplo do módulo relê a saída com openpyxl para conferir a validade.
+    """
+
+    def __init__(self, caminho, compressao=1):
+        self.caminho = caminho
+        self.compressao = compressao
+        self.pasta_temporaria = tempfile.mkdtemp(dir=os.path.dirname(os.path.abspath(caminho)))
+        self.planilhas = {}
+
+    def planilha(self, nome, cabecalho, estilos, larguras=None):
+        """Abre uma planilha e grava o cabeçalho"""
+        arquivo = open(os.path.join(self.pasta_temporaria, f'sheet{len(self.planilhas) + 1}.xml'), 'w',
+                       encoding='utf-8')
+        colunas_xml = ''.join(f'<col min="{i}" max="{i}" width="{largura}" customWidth="1"/>'
+                              for i, largura in enumerate(larguras or [16] * len(cabecalho), start=1))
+        arquivo.write(f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n<worksheet {_NS_PLANILHA}>'
+                      f'<sheetViews><sheetView workbookViewId="0"><pane ySplit="1" topLeftCell="A2" '
+                      f'activePane="bottomLeft" state="frozen"/></sheetView></sheetViews>'
+                      f'<cols>{colunas_xml}</cols><sheetData>')
+        arquivo.write('<row>' + ''.join(_celula_texto(titulo, ESTILO_CABECALHO) for titulo in cabecalho) + '</row>')
+        self.planilhas[nome] = {'arquivo': arquivo, 'estilos': list(estilos),
+                                'modelo': '<row>' + '{}' * len(cabecalho) + '</row>', 'linhas': 1}
+
+    def escrever(self, nome, colunas):
+        """Acrescenta um bloco de linhas (lista de colunas de mesmo comprimento)"""
+        planilha = self.planilhas[nome]
+        if planilha['linhas'] + len(colunas[0]) > MAX_LINHAS_EXCEL:
+            raise ValueError(f"Planilha '{nome}' excederia o limite do Excel de {MAX_LINHAS_EXCEL:,} linhas")
+        celulas = []
+        for coluna, estilo in zip(colunas, planilha['estilos']):
+            coluna = np.asarray(coluna)
+            if coluna.dtype.kind in 'OUS':
+                celulas.append([_celula_texto(v, estilo) for v in coluna.tolist()])
+                continue
+            if coluna.dtype.kind == 'b':
+                coluna = coluna.astype(np.int8)
+            abre, fecha, vazia = f'<c s="{estilo}"><v>', '</v></c>', f'<c s="{estilo}"/>'
+            if coluna.dtype.kind in 'iu':
+                celulas.append([abre + str(v) + fecha for v in coluna.tolist()])
+            else:   # NaN e ±inf não têm representação numérica no .xlsx
+                celulas.append([abre + repr(v) + fecha if finito else vazia
+                                for v, finito in zip(coluna.tolist(), np.isfinite(coluna).tolist())])
+        planilha['arquivo'].write(''.join(map(planilha['modelo'].format, *celulas)))
+        planilha['linhas'] += len(celulas[0]) if celulas else 0
+
+    def fechar(self):
+        """Finaliza as planilhas e monta o .xlsx (gravação atômica)"""
+        nomes = list(self.planilhas)
+        for planilha in self.planilhas.values():
+            planilha['arquivo'].write('</sheetData></worksheet>')
+            planilha['arquivo'].close()
+
+        sheets = ''.join(f'<sheet name="{escape(nome)}" sheetId="{i}" r:id="rId{i}"/>'
+                         for i, nome in enumerate(nomes, start=1))
+        rels = ''.join(f'<Relationship Id="rId{i}" Type="{_NS_REL}/worksheet" Target="worksheets/sheet{i}.xml"/>'
+                       for i in range(1, len(nomes) + 1))
+        rels += (f'<Relationship Id="rId{len(nomes) + 1}" Type="{_NS_REL}/styles" Target="styles.xml"/>')
+        overrides = ''.join(f'<Override PartName="/xl/worksheets/sheet{i}.xml" ContentType="application/'
+                            f'vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+                            for i in range(1, len(nomes) + 1))
+
+        temporario = os.path.join(self.pasta_temporaria, 'saida.xlsx')
+        with zipfile.ZipFile(temporario, 'w', zipfile.ZIP_DEFLATED, compresslevel=self.compressao) as z:
+            z.writestr('[Content_Types].xml',
+                       '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                       '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+                       '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+                       '<Default Extension="xml" ContentType="application/xml"/>'
+                       '<Override PartName="/xl/workbook.xml" ContentType="application/'
+                       'vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+                       '<Override PartName="/xl/styles.xml" ContentType="application/'
+                       'vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+                       f'{overrides}</Types>')
+            z.writestr('_rels/.rels',
+                       '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                       '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+                       f'<Relationship Id="rId1" Type="{_NS_REL}/officeDocument" Target="xl/workbook.xml"/>'
+                       '</Relationships>')
+            z.writestr('xl/workbook.xml',
+                       f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n<workbook {_NS_PLANILHA} '
+                       f'xmlns:r="{_NS_REL}"><sheets>{sheets}</sheets></workbook>')
+            z.writestr('xl/_rels/workbook.xml.rels',
+                       '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                       '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+                       f'{rels}</Relationships>')
+            z.writestr('xl/styles.xml', _STYLES_XML)
+            for i in range(1, len(nomes) + 1):
+                z.write(os.path.join(self.pasta_temporaria, f'sheet{i}.xml'), f'xl/worksheets/sheet{i}.xml')
+        os.replace(temporario, self.caminho)
+        shutil.rmtree(self.pasta_temporaria, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, valor, traceback):
+        if tipo is None:
+            self.fechar()
+        else:
+            for planilha in self.planilhas.values():
+                planilha['arquivo'].close()
+            shutil.rmtree(self.pasta_temporaria, ignore_errors=True)
+        return False
+
+
+# Colunas térmicas exportadas: (coluna de avaliar_lotes, título)
+COLUNAS_TERMICAS = (
+    ('chiller.Q_sf_sensivel_kJ', 'Chiller SF sensível (kJ)'),
+    ('chiller.Q_sf_latente_kJ', 'Chiller SF latente (kJ)'),
+    ('chiller.Q_biomassa_inicial_kJ', 'Chiller biomassa (kJ)'),
+    ('chiller.Q_HCl_inicial_kJ', 'Chiller HCl (kJ)'),
+    ('chiller.Q_etanol_sensivel_kJ', 'Chiller etanol (kJ)'),
+    ('chiller.Q_perdas_total_kJ', 'Chiller perdas (kJ)'),
+    ('chiller.Q_total_remover_kJ', 'Chiller Q total (kJ)'),
+    ('chiller.E_eletrica_total_kWh', 'Chiller elétrica (kWh)'),
+    ('secador.Q_cristais_sensivel_kJ', 'Secador cristais (kJ)'),
+    ('secador.Q_agua_sensivel_kJ', 'Secador água sensível (kJ)'),
+    ('secador.Q_agua_latente_kJ', 'Secador água latente (kJ)'),
+    ('secador.Q_etanol_sensivel_kJ', 'Secador etanol sensível (kJ)'),
+    ('secador.Q_etanol_latente_kJ', 'Secador etanol latente (kJ)'),
+    ('secador.Q_perdas_kJ', 'Secador perdas (kJ)'),
+    ('secador.Q_total_fornecer_kJ', 'Secador Q total (kJ)'),
+    ('secador.E_eletrica_total_kWh', 'Secador elétrica (kWh)')
+)
+
+COLUNAS_RESUMO = (
+    ('energia_processo', 'Processo (kWh)', ESTILO_1_DECIMAL),
+    ('energia_utilidades', 'Utilidades (kWh)', ESTILO_1_DECIMAL),
+    ('energia_total', 'Total (kWh)', ESTILO_1_DECIMAL),
+    ('massa_produto', 'Produto (kg)', ESTILO_1_DECIMAL),
+    ('consumo_especifico', 'Consumo específico (kWh/kg)', ESTILO_2_DECIMAIS)
+)
+
+
+def exportar_lotes(caminho, blocos, tamanho_bloco=50_000, compressao=1):
+    """
+    Exporta os resultados por lote para Excel (planilhas Equipamentos, Térmico e Resumo)
+
+    Args:
+        caminho: arquivo .xlsx
+        blocos: colunas de avaliar_lotes (arrays 1D por lote) ou iterável de blocos de colunas
+                (ex. campanha avaliada em partes) - a memória usada é a de um bloco
+        tamanho_bloco: linhas formatadas por vez
+        compressao: nível de compressão zip (1 = mais rápido)
+
+    Returns:
+        número de lotes exportados
+    """
+    blocos = [blocos] if isinstance(blocos, dict) else blocos
+    n_lotes = 0
+    with EscritorXlsx(caminho, compressao) as xlsx:
+        for colunas in blocos:
+            n = np.size(colunas['energia_total'])
+            codigos = [nome.split('.', 1)[1] for nome in colunas if nome.startswith('equipamento.')]
+            if not xlsx.planilhas:
+                xlsx.planilha('Equipamentos', ['Lote'] + [f'{c} (kWh)' for c in codigos],
+                              [ESTILO_INTEIRO] + [ESTILO_2_DECIMAIS] * len(codigos), [8] + [14] * len(codigos))
+                xlsx.planilha('Térmico', ['Lote'] + [titulo for _, titulo in COLUNAS_TERMICAS],
+                              [ESTILO_INTEIRO] + [ESTILO_1_DECIMAL] * len(COLUNAS_TERMICAS),
+                              [8] + [22] * len(COLUNAS_TERMICAS))
+                xlsx.planilha('Resumo', ['Lote'] + [titulo for _, titulo, _ in COLUNAS_RESUMO],
+                              [ESTILO_INTEIRO] + [estilo for _, _, estilo in COLUNAS_RESUMO],
+                              [8] + [26] * len(COLUNAS_RESUMO))
+            lotes = np.arange(n_lotes + 1, n_lotes + n + 1)
+            coluna = lambda nome: np.broadcast_to(colunas[nome], (n,))
+            for i in range(0, n, tamanho_bloco):
+                fatia = slice(i, i + tamanho_bloco)
+                xlsx.escrever('Equipamentos', [lotes[fatia]] + [coluna(f'equipamento.{c}')[fatia] for c in codigos])
+                xlsx.escrever('Térmico', [lotes[fatia]] + [coluna(nome)[fatia] for nome, _ in COLUNAS_TERMICAS])
+                xlsx.escrever('Resumo', [lotes[fatia]] + [coluna(nome)[fatia] for nome, _, _ in COLUNAS_RESUMO])
+            n_lotes += n
+    return n_lotes
+
+
+# Exemplo de uso
+if __name__ == "__main__":
+    import time
+
+    import pandas as pd
+
+    from src import constants as C
+    from src.lotes import avaliar_lotes
+
+    def campanha(n_lotes, semente=0):
+        rng = np.random.default_rng(semente)
+        return avaliar_lotes({'m_sf_inicial': C.m_sf_inicial * rng.uniform(0.9, 1.1, n_lotes),
+                              'COP_chiller': rng.uniform(2.5, 3.5, n_lotes)})
+
+    with tempfile.TemporaryDirectory() as pasta:
+        # Ida e volta: valores especiais relidos com openpyxl
+        import openpyxl
+
+        caminho = os.path.join(pasta, 'especiais.xlsx')
+        valores = np.array([1.5, np.nan, np.inf, -np.inf, 0.1])
+        with EscritorXlsx(caminho) as xlsx:
+            xlsx.planilha('Teste', ['Lote', 'Valor', 'Ok', 'Nome'], [ESTILO_INTEIRO, ESTILO_2_DECIMAIS] + [0, 0])
+            xlsx.escrever('Teste', [np.arange(1, 6), valores, valores > 1, np.array(['a', 'b&c', '<d>', 'é', ''])])
+        lidas = list(openpyxl.load_workbook(caminho, read_only=True)['Teste'].iter_rows(values_only=True))
+        print(f"=== Ida e volta com openpyxl: {lidas[1:]} ===")
+
+        # Referência: pandas.to_excel (openpyxl) numa amostra
+        n_amostra = 20_000
+        colunas = campanha(n_amostra)
+        tabela = pd.DataFrame({nome: np.broadcast_to(valor, (n_amostra,)) for nome, valor in colunas.items()})
+        t0 = time.perf_counter()
+        tabela.to_excel(os.path.join(pasta, 'pandas.xlsx'), index=False)
+        t_pandas = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        exportar_lotes(os.path.join(pasta, 'amostra.xlsx'), colunas)
+        t_streaming = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        livro = openpyxl.Workbook(write_only=True)
+        folha = livro.create_sheet('Resumo')
+        folha.append(list(tabela.columns))
+        for linha in tabela.itertuples(index=False):
+            folha.append(list(linha))
+        livro.save(os.path.join(pasta, 'write_only.xlsx'))
+        t_write_only = time.perf_counter() - t0
+        print(f"=== {n_amostra:,} lotes: pandas.to_excel {t_pandas:.1f} s | openpyxl write_only "
+              f"{t_write_only:.1f} s | exportar_lotes {t_streaming:.1f} s "
+              f"({t_write_only / t_streaming:.0f}x mais rápido que write_only) ===")
+        lido = pd.read_excel(os.path.join(pasta, 'amostra.xlsx'), sheet_name='Resumo', engine='openpyxl')
+        print(f"Amostra relida com openpyxl: {len(lido):,} linhas, total igual: "
+              f"{np.allclose(lido['Total (kWh)'], np.broadcast_to(colunas['energia_total'], (n_amostra,)))}")
+
+        # Campanha de 10^6 lotes avaliada e exportada em blocos
+        n_lotes, bloco = 1_000_000, 100_000
+        t0 = time.perf_counter()
+        exportar_lotes(os.path.join(pasta, 'campanha.xlsx'),
+                       (campanha(bloco, semente=i) for i in range(n_lotes // bloco)))
+        duracao = time.perf_counter() - t0
+        tamanho = os.path.getsize(os.path.join(pasta, 'campanha.xlsx')) / 1e6
+        print(f"=== {n_lotes:,} lotes × 3 planilhas em {duracao:.1f} s ({tamanho:.0f} MB) ===")
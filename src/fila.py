@@ -0,0 +1,326 @@
+"""
+fila.py - Varreduras Distribuídas sobre uma Fila de Tarefas
+Divide uma varredura de parâmetros em blocos gravados numa fila SQLite;
+trabalhadores (processos em uma ou várias máquinas apontando para o mesmo
+arquivo) reservam blocos com prazo (lease), avaliam o balanço com
+avaliar_lotes e gravam o resultado. Blocos cujo trabalhador sumiu voltam à
+fila quando o prazo vence; resultados são idempotentes (o primeiro vale,
+repetições são ignoradas) e a mesclagem final junta tudo num único .npz.
+Em várias máquinas o arquivo precisa estar num sistema de arquivos com
+travas confiáveis (o SQLite não é seguro sobre NFS sem travas).
+"""
+
+import hashlib
+import io
+import json
+import os
+import socket
+import sqlite3
+import tempfile
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+from src import constants as C
+from src.lotes import avaliar_lotes
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS tarefas (
+    id INTEGER PRIMARY KEY,
+    varredura TEXT NOT NULL,
+    indice INTEGER NOT NULL,
+    chave TEXT NOT NULL,
+    parametros BLOB NOT NULL,
+    opcoes TEXT NOT NULL,
+    estado TEXT NOT NULL DEFAULT 'pendente',
+    trabalhador TEXT,
+    prazo REAL,
+    tentativas INTEGER NOT NULL DEFAULT 0,
+    max_tentativas INTEGER NOT NULL,
+    resultado BLOB,
+    erro TEXT,
+    atualizado REAL,
+    UNIQUE (varredura, indice)
+);
+CREATE INDEX IF NOT EXISTS tarefas_estado ON tarefas (estado, prazo);
+"""
+
+ESTADOS = ('pendente', 'executando', 'concluida', 'falhou')
+
+
+def serializar_colunas(colunas):
+    """dict de arrays → bytes (.npz sem compressão)"""
+    buffer = io.BytesIO()
+    np.savez(buffer, **{nome: np.ascontiguousarray(valor) for nome, valor in colunas.items()})
+    return buffer.getvalue()
+
+
+def desserializar_colunas(dados):
+    """bytes de serializar_colunas → dict de arrays"""
+    with np.load(io.BytesIO(dados)) as arquivo:
+        return {nome: arquivo[nome] for nome in arquivo.files}
+
+
+class FilaTarefas:
+    """Fila de blocos de varredura em um arquivo SQLite (uma conexão por processo)"""
+
+    def __init__(self, caminho, timeout=60.0):
+        self.caminho = caminho
+        self.conexao = sqlite3.connect(caminho, timeout=timeout, isolation_level=None)
+        self.conexao.execute("PRAGMA journal_mode=WAL")
+        self.conexao.execute("PRAGMA synchronous=NORMAL")
+        self.conexao.executescript(ESQUEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+    def fechar(self):
+        self.conexao.close()
+
+    @contextmanager
+    def _transacao(self):
+        """Transação com trava de escrita desde o início (reserva atômica entre processos)"""
+        self.conexao.execute("BEGIN IMMEDIATE")
+        try:
+            yield self.conexao
+        except BaseException:
+            self.conexao.execute("ROLLBACK")
+            raise
+        self.conexao.execute("COMMIT")
+
+    def submeter(self, varredura, parametros, tamanho_bloco=10_000, opcoes=None, max_tentativas=None):
+        """
+        Divide a varredura em blocos e grava na fila
+
+        Submeter de novo a mesma varredura não duplica blocos; um bloco com o
+        mesmo índice e conteúdo diferente é erro.
+
+        Args:
+            varredura: nome da varredura
+            parametros: {constante: array (N,) ou escalar} para avaliar_lotes
+            tamanho_bloco: lotes por tarefa
+            opcoes: argumentos extras de avaliar_lotes (serializáveis em JSON)
+            max_tentativas: reservas permitidas por bloco (padrão: C.max_tentativas_tarefa)
+
+        Returns:
+            número de blocos da varredura
+        """
+        max_tentativas = C.max_tentativas_tarefa if max_tentativas is None else max_tentativas
+        opcoes = json.dumps(opcoes or {}, sort_keys=True)
+        n = max((np.size(v) for v in parametros.values()), default=1)
+        arrays = {nome: np.broadcast_to(np.asarray(v, dtype=float), (n,)) for nome, v in parametros.items()}
+
+        linhas = []
+        for indice, inicio in enumerate(range(0, n, tamanho_bloco)):
+            bloco = serializar_colunas({nome: v[inicio:inicio + tamanho_bloco] for nome, v in arrays.items()})
+            chave = hashlib.sha256(bloco + opcoes.encode()).hexdigest()
+            linhas.append((varredura, indice, chave, bloco, opcoes, max_tentativas, time.time()))
+
+        with self._transacao() as conexao:
+            existentes = dict(conexao.execute("SELECT indice, chave FROM tarefas WHERE varredura = ?",
+                                              (varredura,)))
+            for linha in linhas:
+                if existentes.get(linha[1], linha[2]) != linha[2]:
+                    raise ValueError(f"Bloco {linha[1]} de '{varredura}' já existe com outro conteúdo")
+            conexao.executemany(
+                "INSERT OR IGNORE INTO tarefas (varredura, indice, chave, parametros, opcoes, max_tentativas, "
+                "atualizado) VALUES (?, ?, ?, ?, ?, ?, ?)", linhas)
+        return len(linhas)
+
+    def reservar(self, trabalhador, lease_s=None):
+        """
+        Reserva o próximo bloco pendente ou com prazo vencido
+
+        Blocos vencidos que já esgotaram as tentativas são marcados como 'falhou'.
+
+        Returns:
+            dict com 'id', 'varredura', 'indice', 'parametros', 'opcoes' - ou None se não há trabalho
+        """
+        lease_s = C.lease_tarefa_s if lease_s is None else lease_s
+        agora = time.time()
+        with self._transacao() as conexao:
+            conexao.execute(
+                "UPDATE tarefas SET estado = 'falhou', erro = COALESCE(erro, 'prazo vencido'), atualizado = ? "
+                "WHERE estado = 'executando' AND prazo < ? AND tentativas >= max_tentativas", (agora, agora))
+            linha = conexao.execute(
+                "SELECT id, varredura, indice, parametros, opcoes FROM tarefas "
+                "WHERE estado = 'pendente' OR (estado = 'executando' AND prazo < ?) "
+                "ORDER BY varredura, indice LIMIT 1", (agora,)).fetchone()
+            if linha is None:
+                return None
+            conexao.execute(
+                "UPDATE tarefas SET estado = 'executando', trabalhador = ?, prazo = ?, "
+                "tentativas = tentativas + 1, atualizado = ? WHERE id = ?",
+                (trabalhador, agora + lease_s, agora, linha[0]))
+        return {'id': linha[0], 'varredura': linha[1], 'indice': linha[2],
+                'parametros': desserializar_colunas(linha[3]), 'opcoes': json.loads(linha[4])}
+
+    def concluir(self, id_tarefa, colunas):
+        """
+        Grava o resultado do bloco (idempotente: se já concluído, ignora)
+
+        Returns:
+            True se este resultado foi o gravado
+        """
+        with self._transacao() as conexao:
+            cursor = conexao.execute(
+                "UPDATE tarefas SET estado = 'concluida', resultado = ?, erro = NULL, atualizado = ? "
+                "WHERE id = ? AND estado != 'concluida'",
+                (serializar_colunas(colunas), time.time(), id_tarefa))
+        return cursor.rowcount == 1
+
+    def falhar(self, id_tarefa, erro):
+        """Registra a falha; o bloco volta à fila enquanto houver tentativas"""
+        with self._transacao() as conexao:
+            conexao.execute(
+                "UPDATE tarefas SET estado = CASE WHEN tentativas >= max_tentativas THEN 'falhou' "
+                "ELSE 'pendente' END, erro = ?, prazo = NULL, atualizado = ? "
+                "WHERE id = ? AND estado = 'executando'", (str(erro), time.time(), id_tarefa))
+
+    def progresso(self, varredura=None):
+        """
+        Contagem de blocos por estado
+
+        Returns:
+            dict {estado: n} com todos os ESTADOS, 'total' e 'fracao_concluida'
+        """
+        filtro, argumentos = ("WHERE varredura = ?", (varredura,)) if varredura is not None else ("", ())
+        contagem = dict.fromkeys(ESTADOS, 0)
+        contagem.update(self.conexao.execute(
+            f"SELECT estado, COUNT(*) FROM tarefas {filtro} GROUP BY estado", argumentos))
+        contagem['total'] = sum(contagem[e] for e in ESTADOS)
+        contagem['fracao_concluida'] = contagem['concluida'] / contagem['total'] if contagem['total'] else 0.0
+        return contagem
+
+    def resultados(self, varredura):
+        """Itera (indice, colunas) dos blocos concluídos, em ordem"""
+        cursor = self.conexao.execute(
+            "SELECT indice, resultado FROM tarefas WHERE varredura = ? AND estado = 'concluida' ORDER BY indice",
+            (varredura,))
+        for indice, dados in cursor:
+            yield indice, desserializar_colunas(dados)
+
+
+def avaliar_bloco(tarefa):
+    """Balanço de um bloco reservado (colunas com o comprimento do bloco)"""
+    n = max(len(v) for v in tarefa['parametros'].values())
+    colunas = avaliar_lotes(tarefa['parametros'], **tarefa['opcoes'])
+    return {nome: np.broadcast_to(valor, (n,)) for nome, valor in colunas.items()}
+
+
+def executar_trabalhador(caminho, trabalhador=None, lease_s=None, max_blocos=None, ao_concluir=None):
+    """
+    Laço de um trabalhador: reserva, avalia e conclui blocos até a fila esvaziar
+
+    Args:
+        caminho: arquivo SQLite da fila
+        trabalhador: identificação (padrão: máquina:pid)
+        lease_s: prazo de cada reserva (padrão: C.lease_tarefa_s)
+        max_blocos: para depois de tantos blocos (padrão: sem limite)
+        ao_concluir: função (tarefa, progresso) chamada após cada bloco (relato de progresso)
+
+    Returns:
+        número de blocos cujo resultado foi gravado por este trabalhador
+    """
+    trabalhador = trabalhador or f"{socket.gethostname()}:{os.getpid()}"
+    gravados = 0
+    with FilaTarefas(caminho) as fila:
+        while max_blocos is None or gravados < max_blocos:
+            tarefa = fila.reservar(trabalhador, lease_s)
+            if tarefa is None:
+                break
+            try:
+                colunas = avaliar_bloco(tarefa)
+            except Exception as erro:
+                fila.falhar(tarefa['id'], f"{type(erro).__name__}: {erro}")
+                continue
+            gravados += fila.concluir(tarefa['id'], colunas)
+            if ao_concluir is not None:
+                ao_concluir(tarefa, fila.progresso(tarefa['varredura']))
+    return gravados
+
+
+def mesclar_resultados(caminho, varredura, destino=None):
+    """
+    Junta os blocos concluídos de uma varredura em colunas únicas
+
+    Args:
+        caminho: arquivo SQLite da fila
+        varredura: nome da varredura
+        destino: .npz para gravar o resultado (escrita atômica), opcional
+
+    Returns:
+        dict de colunas (N,)
+
+    Raises:
+        RuntimeError se ainda há blocos não concluídos
+    """
+    with FilaTarefas(caminho) as fila:
+        progresso = fila.progresso(varredura)
+        if progresso['concluida'] != progresso['total']:
+            raise RuntimeError(f"Varredura '{varredura}' incompleta: {progresso}")
+        blocos = [colunas for _, colunas in fila.resultados(varredura)]
+    colunas = {nome: np.concatenate([b[nome] for b in blocos]) for nome in blocos[0]}
+
+    if destino is not None:
+        pasta = os.path.dirname(os.path.abspath(destino))
+        with tempfile.NamedTemporaryFile(dir=pasta, suffix='.tmp', delete=False) as f:
+            np.savez(f, **colunas)
+        os.replace(f.name, destino)
+    return colunas
+
+
+# Exemplo de uso
+if __name__ == "__main__":
+    import multiprocessing
+
+    def trabalhador_que_cai(caminho):
+        """Reserva um bloco e morre sem concluir (nó perdido)"""
+        with FilaTarefas(caminho) as fila:
+            fila.reservar('no-perdido', lease_s=1.0)
+        os._exit(1)
+
+    def relatar(tarefa, progresso):
+        print(f"  [{os.getpid()}] bloco {tarefa['indice']:2d} | "
+              f"{progresso['concluida']}/{progresso['total']} ({progresso['fracao_concluida']:.0%})")
+
+    # Incerteza × escala × programação: 200 000 lotes em 20 blocos
+    rng = np.random.default_rng(0)
+    n = 200_000
+    parametros = {'m_sf_inicial': C.m_sf_inicial * rng.uniform(0.9, 1.1, n),
+                  'COP_chiller': rng.uniform(2.5, 3.5, n),
+                  't_secagem': rng.choice([10.0, 12.0, 14.0], n)}
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, 'fila.sqlite')
+        with FilaTarefas(caminho) as fila:
+            print(f"=== {fila.submeter('incerteza', parametros, tamanho_bloco=10_000)} blocos submetidos "
+                  f"(ressubmissão: {fila.submeter('incerteza', parametros, tamanho_bloco=10_000)} blocos, "
+                  f"total na fila {fila.progresso()['total']}) ===")
+
+        perdido = multiprocessing.Process(target=trabalhador_que_cai, args=(caminho,))
+        perdido.start()
+        perdido.join()
+        time.sleep(1.1)                                        # prazo do bloco perdido vence
+
+        t0 = time.perf_counter()
+        trabalhadores = [multiprocessing.Process(target=executar_trabalhador, args=(caminho,),
+                                                 kwargs={'ao_concluir': relatar, 'lease_s': 30.0})
+                         for _ in range(2)]
+        for p in trabalhadores:
+            p.start()
+        for p in trabalhadores:
+            p.join()
+        duracao = time.perf_counter() - t0
+
+        with FilaTarefas(caminho) as fila:
+            tentativas = dict(fila.conexao.execute("SELECT indice, tentativas FROM tarefas WHERE indice = 0"))
+        colunas = mesclar_resultados(caminho, 'incerteza', os.path.join(pasta, 'incerteza.npz'))
+        referencia = avaliar_lotes(parametros)
+        print(f"\nMesclado: {len(colunas['energia_total']):,} lotes em {duracao:.2f} s | bloco 0 reservado "
+              f"{tentativas[0]}x | igual à avaliação direta: "
+              f"{np.allclose(colunas['energia_total'], referencia['energia_total'])}")
@@ -0,0 +1,168 @@
+"""
+fluxos.py - Grafo de Fluxos Energéticos
+Monta o grafo rede → equipamentos → destinos finais (calor rejeitado, trabalho
+mecânico, produto) a partir dos resultados calculados e dos fatores de
+dissipação, agrega lotes e agrupa fluxos pequenos para o diagrama de Sankey.
+Um grafo é um dict {(origem, destino): energia em kWh}, escalar ou array por lote.
+"""
+
+import numpy as np
+
+from src import constants as C
+
+REDE = 'Energia Elétrica da Rede'
+UTILIDADES = 'Utilidades Fixas'
+CALOR = 'Calor Rejeitado'
+TRABALHO = 'Trabalho Mecânico'
+PRODUTO = 'Produto Final'
+OUTROS = 'Outros Equipamentos'
+
+DESTINOS = (CALOR, TRABALHO, PRODUTO)
+
+
+def adicionar_fluxo(grafo, origem, destino, valor):
+    """Soma valor ao fluxo origem → destino (cria o fluxo se não existir)"""
+    chave = (origem, destino)
+    grafo[chave] = grafo[chave] + valor if chave in grafo else valor
+
+
+def grafo_energetico(energia_equipamentos, resultado_secador, energia_utilidades, fatores=None,
+                     fator_padrao=None):
+    """
+    Grafo de fluxos a partir das energias calculadas
+
+    Equipamentos mecânicos dividem a energia entre calor (fator de dissipação) e
+    trabalho; o chiller rejeita toda a energia elétrica como calor no condensador;
+    o secador entrega o calor útil ao produto e o restante (perdas e ineficiência) é
+    rejeitado. O trabalho mecânico segue para o produto.
+
+    Args:
+        energia_equipamentos: {codigo: kWh} (escalar ou array por lote), com FT-101/TDR-101
+        resultado_secador: dict de balanco_secador_completo (usa Q_total_util_kJ)
+        energia_utilidades: kWh das utilidades fixas
+        fatores: {codigo: fração dissipada como calor} (padrão: C.fatores_dissipacao)
+        fator_padrao: fração para equipamentos sem fator (padrão: C.fator_dissipacao_padrao)
+
+    Returns:
+        dict {(origem, destino): kWh}
+    """
+    fatores = C.fatores_dissipacao if fatores is None else fatores
+    fator_padrao = C.fator_dissipacao_padrao if fator_padrao is None else fator_padrao
+
+    grafo = {}
+    for codigo, energia in energia_equipamentos.items():
+        adicionar_fluxo(grafo, REDE, codigo, energia)
+        if codigo == 'FT-101':
+            adicionar_fluxo(grafo, codigo, CALOR, energia)
+        elif codigo == 'TDR-101':
+            calor_util = np.minimum(resultado_secador['Q_total_util_kJ'] / C.kWh_para_kJ, energia)
+            adicionar_fluxo(grafo, codigo, PRODUTO, calor_util)
+            adicionar_fluxo(grafo, codigo, CALOR, energia - calor_util)
+        else:
+            fator = fatores.get(codigo, fator_padrao)
+            adicionar_fluxo(grafo, codigo, CALOR, fator * energia)
+            adicionar_fluxo(grafo, codigo, TRABALHO, (1 - fator) * energia)
+            adicionar_fluxo(grafo, TRABALHO, PRODUTO, (1 - fator) * energia)
+
+    adicionar_fluxo(grafo, REDE, UTILIDADES, energia_utilidades)
+    adicionar_fluxo(grafo, UTILIDADES, CALOR, energia_utilidades)
+    return grafo
+
+
+def grafo_de_colunas(colunas, fatores=None, fator_padrao=None):
+    """
+    Grafo a partir das colunas de avaliar_lotes (valores em arrays por lote)
+
+    Args:
+        colunas: dict de avaliar_lotes
+        fatores, fator_padrao: ver grafo_energetico
+
+    Returns:
+        dict {(origem, destino): array}
+    """
+    energias = {nome.split('.', 1)[1]: valor for nome, valor in colunas.items() if nome.startswith('equipamento.')}
+    secador = {'Q_total_util_kJ': colunas['secador.Q_total_util_kJ']}
+    return grafo_energetico(energias, secador, colunas['energia_utilidades'], fatores, fator_padrao)
+
+
+def reduzir_grafo(grafo, operacao='media'):
+    """
+    Reduz os arrays por lote a um valor por fluxo
+
+    Args:
+        grafo: dict {(origem, destino): array}
+        operacao: 'media' (kWh por lote) ou 'soma' (kWh da campanha)
+
+    Returns:
+        dict {(origem, destino): float}
+    """
+    reducao = {'media': np.mean, 'soma': np.sum}[operacao]
+    return {chave: float(reducao(valor)) for chave, valor in grafo.items()}
+
+
+def agrupar_nos(grafo, limite_fracao=0.02, grupos=None, manter=(), rotulo_outros=OUTROS):
+    """
+    Agrupa nós intermediários pequenos para manter o diagrama compacto
+
+    Nós cuja entrada é menor que limite_fracao da energia total da rede viram
+    rotulo_outros; fluxos que passam a coincidir são somados.
+
+    Args:
+        grafo: dict {(origem, destino): float}
+        limite_fracao: fração da energia total abaixo da qual o nó é agrupado
+        grupos: {nó: grupo} aplicado antes do limite (ex. equipamentos por área)
+        manter: nós que nunca são agrupados
+        rotulo_outros: nome do nó agrupado
+
+    Returns:
+        dict {(origem, destino): float}
+    """
+    grupos = grupos or {}
+    renomear = lambda no: grupos.get(no, no)
+    agrupado = {}
+    for (origem, destino), valor in grafo.items():
+        adicionar_fluxo(agrupado, renomear(origem), renomear(destino), valor)
+
+    total = sum(valor for (origem, _), valor in agrupado.items() if origem == REDE)
+    entrada = {}
+    for (_, destino), valor in agrupado.items():
+        entrada[destino] = entrada.get(destino, 0.0) + valor
+    fixos = {REDE, UTILIDADES, *DESTINOS, *manter}
+    pequenos = {no for no, valor in entrada.items() if no not in fixos and valor < limite_fracao * total}
+
+    resultado = {}
+    for (origem, destino), valor in agrupado.items():
+        origem = rotulo_outros if origem in pequenos else origem
+        destino = rotulo_outros if destino in pequenos else destino
+        if origem != destino:
+            adicionar_fluxo(resultado, origem, destino, valor)
+    return resultado
+
+
+def saldo_nos(grafo):
+    """Entrada − saída de cada nó (zero nos nós intermediários quando o grafo conserva energia)"""
+    saldo = {}
+    for (origem, destino), valor in grafo.items():
+        saldo[origem] = saldo.get(origem, 0.0) - valor
+        saldo[destino] = saldo.get(destino, 0.0) + valor
+    return saldo
+
+
+# Exemplo de uso
+if __name__ == "__main__":
+    import time
+
+    from src.lotes import avaliar_lotes
+
+    rng = np.random.default_rng(0)
+    n_lotes = 10_000
+    colunas = avaliar_lotes({'m_sf_inicial': C.m_sf_inicial * rng.uniform(0.9, 1.1, n_lotes),
+                             'COP_chiller': rng.uniform(2.5, 3.5, n_lotes)})
+
+    t0 = time.perf_counter()
+    grafo = agrupar_nos(reduzir_grafo(grafo_de_colunas(colunas)), manter=('FT-101', 'TDR-101'))
+    print(f"=== GRAFO DE FLUXOS ({n_lotes} lotes, {(time.perf_counter() - t0) * 1e3:.1f} ms) ===")
+    for (origem, destino), valor in sorted(grafo.items(), key=lambda item: -item[1]):
+        print(f"{origem:>26} → {destino:<22} {valor:9.1f} kWh/lote")
+    intermediarios = {no: s for no, s in saldo_nos(grafo).items() if no not in (REDE, CALOR, PRODUTO)}
+    print(f"Maior desbalanço em nós intermediários: {max(abs(s) for s in intermediarios.values()):.2e} kWh")
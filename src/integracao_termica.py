@@ -0,0 +1,237 @@
+"""
+integracao_termica.py - Integração Térmica (Pinch) entre Chiller e Secador
+Monta as correntes quentes (condensador do FT-101, dissipação mecânica) e
+frias (aquecimento e evaporação no TDR-101) a partir das colunas de
+avaliar_lotes e calcula as metas mínimas de utilidades pelo método da tabela
+problema, para todos os lotes/cenários numa única chamada vetorizada.
+As metas são por lote (energia total, sem considerar a defasagem entre as
+etapas - supõem armazenamento térmico entre a fermentação/cristalização e a
+secagem).
+"""
+
+import numpy as np
+
+from src import constants as C
+from src import calculations as calc
+from src.desempenho import T_ZERO_ABSOLUTO
+from src.lotes import CALCULADOS, parametros_lote
+
+QUENTE = 'quente'
+FRIA = 'fria'
+
+
+def corrente(nome, tipo, T_inicial, T_final, carga_kJ):
+    """
+    Corrente de processo para a tabela problema
+
+    Args:
+        nome: identificação
+        tipo: QUENTE (cede calor) ou FRIA (recebe calor)
+        T_inicial, T_final: temperaturas de fornecimento e alvo (°C); iguais = mudança de fase
+        carga_kJ: calor trocado por lote (escalar ou array)
+
+    Returns:
+        dict da corrente
+    """
+    if tipo not in (QUENTE, FRIA):
+        raise ValueError(f"Tipo de corrente inválido: {tipo}")
+    return {'nome': nome, 'tipo': tipo, 'T_inicial': T_inicial, 'T_final': T_final, 'carga_kJ': carga_kJ}
+
+
+def trabalho_compressor(E_base_kWh, T_condensacao, T_condensacao_base=None, T_evaporador=None):
+    """
+    Energia do compressor com outra temperatura de condensação (bomba de calor)
+
+    Mantém a fração de Carnot do ponto base, como em MapaCOPChiller.
+
+    Args:
+        E_base_kWh: energia elétrica na condensação base
+        T_condensacao: nova temperatura de condensação (°C)
+        T_condensacao_base, T_evaporador: padrão C.T_condensacao_chiller / C.T_evaporador_chiller
+
+    Returns:
+        kWh
+    """
+    T_condensacao_base = C.T_condensacao_chiller if T_condensacao_base is None else T_condensacao_base
+    T_evaporador = C.T_evaporador_chiller if T_evaporador is None else T_evaporador
+    carnot = lambda tc: (T_evaporador + T_ZERO_ABSOLUTO) / np.maximum(tc - T_evaporador, 5.0)
+    return E_base_kWh * carnot(T_condensacao_base) / carnot(np.asarray(T_condensacao, dtype=float))
+
+
+def correntes_balanco(colunas, parametros=None, T_condensacao=None, fatores=None, fator_padrao=None):
+    """
+    Correntes quentes e frias a partir das colunas de avaliar_lotes
+
+    Quentes: condensador do FT-101 (calor removido + trabalho do compressor, na
+    condensação) e dissipação mecânica dos demais equipamentos (na temperatura
+    do caldo). Frias: aquecimento sensível no TDR-101 até T_secagem e o restante
+    do calor fornecido (evaporação e perdas) em T_secagem.
+
+    Args:
+        colunas: dict de avaliar_lotes
+        parametros: os mesmos parâmetros passados a avaliar_lotes (temperaturas)
+        T_condensacao: condensação do FT-101 (°C, escalar ou array); acima da base o
+                       compressor gasta mais (trabalho_compressor)
+        fatores, fator_padrao: fração dissipada como calor (padrão: C.fatores_dissipacao)
+
+    Returns:
+        lista de correntes
+    """
+    p = parametros_lote(parametros)
+    fatores = C.fatores_dissipacao if fatores is None else fatores
+    fator_padrao = C.fator_dissipacao_padrao if fator_padrao is None else fator_padrao
+    T_condensacao = C.T_condensacao_chiller if T_condensacao is None else T_condensacao
+
+    E_compressor = trabalho_compressor(colunas['chiller.E_eletrica_total_kWh'], T_condensacao)
+    Q_condensador = colunas['chiller.Q_total_remover_kJ'] + calc.converter_kWh_para_kJ(E_compressor)
+
+    Q_dissipacao = 0.0
+    for nome, energia in colunas.items():
+        codigo = nome.split('.', 1)[1] if nome.startswith('equipamento.') else None
+        if codigo and codigo not in CALCULADOS:
+            Q_dissipacao = Q_dissipacao + calc.calcular_dissipacao_mecanica(energia,
+                                                                           fatores.get(codigo, fator_padrao))
+
+    Q_sensivel = (colunas['secador.Q_cristais_sensivel_kJ'] + colunas['secador.Q_agua_sensivel_kJ']
+                  + colunas['secador.Q_etanol_sensivel_kJ'])
+    return [
+        corrente('FT-101 condensador', QUENTE, T_condensacao, T_condensacao, Q_condensador),
+        corrente('Dissipação mecânica', QUENTE, C.T_dissipacao_mecanica, C.T_dissipacao_mecanica, Q_dissipacao),
+        corrente('TDR-101 aquecimento', FRIA, p['T_entrada_secador'], p['T_secagem'], Q_sensivel),
+        corrente('TDR-101 evaporação e perdas', FRIA, p['T_secagem'], p['T_secagem'],
+                 colunas['secador.Q_total_fornecer_kJ'] - Q_sensivel)
+    ]
+
+
+def tabela_problema(correntes, dT_min=None, faixa_isotermica=1.0):
+    """
+    Metas mínimas de utilidades pelo método da tabela problema (vetorizado)
+
+    Temperaturas deslocadas de ±dT_min/2, intervalos delimitados por todas as
+    temperaturas deslocadas (ordenadas por lote), cascata de calor e pinch.
+    Correntes isotérmicas são espalhadas em faixa_isotermica K (para baixo nas
+    quentes, para cima nas frias - lado conservador).
+
+    Args:
+        correntes: lista de dicts de corrente (valores escalares ou arrays que fazem broadcast)
+        dT_min: diferença mínima de temperatura (padrão: C.dT_min_integracao)
+        faixa_isotermica: largura (K) atribuída às mudanças de fase
+
+    Returns:
+        dict com arrays no formato do broadcast: 'Q_quente_min_kJ', 'Q_frio_min_kJ',
+        'Q_recuperado_kJ', 'T_pinch_quente', 'T_pinch_frio', e 'cascata_kJ' (intervalos, ...)
+    """
+    dT_min = C.dT_min_integracao if dT_min is None else dT_min
+    valores = [np.asarray(c[k], dtype=float) for c in correntes for k in ('T_inicial', 'T_final', 'carga_kJ')]
+    formato = np.broadcast_shapes(*(v.shape for v in valores), np.shape(dT_min))
+
+    altos, baixos, cps, sinais = [], [], [], []
+    for c in correntes:
+        quente = c['tipo'] == QUENTE
+        deslocamento = -dT_min / 2 if quente else dT_min / 2
+        T_a = np.asarray(c['T_inicial'], dtype=float) + deslocamento
+        T_b = np.asarray(c['T_final'], dtype=float) + deslocamento
+        alto, baixo = np.maximum(T_a, T_b), np.minimum(T_a, T_b)
+        estreita = alto - baixo < faixa_isotermica
+        if quente:
+            baixo = np.where(estreita, alto - faixa_isotermica, baixo)
+        else:
+            alto = np.where(estreita, baixo + faixa_isotermica, alto)
+        altos.append(np.broadcast_to(alto, formato))
+        baixos.append(np.broadcast_to(baixo, formato))
+        cps.append(np.broadcast_to(np.asarray(c['carga_kJ'], dtype=float) / (alto - baixo), formato))
+        sinais.append(1.0 if quente else -1.0)
+
+    altos, baixos, cps = np.stack(altos), np.stack(baixos), np.stack(cps)           # (S, ...)
+    sinais = np.array(sinais).reshape((-1,) + (1,) * len(formato))
+    limites = -np.sort(-np.concatenate([altos, baixos]), axis=0)                    # (2S, ...) decrescente
+    superior, inferior = limites[:-1], limites[1:]
+
+    # CP líquido de cada intervalo: correntes que cobrem o intervalo inteiro
+    cobre = (altos[:, None] >= superior[None]) & (baixos[:, None] <= inferior[None])
+    cp_liquido = np.sum(np.where(cobre, (sinais * cps)[:, None], 0.0), axis=0)
+    excedente = cp_liquido * (superior - inferior)
+
+    cascata = np.concatenate([np.zeros((1,) + formato), np.cumsum(excedente, axis=0)])
+    Q_quente_min = np.maximum(-cascata.min(axis=0), 0.0)
+    cascata = cascata + Q_quente_min
+    pinch = np.take_along_axis(limites, np.argmin(cascata, axis=0)[None], axis=0)[0]
+
+    Q_frias = sum(np.asarray(c['carga_kJ'], dtype=float) for c in correntes if c['tipo'] == FRIA)
+    return {
+        'Q_quente_min_kJ': Q_quente_min,
+        'Q_frio_min_kJ': cascata[-1],
+        'Q_recuperado_kJ': np.broadcast_to(Q_frias - Q_quente_min, formato),
+        'T_pinch_quente': pinch + dT_min / 2,
+        'T_pinch_frio': pinch - dT_min / 2,
+        'cascata_kJ': cascata
+    }
+
+
+def triagem_bomba_calor(colunas, T_condensacao, parametros=None, dT_min=None):
+    """
+    Economia líquida ao recuperar calor para o TDR-101, por lote e condensação
+
+    O calor recuperado substitui o aquecimento do secador (com a eficiência
+    efetiva de cada lote); condensar acima da base custa trabalho extra no FT-101.
+
+    Args:
+        colunas: dict de avaliar_lotes (arrays por lote)
+        T_condensacao: temperaturas de condensação a avaliar (°C); use um eixo
+                       extra para varrer opções × lotes (ex. T[:, None])
+        parametros: os mesmos parâmetros passados a avaliar_lotes
+        dT_min: diferença mínima de temperatura
+
+    Returns:
+        dict com as metas de tabela_problema e 'economia_secador_kWh',
+        'trabalho_extra_kWh', 'economia_liquida_kWh'
+    """
+    metas = tabela_problema(correntes_balanco(colunas, parametros, T_condensacao), dT_min)
+    E_secador = colunas['secador.E_eletrica_total_kWh']
+    eficiencia_efetiva = colunas['secador.Q_total_fornecer_kJ'] / calc.converter_kWh_para_kJ(E_secador)
+    economia = np.minimum(calc.converter_kJ_para_kWh(metas['Q_recuperado_kJ']) / eficiencia_efetiva, E_secador)
+    E_chiller = colunas['chiller.E_eletrica_total_kWh']
+    trabalho_extra = trabalho_compressor(E_chiller, T_condensacao) - E_chiller
+    metas.update({
+        'economia_secador_kWh': economia,
+        'trabalho_extra_kWh': trabalho_extra,
+        'economia_liquida_kWh': economia - trabalho_extra
+    })
+    return metas
+
+
+# Exemplo de uso
+if __name__ == "__main__":
+    import time
+
+    from src.lotes import avaliar_lotes
+
+    print("=== LOTE NOMINAL ===")
+    nominal = avaliar_lotes()
+    for c in correntes_balanco(nominal):
+        print(f"{c['nome']:28} {c['tipo']:6} {float(c['T_inicial']):5.1f} → {float(c['T_final']):5.1f} °C  "
+              f"{float(c['carga_kJ']):9.0f} kJ")
+    metas = tabela_problema(correntes_balanco(nominal))
+    print(f"Utilidade quente mínima: {float(metas['Q_quente_min_kJ']):.0f} kJ | fria mínima: "
+          f"{float(metas['Q_frio_min_kJ']):.0f} kJ | recuperável: {float(metas['Q_recuperado_kJ']):.0f} kJ | "
+          f"pinch {float(metas['T_pinch_quente']):.1f}/{float(metas['T_pinch_frio']):.1f} °C")
+
+    # Varredura: 10 000 lotes × 8 temperaturas de condensação numa chamada
+    rng = np.random.default_rng(0)
+    n_lotes = 10_000
+    parametros = {'m_cristais_umidos': C.m_cristais_umidos * rng.uniform(0.9, 1.1, n_lotes),
+                  'T_secagem': rng.uniform(40, 55, n_lotes),
+                  'COP_chiller': rng.uniform(2.5, 3.5, n_lotes)}
+    colunas = avaliar_lotes(parametros)
+    T_condensacao = np.linspace(35, 70, 8)[:, None]
+    t0 = time.perf_counter()
+    triagem = triagem_bomba_calor(colunas, T_condensacao, parametros)
+    duracao = time.perf_counter() - t0
+
+    print(f"\n=== BOMBA DE CALOR NO FT-101 ({n_lotes} lotes × {len(T_condensacao)} opções, "
+          f"{duracao * 1e3:.0f} ms) ===")
+    for i, T in enumerate(T_condensacao[:, 0]):
+        print(f"T_cond {T:4.0f} °C: recuperado {triagem['Q_recuperado_kJ'][i].mean():7.0f} kJ | "
+              f"economia secador {triagem['economia_secador_kWh'][i].mean():5.2f} kWh | "
+              f"trabalho extra {triagem['trabalho_extra_kWh'][i].mean():5.2f} kWh | "
+              f"líquida {triagem['economia_liquida_kWh'][i].mean():5.2f} kWh/lote")
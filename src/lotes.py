@@ -0,0 +1,140 @@
+"""
+lotes.py - Avaliação Vetorizada do Balanço Energético por Lote
+Reproduz os cálculos do main() (chiller, secador, equipamentos, utilidades)
+com qualquer constante substituída por um array - uma chamada avalia
+milhares de lotes/cenários e devolve resultados em colunas.
+"""
+
+import numpy as np
+
+from src import constants as C
+from src import calculations as calc
+
+# Constantes de src.constants que podem ser substituídas por arrays
+PARAMETROS = (
+    'm_cristais_umidos', 'm_cristais_secos', 'm_sf_cristalizar', 'm_sf_inicial',
+    'm_agua_evaporar', 'm_etanol_lavagem', 'm_etanol_evaporar', 'm_biomassa_inicial',
+    'm_biomassa_residual', 'm_HCl_inicial', 'm_HCl_residual',
+    'T_entrada_secador', 'T_secagem', 'T_entrada_chiller', 'T_cristalizacao', 'T_ambiente',
+    't_resfriamento_28_4', 't_manutencao_cristalizacao', 't_manutencao_lavagem', 't_secagem',
+    'Cp_soforolipideos', 'Cp_agua', 'Cp_biomassa', 'Cp_HCl_solucao', 'Cp_etanol_70',
+    'L_cristalizacao_SL', 'L_vap_agua_45C', 'L_etanol_70',
+    'COP_chiller', 'eficiencia_secador', 'Q_perdas_V102', 'Q_perdas_TDR101',
+    'fator_agitacao_calor', 'E_utilidades_fixas_total'
+)
+
+CALCULADOS = ('FT-101', 'TDR-101')
+
+
+def parametros_lote(parametros=None):
+    """
+    Completa os parâmetros informados com os valores de src.constants
+
+    Args:
+        parametros: dict {nome: escalar ou array} (nomes de PARAMETROS)
+
+    Returns:
+        dict com todos os PARAMETROS como arrays numpy
+    """
+    parametros = parametros or {}
+    desconhecidos = set(parametros) - set(PARAMETROS)
+    if desconhecidos:
+        raise KeyError(f"Parâmetros desconhecidos: {sorted(desconhecidos)}")
+    return {nome: np.asarray(parametros.get(nome, getattr(C, nome)), dtype=float) for nome in PARAMETROS}
+
+
+def avaliar_lotes(parametros=None, equipamentos=None, mapa_cop=None, mapa_secador=None,
+                  dissipacao_agitacao_chiller=False):
+    """
+    Balanço completo de um conjunto de lotes em uma chamada vetorizada
+
+    Args:
+        parametros: dict {nome: escalar ou array} sobrepondo src.constants
+        equipamentos: {codigo: {'P_nom', 'tempo'}} (padrão: C.equipamentos_processo);
+                      P_nom/tempo podem ser arrays; FT-101/TDR-101 são sempre calculados
+        mapa_cop: MapaCOPChiller opcional (substitui COP_chiller)
+        mapa_secador: MapaEficienciaSecador opcional (substitui eficiencia_secador)
+        dissipacao_agitacao_chiller: soma ao calor removido pelo FT-101 a dissipação do agitador
+                                     do V-102 (fator_agitacao_calor × P_nom), como carga contínua
+                                     junto às perdas Q_perdas_V102
+
+    Returns:
+        dict de colunas (arrays no formato do broadcast dos parâmetros):
+        'chiller.<campo>', 'secador.<campo>', 'potencia.<codigo>', 'equipamento.<codigo>' (kWh),
+        'energia_processo', 'energia_utilidades', 'energia_total', 'massa_produto', 'consumo_especifico'
+    """
+    p = parametros_lote(parametros)
+    equipamentos = C.equipamentos_processo if equipamentos is None else equipamentos
+
+    carga_continua_V102 = p['Q_perdas_V102']
+    if dissipacao_agitacao_chiller:
+        carga_continua_V102 = carga_continua_V102 + p['fator_agitacao_calor'] * np.asarray(
+            equipamentos['V-102']['P_nom'], dtype=float)
+
+    chiller = calc.balanco_chiller_completo(
+        m_sf_inicial=p['m_sf_inicial'],
+        m_biomassa_inicial=p['m_biomassa_inicial'],
+        m_HCl_inicial=p['m_HCl_inicial'],
+        m_biomassa_residual=p['m_biomassa_residual'],
+        m_HCl_residual=p['m_HCl_residual'],
+        m_sf_cristalizar=p['m_sf_cristalizar'],
+        m_etanol_lavagem=p['m_etanol_lavagem'],
+        Cp_soforolipideos=p['Cp_soforolipideos'],
+        Cp_biomassa=p['Cp_biomassa'],
+        Cp_HCl_solucao=p['Cp_HCl_solucao'],
+        Cp_etanol_70=p['Cp_etanol_70'],
+        T_inicial=p['T_entrada_chiller'],
+        T_final=p['T_cristalizacao'],
+        T_ambiente=p['T_ambiente'],
+        L_cristalizacao_SL=p['L_cristalizacao_SL'],
+        perdas_ambiente_kW=carga_continua_V102,
+        t_resfriamento_28_4=p['t_resfriamento_28_4'],
+        t_manutencao_cristalizacao=p['t_manutencao_cristalizacao'],
+        t_manutencao_lavagem=p['t_manutencao_lavagem'],
+        COP=p['COP_chiller'] if mapa_cop is None else mapa_cop
+    )
+
+    secador = calc.balanco_secador_completo(
+        m_cristais_umidos=p['m_cristais_umidos'],
+        m_agua_evaporar=p['m_agua_evaporar'],
+        m_etanol_evaporar=p['m_etanol_evaporar'],
+        Cp_soforolipideos=p['Cp_soforolipideos'],
+        Cp_agua=p['Cp_agua'],
+        Cp_etanol_70=p['Cp_etanol_70'],
+        T_inicial=p['T_entrada_secador'],
+        T_final=p['T_secagem'],
+        L_vap_agua_45C=p['L_vap_agua_45C'],
+        L_etanol_70=p['L_etanol_70'],
+        perdas_ambiente_kW=p['Q_perdas_TDR101'],
+        tempo_h=p['t_secagem'],
+        eficiencia=p['eficiencia_secador'] if mapa_secador is None else mapa_secador
+    )
+
+    tempo_chiller = p['t_resfriamento_28_4'] + p['t_manutencao_cristalizacao'] + p['t_manutencao_lavagem']
+    colunas = {f'chiller.{campo}': valor for campo, valor in chiller.items()}
+    colunas.update({f'secador.{campo}': valor for campo, valor in secador.items()})
+    colunas['potencia.FT-101'] = chiller['E_eletrica_total_kWh'] / tempo_chiller
+    colunas['potencia.TDR-101'] = secador['E_eletrica_total_kWh'] / p['t_secagem']
+
+    # Energia por equipamento (FT-101/TDR-101 pela energia calculada, no tempo real de operação)
+    energia_processo = 0.0
+    for codigo, dados in equipamentos.items():
+        if codigo == 'FT-101':
+            energia = chiller['E_eletrica_total_kWh']
+        elif codigo == 'TDR-101':
+            energia = secador['E_eletrica_total_kWh']
+        else:
+            energia = calc.calcular_energia_eletrica_equipamento(np.asarray(dados['P_nom'], dtype=float),
+                                                                 np.asarray(dados['tempo'], dtype=float),
+                                                                 dados.get('perfil'))
+        colunas[f'equipamento.{codigo}'] = energia
+        energia_processo = energia_processo + energia
+
+    colunas['energia_processo'] = energia_processo
+    colunas['energia_utilidades'] = p['E_utilidades_fixas_total']
+    colunas['energia_total'] = energia_processo + p['E_utilidades_fixas_total']
+    colunas['massa_produto'] = p['m_cristais_secos']
+    colunas['consumo_especifico'] = colunas['energia_total'] / p['m_cristais_secos']
+
+    formato = np.broadcast_shapes(*(np.shape(v) for v in colunas.values()))
+    return {nome: np.broadcast_to(valor, formato) for nome, valor in colunas.items()}
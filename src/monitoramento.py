@@ -0,0 +1,369 @@
+"""
+monitoramento.py - Monitoramento em Tempo Real das Medições contra o Modelo
+Estágio asyncio que consome leituras (t_s, tag, kW) de um socket TCP ou de
+um arquivo seguido (tail), mantém por canal (lote × equipamento) a energia
+acumulada e uma média móvel de potência com atualização O(1), e compara com
+a curva acumulada esperada pelo modelo. Desvios viram eventos numa fila
+limitada enquanto o lote ainda está em andamento (ex. chiller muito acima do
+E_eletrica_total_kWh previsto, perdas do secador acima de Q_perdas_TDR101).
+"""
+
+import asyncio
+import time
+from array import array
+from bisect import bisect_right
+
+import numpy as np
+import pandas as pd
+
+from src import constants as C
+from src import calculations as calc
+from src.perfis import como_perfil
+
+
+def tag_canal(codigo, lote):
+    """Tag do medidor de um equipamento num lote (ex. 'FT-101#7')"""
+    return f"{codigo}#{lote}"
+
+
+def _curva_perfil(perfil, P_nom):
+    """
+    Energia acumulada e potência esperadas (funções escalares de τ = h desde o início)
+
+    Mesma integral de perfis.carga_acumulada, sem alocar arrays por amostra.
+    """
+    duracao = perfil['duracao_h'].astype(float)
+    carga_inicio = perfil['carga_inicio'].astype(float)
+    inclinacao = ((perfil['carga_fim'] - carga_inicio) / duracao).tolist()
+    fins = np.cumsum(duracao).tolist()
+    acumulado = np.concatenate([[0.0], np.cumsum(duracao * (carga_inicio + perfil['carga_fim']) / 2)]).tolist()
+    inicios = [f - d for f, d in zip(fins, duracao.tolist())]
+    carga_inicio = carga_inicio.tolist()
+
+    def energia(tau):
+        tau = min(max(tau, 0.0), fins[-1])
+        k = min(bisect_right(fins, tau), len(fins) - 1)
+        dt = tau - inicios[k]
+        return P_nom * (acumulado[k] + dt * (carga_inicio[k] + inclinacao[k] * dt / 2))
+
+    def potencia(tau):
+        if tau < 0 or tau >= fins[-1]:
+            return 0.0
+        k = bisect_right(fins, tau)
+        return P_nom * (carga_inicio[k] + inclinacao[k] * (tau - inicios[k]))
+
+    return energia, potencia
+
+
+class MonitorLotes:
+    """
+    Acumuladores por canal e comparação incremental com o modelo
+
+    Estado em listas/arrays Python indexados pelo código do canal: cada amostra
+    custa uma busca de tag, uma soma na energia e uma troca no anel da média móvel.
+    Eventos: 'potencia' (média móvel fora da tolerância em relação ao modelo),
+    'normalizado' (volta à tolerância), 'energia' (acumulado do lote fora da
+    tolerância, uma vez por canal) e 'fora_da_janela' (consumo com o equipamento
+    fora da janela do lote).
+    """
+
+    def __init__(self, inicios_lotes_h, equipamentos, inicio_equipamentos=None, janela_amostras=None,
+                 tolerancia_potencia=None, tolerancia_energia=None, intervalo_maximo_s=None):
+        inicio_equipamentos = C.inicio_equipamentos if inicio_equipamentos is None else inicio_equipamentos
+        self.janela = C.janela_monitor_amostras if janela_amostras is None else janela_amostras
+        self.tolerancia_potencia = (C.tolerancia_monitor_potencia if tolerancia_potencia is None
+                                    else tolerancia_potencia)
+        self.tolerancia_energia = C.tolerancia_monitor_energia if tolerancia_energia is None else tolerancia_energia
+        self.intervalo_maximo_h = (C.intervalo_maximo_amostra_s if intervalo_maximo_s is None
+                                   else intervalo_maximo_s) / 3600
+
+        self.tags, self.lote, self.codigo = [], [], []
+        self.inicio_h, self.fim_h, self.P_kW, self.E_lote_kWh, self._curvas = [], [], [], [], []
+        for codigo, dados in equipamentos.items():
+            E = float(calc.calcular_energia_equipamento(dados))
+            curvas = (_curva_perfil(como_perfil(dados['perfil'], float(dados['tempo'])), float(dados['P_nom']))
+                      if 'perfil' in dados else None)
+            for lote, inicio_lote in enumerate(np.atleast_1d(inicios_lotes_h).tolist()):
+                inicio = inicio_lote + inicio_equipamentos[codigo]
+                self.tags.append(tag_canal(codigo, lote))
+                self.lote.append(lote)
+                self.codigo.append(codigo)
+                self.inicio_h.append(inicio)
+                self.fim_h.append(inicio + float(dados['tempo']))
+                self.P_kW.append(E / float(dados['tempo']))
+                self.E_lote_kWh.append(E)
+                self._curvas.append(curvas)
+        self.indice = {tag: k for k, tag in enumerate(self.tags)}
+
+        n = len(self.tags)
+        self.energia_kWh = [0.0] * n
+        self.E_base_kWh = [0.0] * n            # curva do modelo na 1ª leitura (monitor iniciado com o lote em curso)
+        self.t_anterior = [None] * n
+        self.kW_anterior = [0.0] * n
+        self.amostras = [0] * n
+        self._anel = [array('d', bytes(8 * self.janela)) for _ in range(n)]
+        self._soma_anel = [0.0] * n
+        self._alarme_potencia = [False] * n
+        self._alarme_energia = [False] * n
+        self._alarme_fora = [False] * n
+        self.desconhecidas = 0
+
+    def esperado(self, k, t_h):
+        """(energia acumulada kWh, potência kW) esperadas pelo modelo no canal k em t_h"""
+        tau = t_h - self.inicio_h[k]
+        curvas = self._curvas[k]
+        if curvas is not None:
+            return curvas[0](tau), curvas[1](tau)
+        duracao = self.fim_h[k] - self.inicio_h[k]
+        return self.P_kW[k] * min(max(tau, 0.0), duracao), (self.P_kW[k] if 0 <= tau < duracao else 0.0)
+
+    def media_movel(self, k):
+        """Potência média (kW) nas últimas janela amostras do canal k"""
+        return self._soma_anel[k] / min(max(self.amostras[k], 1), self.janela)
+
+    def processar(self, t_s, tag, kW):
+        """
+        Atualiza o canal com uma leitura e devolve os eventos gerados (lista, geralmente vazia)
+
+        Args:
+            t_s: instante da leitura (s desde a origem dos lotes)
+            tag: tag do medidor (tag_canal)
+            kW: potência lida
+        """
+        k = self.indice.get(tag)
+        if k is None:
+            self.desconhecidas += 1
+            return []
+        t_h = t_s / 3600
+
+        # Energia: retângulo à esquerda (potência anterior mantida até esta leitura)
+        t_anterior = self.t_anterior[k]
+        if t_anterior is None:
+            self.E_base_kWh[k] = self.esperado(k, t_h)[0]
+        elif 0 < t_h - t_anterior <= self.intervalo_maximo_h:
+            self.energia_kWh[k] += self.kW_anterior[k] * (t_h - t_anterior)
+        self.t_anterior[k], self.kW_anterior[k] = t_h, kW
+
+        # Média móvel: anel de tamanho fixo com soma corrente
+        anel, posicao = self._anel[k], self.amostras[k] % self.janela
+        self._soma_anel[k] += kW - anel[posicao]
+        anel[posicao] = kW
+        self.amostras[k] += 1
+
+        eventos = []
+        dentro = self.inicio_h[k] <= t_h < self.fim_h[k]
+        media = self.media_movel(k)
+        E_modelo, P_modelo = self.esperado(k, t_h)
+        if dentro and self.amostras[k] >= self.janela and t_h - self.inicio_h[k] >= self.janela / 3600:
+            # Janela móvel inteira dentro da operação (amostras a 1 Hz)
+            desvio = (media - P_modelo) / self.P_kW[k]
+            alarme = abs(desvio) > self.tolerancia_potencia
+            if alarme != self._alarme_potencia[k]:
+                self._alarme_potencia[k] = alarme
+                eventos.append(self._evento('potencia' if alarme else 'normalizado', k, t_h, media, P_modelo))
+        elif not dentro:
+            self._alarme_potencia[k] = False
+            # Só com a janela móvel inteira fora da operação (antes do início ou após o fim)
+            fora = t_h + self.janela / 3600 < self.inicio_h[k] or t_h - self.fim_h[k] >= self.janela / 3600
+            alarme = fora and media > self.tolerancia_potencia * self.P_kW[k] and self.amostras[k] >= self.janela
+            if alarme != self._alarme_fora[k]:
+                self._alarme_fora[k] = alarme
+                if alarme:
+                    eventos.append(self._evento('fora_da_janela', k, t_h, media, 0.0))
+
+        if not self._alarme_energia[k] and dentro:
+            E_modelo -= self.E_base_kWh[k]
+            if abs(self.energia_kWh[k] - E_modelo) > self.tolerancia_energia * self.E_lote_kWh[k]:
+                self._alarme_energia[k] = True
+                eventos.append(self._evento('energia', k, t_h, self.energia_kWh[k], E_modelo))
+        return eventos
+
+    def _evento(self, tipo, k, t_h, medido, modelo):
+        return {'tipo': tipo, 'tag': self.tags[k], 'lote': self.lote[k], 'equipamento': self.codigo[k],
+                't_h': t_h, 'medido': medido, 'modelo': modelo}
+
+    def processar_linhas(self, linhas):
+        """Leituras em texto 't_s,tag,kW' (uma por linha); devolve os eventos"""
+        eventos = []
+        for linha in linhas:
+            partes = linha.split(',')
+            if len(partes) != 3:
+                continue
+            try:
+                novos = self.processar(float(partes[0]), partes[1], float(partes[2]))
+            except ValueError:
+                continue
+            if novos:
+                eventos.extend(novos)
+        return eventos
+
+    def situacao(self):
+        """Energia acumulada × esperada (desde a 1ª leitura) por canal, na última leitura de cada um"""
+        linhas = []
+        for k, t_h in enumerate(self.t_anterior):
+            if t_h is None:
+                continue
+            E_modelo = self.esperado(k, t_h)[0] - self.E_base_kWh[k]
+            linhas.append({'tag': self.tags[k], 'lote': self.lote[k], 'equipamento': self.codigo[k], 't_h': t_h,
+                           'medido_kWh': self.energia_kWh[k], 'modelo_kWh': E_modelo,
+                           'P_media_kW': self.media_movel(k), 'alarme': self._alarme_potencia[k]})
+        return pd.DataFrame(linhas)
+
+
+def _publicar(saida, eventos, recebido, estatisticas):
+    """Coloca os eventos na fila limitada; se cheia, descarta o mais antigo (latência limitada)"""
+    for evento in eventos:
+        evento['latencia_s'] = time.perf_counter() - recebido
+        if saida.full():
+            saida.get_nowait()
+            estatisticas['descartados'] += 1
+        saida.put_nowait(evento)
+        estatisticas['eventos'] += 1
+
+
+async def _consumir(monitor, ler, saida, estatisticas):
+    """Lê blocos de bytes, separa linhas completas e processa; o resto fica para o próximo bloco"""
+    resto = b''
+    while True:
+        dados = await ler()
+        if not dados:
+            break
+        recebido = time.perf_counter()
+        linhas = (resto + dados).split(b'\n')
+        resto = linhas.pop()
+        estatisticas['leituras'] += len(linhas)
+        _publicar(saida, monitor.processar_linhas(linha.decode() for linha in linhas), recebido, estatisticas)
+        await asyncio.sleep(0)          # devolve o laço a cada bloco: consumidores de eventos não esperam o fluxo
+
+
+def novas_estatisticas():
+    return {'leituras': 0, 'eventos': 0, 'descartados': 0}
+
+
+async def servir_socket(monitor, saida, host='127.0.0.1', porta=0, estatisticas=None, tamanho_bloco=65536):
+    """
+    Servidor TCP: cada conexão envia linhas 't_s,tag,kW'
+
+    Returns:
+        asyncio.Server (porta efetiva em server.sockets[0].getsockname()[1])
+    """
+    estatisticas = novas_estatisticas() if estatisticas is None else estatisticas
+
+    async def conexao(reader, writer):
+        try:
+            await _consumir(monitor, lambda: reader.read(tamanho_bloco), saida, estatisticas)
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(conexao, host, porta)
+
+
+async def seguir_arquivo(monitor, caminho, saida, parar, estatisticas=None, intervalo_s=0.05, tamanho_bloco=65536):
+    """
+    Segue um arquivo de leituras (como tail -f) até o evento 'parar' e o fim dos dados
+
+    Args:
+        parar: asyncio.Event - quando definido, termina após ler o que restou
+    """
+    estatisticas = novas_estatisticas() if estatisticas is None else estatisticas
+    with open(caminho, 'rb') as arquivo:
+        async def ler():
+            while True:
+                dados = arquivo.read(tamanho_bloco)
+                if dados:
+                    return dados
+                if parar.is_set():
+                    return b''
+                await asyncio.sleep(intervalo_s)
+
+        await _consumir(monitor, ler, saida, estatisticas)
+    return estatisticas
+
+
+def leituras_replay(monitor, t_inicio_s, t_fim_s, passo_s=1.0, ruido=0.02, falhas=None, semente=0):
+    """
+    Gerador de leituras para teste: todos os canais a cada passo_s, com potência do modelo
+
+    Args:
+        falhas: {tag: (t_inicio_s, fator)} - potência multiplicada por fator a partir de t_inicio_s
+
+    Yields:
+        bytes com as linhas de um instante
+    """
+    rng = np.random.default_rng(semente)
+    falhas = falhas or {}
+    indices_falha = {monitor.indice[tag]: valor for tag, valor in falhas.items()}
+    inicio, fim = np.array(monitor.inicio_h) * 3600, np.array(monitor.fim_h) * 3600
+    P = np.array(monitor.P_kW)
+    perfis = [k for k, curvas in enumerate(monitor._curvas) if curvas is not None]
+    tags = np.array(monitor.tags)
+    for t in np.arange(t_inicio_s, t_fim_s, passo_s):
+        kW = np.where((t >= inicio) & (t < fim), P, 0.0)
+        for k in perfis:
+            kW[k] = monitor._curvas[k][1](t / 3600 - monitor.inicio_h[k])
+        kW *= 1 + ruido * rng.standard_normal(len(kW))
+        for k, (t_falha, fator) in indices_falha.items():
+            if t >= t_falha and kW[k] > 0:
+                kW[k] *= fator
+        yield '\n'.join(f"{t:.0f},{tag},{valor:.4f}" for tag, valor in zip(tags, kW)).encode() + b'\n'
+
+
+# Exemplo de uso
+if __name__ == "__main__":
+    from src.cenarios import sobrepor_equipamentos
+    from src.lotes import avaliar_lotes
+
+    nominal = avaliar_lotes()
+    equipamentos = sobrepor_equipamentos(C.equipamentos_processo, {
+        'FT-101': {'P_nom': float(nominal['potencia.FT-101'])},
+        'TDR-101': {'P_nom': float(nominal['potencia.TDR-101'])}
+    })
+    # 150 lotes iniciados a cada 6 h: 2250 canais; replay de 30 min a partir do início do FT-101 do lote 100
+    inicios = np.arange(150) * 6.0
+    monitor = MonitorLotes(inicios, equipamentos)
+    t0_s = (inicios[100] + C.inicio_equipamentos['FT-101']) * 3600
+    duracao_replay_s = 30 * 60
+    # Falhas: chiller do lote 100 a 2,5× após 10 min; secador do lote 97 com +1,5 kW de perdas (≈ +55 %)
+    falhas = {tag_canal('FT-101', 100): (t0_s + 600, 2.5),
+              tag_canal('TDR-101', 97): (t0_s, 1 + 1.5 / float(nominal['potencia.TDR-101']))}
+
+    async def principal():
+        saida = asyncio.Queue(maxsize=1000)
+        estatisticas = novas_estatisticas()
+        servidor = await servir_socket(monitor, saida, estatisticas=estatisticas)
+        porta = servidor.sockets[0].getsockname()[1]
+
+        recebidos = []
+
+        async def consumidor():
+            while True:
+                recebidos.append(await saida.get())
+
+        tarefa = asyncio.create_task(consumidor())
+        _, writer = await asyncio.open_connection('127.0.0.1', porta)
+        t_inicio = time.perf_counter()
+        for bloco in leituras_replay(monitor, t0_s, t0_s + duracao_replay_s, falhas=falhas):
+            writer.write(bloco)
+            await writer.drain()
+        writer.close()
+        await writer.wait_closed()
+        while estatisticas['leituras'] < len(monitor.tags) * duracao_replay_s:
+            await asyncio.sleep(0.01)
+        duracao = time.perf_counter() - t_inicio
+        await asyncio.sleep(0.01)
+        tarefa.cancel()
+        servidor.close()
+        await servidor.wait_closed()
+        return estatisticas, duracao, recebidos
+
+    estatisticas, duracao, eventos = asyncio.run(principal())
+    print(f"=== {len(monitor.tags):,} canais a 1 Hz, {duracao_replay_s // 60} min de replay por socket ===")
+    print(f"{estatisticas['leituras']:,} leituras em {duracao:.1f} s ({estatisticas['leituras'] / duracao:,.0f}/s = "
+          f"{estatisticas['leituras'] / duracao / len(monitor.tags):.0f}x o tempo real)")
+    latencias = np.array([e['latencia_s'] for e in eventos]) * 1e3
+    print(f"{len(eventos)} eventos | latência máx. {latencias.max() if len(latencias) else 0:.1f} ms | "
+          f"descartados {estatisticas['descartados']}")
+    for e in eventos:
+        atraso_min = (e['t_h'] * 3600 - falhas.get(e['tag'], (np.nan,))[0]) / 60
+        print(f"  {e['tipo']:12} {e['tag']:12} medido {e['medido']:8.2f} × modelo {e['modelo']:8.2f} "
+              f"({atraso_min:.0f} min após a falha)")
@@ -0,0 +1,155 @@
+"""
+otimizacao.py - Otimização dos Ajustes de Processo para Mínimo kWh/kg
+Minimiza o consumo específico sobre t_secagem, T_secagem,
+t_manutencao_cristalizacao, m_etanol_lavagem e T_cristalizacao com busca
+por padrões sem derivadas (vizinhos avaliados numa única chamada
+vetorizada) e múltiplas partidas distribuídas entre os núcleos.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from src import constants as C
+from src.lotes import avaliar_lotes, parametros_lote
+
+VARIAVEIS = ('t_secagem', 'T_secagem', 't_manutencao_cristalizacao', 'm_etanol_lavagem', 'T_cristalizacao')
+
+
+def restricao_tempo_secagem(p):
+    """Tempo mínimo de secagem por kg de água a evaporar (g ≤ 0 é viável, em h)"""
+    return C.t_secagem_min_por_kg_agua * p['m_agua_evaporar'] - p['t_secagem']
+
+
+def restricao_etanol_lavagem(p):
+    """Etanol mínimo de lavagem por kg de SF cristalizado (g ≤ 0 é viável, em kg)"""
+    return C.razao_min_etanol_lavagem * p['m_sf_cristalizar'] - p['m_etanol_lavagem']
+
+
+RESTRICOES_PADRAO = (restricao_tempo_secagem, restricao_etanol_lavagem)
+
+
+def objetivo_vetorizado(X, variaveis=VARIAVEIS, parametros_fixos=None, restricoes=RESTRICOES_PADRAO,
+                        penalidade=1e3):
+    """
+    Consumo específico penalizado para um conjunto de pontos
+
+    Args:
+        X: array (n, len(variaveis)) em unidades físicas
+        variaveis: nomes das constantes otimizadas
+        parametros_fixos: demais substituições de constantes
+        restricoes: funções g(parametros) com g ≤ 0 viável
+        penalidade: peso da violação quadrática
+
+    Returns:
+        (objetivo penalizado, consumo específico kWh/kg, violação quadrática) - arrays (n,)
+    """
+    X = np.atleast_2d(X)
+    p = dict(parametros_fixos or {})
+    p.update({nome: X[:, j] for j, nome in enumerate(variaveis)})
+    if 'T_cristalizacao' in variaveis and 'T_entrada_secador' not in p:
+        p['T_entrada_secador'] = p['T_cristalizacao']     # cristais saem do chiller nessa temperatura
+
+    resultado = avaliar_lotes(p)
+    consumo = np.array(resultado['consumo_especifico'], dtype=float)
+
+    completos = parametros_lote(p)
+    violacao = sum(np.maximum(g(completos), 0.0) ** 2 for g in restricoes) + np.zeros(len(X))
+    return consumo + penalidade * violacao, consumo, violacao
+
+
+def _otimizar_partida(z0, limites, variaveis, parametros_fixos, restricoes, max_iter=2000, passo_inicial=0.25,
+                      passo_minimo=1e-7):
+    """
+    Busca por padrões (compass search) no hipercubo [0, 1]^d a partir de uma partida
+
+    Método sem derivadas: em cada iteração os 2d vizinhos ±passo de cada
+    coordenada são avaliados numa única chamada vetorizada do objetivo; o
+    melhor vizinho que melhora é aceito (passo dobra), senão o passo cai à metade.
+    Robusto à anisotropia e à penalidade das restrições, onde o gradiente zigue-zagueia.
+    """
+    inferior, superior = limites[:, 0], limites[:, 1]
+    d = len(z0)
+    fisico = lambda Z: inferior + np.clip(Z, 0, 1) * (superior - inferior)
+    f = lambda Z: objetivo_vetorizado(fisico(Z), variaveis, parametros_fixos, restricoes)[0]
+
+    z, passo = np.clip(np.asarray(z0, dtype=float), 0, 1), passo_inicial
+    f_atual = f(z[None, :])[0]
+    direcoes = np.vstack([np.eye(d), -np.eye(d)])
+    for iteracao in range(max_iter):
+        vizinhos = np.clip(z + passo * direcoes, 0, 1)
+        valores = f(vizinhos)
+        melhor = int(np.argmin(valores))
+        if valores[melhor] < f_atual:
+            z, f_atual, passo = vizinhos[melhor], valores[melhor], min(2 * passo, 0.5)
+        else:
+            passo /= 2
+            if passo < passo_minimo:
+                break
+
+    objetivo, consumo, violacao = objetivo_vetorizado(fisico(z[None, :]), variaveis, parametros_fixos, restricoes)
+    return {
+        'x': fisico(z),
+        'objetivo': float(objetivo[0]),
+        'consumo_especifico': float(consumo[0]),
+        'violacao': float(violacao[0]),
+        'iteracoes': iteracao + 1
+    }
+
+
+def otimizar_parametros(limites=None, parametros_fixos=None, restricoes=RESTRICOES_PADRAO,
+                        n_partidas=8, n_processos=None, semente=0):
+    """
+    Minimiza o kWh/kg com múltiplas partidas em paralelo
+
+    Args:
+        limites: {variavel: (mín, máx)} (padrão: C.limites_otimizacao)
+        parametros_fixos: demais substituições de constantes
+        restricoes: funções g(parametros) ≤ 0 (definidas em nível de módulo para multiprocessamento)
+        n_partidas: número de pontos iniciais (estratificados no hipercubo)
+        n_processos: processos de trabalho (padrão: núcleos disponíveis; 1 = serial)
+        semente: semente dos pontos iniciais
+
+    Returns:
+        dict com 'parametros' ótimos, 'consumo_especifico', 'violacao' e 'partidas'
+    """
+    limites = C.limites_otimizacao if limites is None else limites
+    variaveis = tuple(limites)
+    matriz_limites = np.array([limites[v] for v in variaveis], dtype=float)
+
+    # Partidas estratificadas (hipercubo latino)
+    rng = np.random.default_rng(semente)
+    estratos = np.stack([rng.permutation(n_partidas) for _ in variaveis], axis=1)
+    partidas = (estratos + rng.random(estratos.shape)) / n_partidas
+
+    argumentos = [(z0, matriz_limites, variaveis, parametros_fixos, restricoes) for z0 in partidas]
+    n_processos = n_processos or min(n_partidas, os.cpu_count() or 1)
+    if n_processos == 1:
+        resultados = [_otimizar_partida(*a) for a in argumentos]
+    else:
+        with ProcessPoolExecutor(max_workers=n_processos) as executor:
+            resultados = list(executor.map(_otimizar_partida, *zip(*argumentos)))
+
+    melhor = min(resultados, key=lambda r: r['objetivo'])
+    return {
+        'parametros': dict(zip(variaveis, melhor['x'].tolist())),
+        'consumo_especifico': melhor['consumo_especifico'],
+        'violacao': melhor['violacao'],
+        'partidas': resultados
+    }
+
+
+# Exemplo de uso
+if __name__ == "__main__":
+    from formatacao_brasileira import formatar_numero_brasileiro
+
+    base = avaliar_lotes()['consumo_especifico']
+    resultado = otimizar_parametros()
+
+    print("=== OTIMIZAÇÃO DO CONSUMO ESPECÍFICO ===")
+    print(f"Atual:     {formatar_numero_brasileiro(float(base), 2)} kWh/kg")
+    print(f"Otimizado: {formatar_numero_brasileiro(resultado['consumo_especifico'], 2)} kWh/kg"
+          f" (violação {resultado['violacao']:.1e})")
+    for nome, valor in resultado['parametros'].items():
+        print(f"  {nome:28} {formatar_numero_brasileiro(valor, 2):>8}  (atual {getattr(C, nome)})")
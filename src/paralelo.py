@@ -0,0 +1,175 @@
+"""
+paralelo.py - Avaliação Paralela com Parâmetros e Resultados em Memória Compartilhada
+Os arrays de entrada (um por parâmetro) e de saída (uma por coluna pedida)
+ficam em blocos de memória compartilhada; os processos de trabalho anexam os
+blocos uma vez e recebem apenas faixas de índices, escrevendo as colunas de
+avaliar_lotes no lugar. Nada de dicts de parâmetros ou resultados é
+serializado entre processos.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from src.lotes import avaliar_lotes
+
+COLUNAS_PADRAO = ('chiller.E_eletrica_total_kWh', 'secador.E_eletrica_total_kWh', 'energia_processo',
+                  'energia_total', 'consumo_especifico')
+
+# Estado de cada processo de trabalho (preenchido por _iniciar_trabalhador)
+_ESTADO = {}
+
+
+def _criar_buffer(forma):
+    """Bloco de memória compartilhada + array float64 sobre ele"""
+    memoria = shared_memory.SharedMemory(create=True, size=max(int(np.prod(forma)) * 8, 1))
+    return memoria, np.ndarray(forma, dtype=float, buffer=memoria.buf)
+
+
+def _anexar(nome):
+    """
+    Anexa um bloco criado pelo processo principal
+
+    Os processos do pool compartilham o rastreador de recursos do principal, então
+    o registro repetido não tem efeito e só o principal remove o bloco (unlink).
+    """
+    return shared_memory.SharedMemory(name=nome)
+
+
+def _iniciar_trabalhador(nome_entrada, nomes_parametros, nome_saida, colunas, n, opcoes):
+    """Inicializador do processo: anexa os blocos uma única vez"""
+    entrada, saida = _anexar(nome_entrada), _anexar(nome_saida)
+    _ESTADO.update({
+        'memorias': (entrada, saida),
+        'entrada': np.ndarray((len(nomes_parametros), n), dtype=float, buffer=entrada.buf),
+        'saida': np.ndarray((len(colunas), n), dtype=float, buffer=saida.buf),
+        'nomes_parametros': nomes_parametros,
+        'colunas': colunas,
+        'opcoes': opcoes
+    })
+
+
+def _avaliar_faixa(inicio, fim):
+    """Tarefa: avalia os lotes [inicio, fim) e escreve as colunas no bloco de saída"""
+    entrada, saida = _ESTADO['entrada'], _ESTADO['saida']
+    parametros = {nome: entrada[i, inicio:fim] for i, nome in enumerate(_ESTADO['nomes_parametros'])}
+    resultado = avaliar_lotes(parametros, **_ESTADO['opcoes'])
+    for k, nome in enumerate(_ESTADO['colunas']):
+        saida[k, inicio:fim] = resultado[nome]
+    return fim - inicio
+
+
+def avaliar_paralelo(parametros, colunas=COLUNAS_PADRAO, n_processos=None, tamanho_bloco=100_000,
+                     forcar_compartilhada=False, **opcoes):
+    """
+    avaliar_lotes em paralelo com memória compartilhada
+
+    Args:
+        parametros: {constante: array (N,) ou escalar}
+        colunas: colunas de avaliar_lotes a devolver (cada uma ocupa N × 8 bytes compartilhados)
+        n_processos: processos de trabalho (padrão: núcleos disponíveis; 1 = serial, sem memória compartilhada)
+        tamanho_bloco: lotes por tarefa
+        forcar_compartilhada: usa o pool com memória compartilhada mesmo com 1 processo (benchmark)
+        **opcoes: repassadas a avaliar_lotes (devem ser serializáveis; não variam por lote)
+
+    Returns:
+        dict {coluna: array (N,)} - única cópia é a saída final do bloco compartilhado
+    """
+    n = max((np.size(v) for v in parametros.values()), default=1)
+    colunas = tuple(colunas)
+    n_processos = n_processos or os.cpu_count() or 1
+    if n_processos == 1 and not forcar_compartilhada:
+        resultado = avaliar_lotes(parametros, **opcoes)
+        return {nome: np.array(np.broadcast_to(resultado[nome], (n,))) for nome in colunas}
+
+    nomes_parametros = tuple(parametros)
+    memoria_entrada, entrada = _criar_buffer((len(nomes_parametros), n))
+    memoria_saida, saida = _criar_buffer((len(colunas), n))
+    try:
+        for i, nome in enumerate(nomes_parametros):
+            entrada[i] = parametros[nome]
+        inicios = list(range(0, n, tamanho_bloco))
+        fins = [min(i + tamanho_bloco, n) for i in inicios]
+        with ProcessPoolExecutor(max_workers=n_processos, initializer=_iniciar_trabalhador,
+                                 initargs=(memoria_entrada.name, nomes_parametros, memoria_saida.name,
+                                           colunas, n, opcoes)) as executor:
+            avaliados = sum(executor.map(_avaliar_faixa, inicios, fins))
+        if avaliados != n:
+            raise RuntimeError(f"{avaliados} de {n} lotes avaliados")
+        return {nome: saida[k].copy() for k, nome in enumerate(colunas)}
+    finally:
+        del entrada, saida
+        for memoria in (memoria_entrada, memoria_saida):
+            memoria.close()
+            memoria.unlink()
+
+
+def _avaliar_copiando(parametros, opcoes):
+    """Tarefa da abordagem ingênua (referência do benchmark): dicts serializados nos dois sentidos"""
+    return avaliar_lotes(parametros, **opcoes)
+
+
+def comparar_ipc(parametros, n_processos, tamanho_bloco=100_000, colunas=COLUNAS_PADRAO):
+    """
+    Benchmark: serial × pool serializando dicts × pool com memória compartilhada
+
+    Os dois pools rodam com n_processos trabalhadores mesmo quando n_processos = 1
+    (sem o atalho serial de avaliar_paralelo), para medir o custo de cada IPC.
+
+    Returns:
+        dict com tempos (s) e bytes serializados por lote na abordagem ingênua
+    """
+    import pickle
+    import time
+
+    n = max(np.size(v) for v in parametros.values())
+    inicios = range(0, n, tamanho_bloco)
+    blocos = [{nome: np.broadcast_to(v, (n,))[i:i + tamanho_bloco] for nome, v in parametros.items()}
+              for i in inicios]
+    tamanhos = [min(tamanho_bloco, n - i) for i in inicios]
+
+    t0 = time.perf_counter()
+    avaliar_lotes(parametros)
+    serial = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=n_processos) as executor:
+        partes = list(executor.map(_avaliar_copiando, blocos, [{}] * len(blocos)))
+    # Juntar as partes em colunas completas faz parte do custo medido (avaliar_paralelo já as entrega juntas)
+    mesclado = {nome: np.concatenate([np.broadcast_to(p[nome], (m,)) for p, m in zip(partes, tamanhos)])
+                for nome in colunas}
+    copiando = time.perf_counter() - t0
+    bytes_por_lote = (len(pickle.dumps(blocos[0])) + len(pickle.dumps(partes[0]))) / tamanhos[0]
+
+    t0 = time.perf_counter()
+    avaliar_paralelo(parametros, colunas, n_processos, tamanho_bloco, forcar_compartilhada=True)
+    compartilhado = time.perf_counter() - t0
+    return {'serial_s': serial, 'copiando_s': copiando, 'compartilhado_s': compartilhado,
+            'bytes_por_lote_copiando': bytes_por_lote}
+
+
+# Exemplo de uso
+if __name__ == "__main__":
+    import sys
+
+    from src import constants as C
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    rng = np.random.default_rng(0)
+    parametros = {'m_sf_inicial': C.m_sf_inicial * rng.uniform(0.9, 1.1, n),
+                  'COP_chiller': rng.uniform(2.5, 3.5, n),
+                  'Q_perdas_TDR101': rng.uniform(1.5, 2.5, n)}
+
+    referencia = avaliar_lotes(parametros)
+    resultado = avaliar_paralelo(parametros, n_processos=2)
+    print(f"=== {n:,} CENÁRIOS | igual ao serial: "
+          f"{all(np.array_equal(resultado[c], referencia[c]) for c in COLUNAS_PADRAO)} ===")
+
+    print(f"Núcleos disponíveis: {os.cpu_count()}")
+    for n_processos in sorted({1, 2, os.cpu_count() or 1}):
+        tempos = comparar_ipc(parametros, max(n_processos, 1))
+        print(f"{n_processos:2d} processo(s): serial {tempos['serial_s']:.2f} s | pool copiando dicts "
+              f"{tempos['copiando_s']:.2f} s ({tempos['bytes_por_lote_copiando']:.0f} B/lote serializados) | "
+              f"memória compartilhada {tempos['compartilhado_s']:.2f} s")
@@ -0,0 +1,217 @@
+"""
+perfis.py - Perfis de Carga dos Equipamentos em Segmentos (RLE)
+Um perfil é um array estruturado de segmentos (duração, carga no início,
+carga no fim) com a carga em fração de P_nom: segmentos constantes (liga/
+desliga, degraus) ou rampas lineares. Trechos consecutivos iguais são
+fundidos. Energia, média, pico e energia por intervalo saem direto dos
+segmentos, sem expandir em amostras por segundo.
+"""
+
+import numpy as np
+
+DTYPE_SEGMENTO = np.dtype([('duracao_h', 'f4'), ('carga_inicio', 'f4'), ('carga_fim', 'f4')])
+
+
+def compactar(segmentos):
+    """Remove segmentos de duração nula e funde segmentos constantes consecutivos de mesma carga"""
+    segmentos = np.asarray(segmentos, dtype=DTYPE_SEGMENTO)
+    segmentos = segmentos[segmentos['duracao_h'] > 0]
+    if len(segmentos) < 2:
+        return segmentos.copy()
+    constante = segmentos['carga_inicio'] == segmentos['carga_fim']
+    funde = np.zeros(len(segmentos), dtype=bool)
+    funde[1:] = constante[1:] & constante[:-1] & (segmentos['carga_inicio'][1:] == segmentos['carga_inicio'][:-1])
+    inicios = np.flatnonzero(~funde)
+    compacto = segmentos[inicios].copy()
+    compacto['duracao_h'] = np.add.reduceat(segmentos['duracao_h'].astype(float), inicios)
+    return compacto
+
+
+def perfil(*trechos):
+    """
+    Monta um perfil a partir de trechos
+
+    Args:
+        trechos: (duracao_h, carga) para degraus ou (duracao_h, carga_inicio, carga_fim)
+                 para rampas; carga em fração de P_nom
+
+    Returns:
+        array estruturado DTYPE_SEGMENTO
+    """
+    return compactar([(t[0], t[1], t[-1]) for t in trechos])
+
+
+def como_perfil(perfil_ou_trechos, tempo_h=None):
+    """
+    Perfil a partir de trechos (como guardados em constants) ou de um perfil já montado
+
+    Args:
+        perfil_ou_trechos: array DTYPE_SEGMENTO ou sequência de trechos (ver perfil)
+        tempo_h: duração desejada (h); os segmentos são reescalados para durar tempo_h,
+                 mantendo a forma (None = duração original)
+
+    Returns:
+        array estruturado DTYPE_SEGMENTO
+    """
+    if isinstance(perfil_ou_trechos, np.ndarray) and perfil_ou_trechos.dtype == DTYPE_SEGMENTO:
+        segmentos = perfil_ou_trechos
+    else:
+        segmentos = perfil(*perfil_ou_trechos)
+    if tempo_h is None or np.isclose(duracao_perfil(segmentos), tempo_h):
+        return segmentos
+    if tempo_h <= 0:
+        raise ValueError(f"Duração inválida para o perfil: {tempo_h} h")
+    reescalado = segmentos.copy()
+    reescalado['duracao_h'] = segmentos['duracao_h'] * (tempo_h / duracao_perfil(segmentos))
+    return reescalado
+
+
+def liga_desliga(tempo_h, ligado_h, desligado_h, carga=1.0):
+    """
+    Ciclo liga/desliga repetido ao longo de tempo_h (o último ciclo pode ficar incompleto)
+
+    Returns:
+        array estruturado DTYPE_SEGMENTO
+    """
+    periodo = ligado_h + desligado_h
+    n_ciclos = int(np.ceil(tempo_h / periodo))
+    segmentos = np.empty(2 * n_ciclos, dtype=DTYPE_SEGMENTO)
+    inicio = np.repeat(np.arange(n_ciclos) * periodo, 2) + np.tile([0.0, ligado_h], n_ciclos)
+    fim = np.minimum(inicio + np.tile([ligado_h, desligado_h], n_ciclos), tempo_h)
+    segmentos['duracao_h'] = np.maximum(fim - inicio, 0.0)
+    segmentos['carga_inicio'] = segmentos['carga_fim'] = np.tile([carga, 0.0], n_ciclos)
+    return compactar(segmentos)
+
+
+def concatenar(*perfis):
+    """Perfis em sequência, fundindo o encontro quando possível"""
+    return compactar(np.concatenate(perfis))
+
+
+def duracao_perfil(perfil):
+    """Duração total (h)"""
+    return float(np.sum(perfil['duracao_h'], dtype=float))
+
+
+def horas_equivalentes(perfil):
+    """Integral da carga (h a plena carga): energia = P_nom × horas_equivalentes"""
+    return float(np.sum(perfil['duracao_h'] * (perfil['carga_inicio'].astype(float) + perfil['carga_fim']) / 2))
+
+
+def fator_medio(perfil):
+    """Carga média em fração de P_nom (P_avg / P_nom)"""
+    return horas_equivalentes(perfil) / duracao_perfil(perfil)
+
+
+def fator_pico(perfil):
+    """Maior carga do perfil em fração de P_nom"""
+    return float(max(perfil['carga_inicio'].max(), perfil['carga_fim'].max()))
+
+
+def carga_acumulada(perfil, t_h):
+    """
+    Integral da carga de 0 até t_h (vetorizado; busca binária nos segmentos)
+
+    Args:
+        perfil: array de segmentos
+        t_h: instantes (h desde o início do perfil); fora do perfil a carga é zero
+
+    Returns:
+        array no formato de t_h (h a plena carga)
+    """
+    duracao = perfil['duracao_h'].astype(float)
+    inicio_carga = perfil['carga_inicio'].astype(float)
+    inclinacao = (perfil['carga_fim'] - inicio_carga) / duracao
+    fins = np.cumsum(duracao)
+    acumulado = np.concatenate([[0.0], np.cumsum(duracao * (inicio_carga + perfil['carga_fim']) / 2)])
+
+    t_h = np.clip(np.asarray(t_h, dtype=float), 0.0, fins[-1])
+    k = np.minimum(np.searchsorted(fins, t_h, side='right'), len(duracao) - 1)
+    tau = t_h - (fins[k] - duracao[k])
+    return acumulado[k] + tau * (inicio_carga[k] + inclinacao[k] * tau / 2)
+
+
+def energia_por_intervalo(perfil, P_nom, limites_h):
+    """
+    Energia (kWh) em cada intervalo [limites_h[i], limites_h[i+1])
+
+    Ex.: limites horários para levar um perfil de um ano para a tarifa horária.
+    """
+    return P_nom * np.diff(carga_acumulada(perfil, limites_h))
+
+
+def empacotar(perfis):
+    """
+    Junta muitos perfis (ex. equipamentos × lotes) num único array de segmentos
+
+    Returns:
+        (segmentos concatenados, deslocamentos (n+1,)) - perfil i = segmentos[d[i]:d[i+1]]
+    """
+    tamanhos = [len(p) for p in perfis]
+    if 0 in tamanhos:
+        raise ValueError("Perfis vazios não podem ser empacotados")
+    return np.concatenate(perfis), np.concatenate([[0], np.cumsum(tamanhos)])
+
+
+def resumo_pacote(segmentos, deslocamentos, P_nom=1.0):
+    """
+    Duração, energia, potência média e pico de cada perfil empacotado
+
+    Args:
+        segmentos, deslocamentos: saída de empacotar
+        P_nom: potência nominal de cada perfil (escalar ou array (n,))
+
+    Returns:
+        dict de arrays (n,): 'duracao_h', 'energia_kWh', 'P_media_kW', 'P_pico_kW'
+    """
+    inicios = deslocamentos[:-1]
+    duracao = segmentos['duracao_h'].astype(float)
+    integral = duracao * (segmentos['carga_inicio'].astype(float) + segmentos['carga_fim']) / 2
+    duracoes = np.add.reduceat(duracao, inicios)
+    energia = P_nom * np.add.reduceat(integral, inicios)
+    pico = np.maximum.reduceat(np.maximum(segmentos['carga_inicio'], segmentos['carga_fim']), inicios)
+    return {
+        'duracao_h': duracoes,
+        'energia_kWh': energia,
+        'P_media_kW': energia / duracoes,
+        'P_pico_kW': P_nom * pico.astype(float)
+    }
+
+
+# Exemplo de uso
+if __name__ == "__main__":
+    import time
+
+    from src import constants as C
+    from src import calculations as calc
+
+    dados = C.equipamentos_processo['SFR-102']
+    segmentos = como_perfil(dados['perfil'], dados['tempo'])
+    print("=== SFR-102 (perfil de constants) ===")
+    print(f"Segmentos: {len(segmentos)} | P_avg = {dados['P_nom'] * fator_medio(segmentos):.2f} kW | "
+          f"energia = {calc.calcular_energia_equipamento(dados):.1f} kWh "
+          f"(P_nom × tempo = {dados['P_nom'] * dados['tempo']:.1f} kWh)")
+    curto = {**dados, 'tempo': 24}
+    print(f"Com tempo = 24 h o perfil é reescalado: {calc.calcular_energia_equipamento(curto):.1f} kWh")
+
+    # Um ano de FR-101 por lote: agitação liga/desliga 50 min/10 min com degraus de carga
+    rng = np.random.default_rng(0)
+    n_lotes = 300
+    perfis = [concatenar(perfil((12, 0.4, 1.0)),
+                         liga_desliga(8760 - 24, 50 / 60, 10 / 60, carga=rng.uniform(0.8, 1.0)),
+                         perfil((12, 1.0, 0.0)))
+              for _ in range(n_lotes)]
+    segmentos, deslocamentos = empacotar(perfis)
+
+    t0 = time.perf_counter()
+    resumo = resumo_pacote(segmentos, deslocamentos, P_nom=3.0)
+    duracao = time.perf_counter() - t0
+    por_segundo = n_lotes * 8760 * 3600 * 4
+    print(f"\n=== {n_lotes} PERFIS DE 1 ANO ===")
+    print(f"Segmentos: {len(segmentos):,} ({segmentos.nbytes / 1e6:.1f} MB) vs amostras por segundo em float32: "
+          f"{por_segundo / 1e9:.1f} GB ({por_segundo / segmentos.nbytes:.0f}x)")
+    print(f"Resumo em {duracao * 1e3:.1f} ms: energia média {resumo['energia_kWh'].mean():,.0f} kWh | "
+          f"P_avg {resumo['P_media_kW'].mean():.2f} kW | pico {resumo['P_pico_kW'].max():.2f} kW")
+
+    horaria = energia_por_intervalo(perfis[0], 3.0, np.arange(8761))
+    print(f"Energia horária do 1º lote: soma {horaria.sum():,.1f} kWh = {resumo['energia_kWh'][0]:,.1f} kWh")
@@ -0,0 +1,155 @@
+"""
+rateio.py - Rateio das Utilidades Fixas entre Lotes Simultâneos
+Cada item de utilidades_fixas é uma potência da instalação (kW) ligada
+enquanto há lote ativo (ou durante todo um horizonte). Uma varredura pelos
+eventos de início/fim dos lotes divide a energia de cada intervalo entre os
+lotes ativos - igualmente (tempo), pela energia de processo ou pela massa -
+em O(n log n), sem cobrar a instalação inteira de cada lote sobreposto.
+"""
+
+import numpy as np
+
+from src import constants as C
+
+CRITERIOS = ('tempo', 'energia', 'massa')
+
+
+def potencias_utilidades(utilidades=None, horas_referencia=None):
+    """
+    Potência de cada item de utilidades (kW)
+
+    Args:
+        utilidades: {item: kWh por lote} (padrão: C.utilidades_fixas)
+        horas_referencia: horas que geraram esses kWh (padrão: C.horas_referencia_utilidades)
+
+    Returns:
+        dict {item: kW}
+    """
+    utilidades = C.utilidades_fixas if utilidades is None else utilidades
+    horas_referencia = C.horas_referencia_utilidades if horas_referencia is None else horas_referencia
+    return {item: energia / horas_referencia for item, energia in utilidades.items()}
+
+
+def ratear_utilidades(inicio_h, fim_h, criterio='tempo', energia_processo=None, massa=None, utilidades=None,
+                      horas_referencia=None, horizonte_h=None):
+    """
+    Rateio por varredura de eventos
+
+    Em cada intervalo entre eventos consecutivos, a energia P_total × dt vai
+    para os lotes ativos na proporção do peso (1, energia_processo ou massa).
+    Com prefixos acumulados da taxa por unidade de peso, cada lote recebe
+    peso × (R[fim] − R[início]).
+
+    Args:
+        inicio_h, fim_h: janela de cada lote na instalação (h) - arrays (n,)
+        criterio: 'tempo', 'energia' (energia_processo) ou 'massa'
+        energia_processo: kWh de processo por lote (critério 'energia' e consumo específico)
+        massa: kg de produto por lote (critério 'massa' e consumo específico)
+        utilidades, horas_referencia: ver potencias_utilidades
+        horizonte_h: (início, fim) em que a instalação fica ligada; None = só enquanto há lote
+                     ativo. Energia em intervalos sem lote fica como não alocada.
+
+    Returns:
+        dict com 'utilidades_kWh' (n,), 'por_item' {item: (n,)}, 'lotes_ativos_medio' (n,),
+        'nao_alocado_kWh' e, com energia_processo e massa, 'consumo_especifico' (n,)
+    """
+    if criterio not in CRITERIOS:
+        raise ValueError(f"Critério desconhecido: {criterio} (use {CRITERIOS})")
+    inicio_h = np.asarray(inicio_h, dtype=float)
+    fim_h = np.asarray(fim_h, dtype=float)
+    n = len(inicio_h)
+    pesos = {'tempo': np.ones(n),
+             'energia': None if energia_processo is None else np.asarray(energia_processo, dtype=float),
+             'massa': None if massa is None else np.asarray(massa, dtype=float)}[criterio]
+    if pesos is None:
+        raise ValueError(f"Critério '{criterio}' exige o array correspondente")
+    potencias = potencias_utilidades(utilidades, horas_referencia)
+    P_total = sum(potencias.values())
+
+    # Eventos ordenados: em tempos iguais, fins antes de inícios (intervalo de duração nula entre eles)
+    tempos = np.concatenate([inicio_h, fim_h])
+    tipo = np.concatenate([np.ones(n, dtype=np.int8), np.zeros(n, dtype=np.int8)])
+    ordem = np.lexsort((tipo, tempos))
+    posicao = np.empty(2 * n, dtype=np.intp)
+    posicao[ordem] = np.arange(2 * n)
+
+    sinal = np.where(tipo[ordem] == 1, 1, -1)
+    ativos = np.cumsum(sinal)                                   # lotes ativos após cada evento
+    peso_ativo = np.cumsum(sinal * np.concatenate([pesos, pesos])[ordem])
+    dt = np.diff(tempos[ordem])                                 # intervalo k: entre os eventos k e k+1
+    com_lote = ativos[:-1] > 0
+    taxa = np.where(com_lote, P_total * dt / np.where(com_lote, peso_ativo[:-1], 1.0), 0.0)
+    acumulado = np.concatenate([[0.0], np.cumsum(taxa)])
+
+    utilidades_kWh = pesos * (acumulado[posicao[n:]] - acumulado[posicao[:n]])
+    energia_sem_lote = P_total * dt[~com_lote].sum()
+    if horizonte_h is not None:
+        antes, depois = max(tempos.min() - horizonte_h[0], 0.0), max(horizonte_h[1] - tempos.max(), 0.0)
+        energia_sem_lote += P_total * (antes + depois)
+    tempo_ativo = np.cumsum(np.where(com_lote, dt * ativos[:-1], 0.0))
+    tempo_ativo = np.concatenate([[0.0], tempo_ativo])
+    duracao = fim_h - inicio_h
+
+    resultado = {
+        'utilidades_kWh': utilidades_kWh,
+        'por_item': {item: utilidades_kWh * P / P_total for item, P in potencias.items()},
+        'lotes_ativos_medio': np.divide(tempo_ativo[posicao[n:]] - tempo_ativo[posicao[:n]], duracao,
+                                        out=np.zeros(n), where=duracao > 0),
+        'nao_alocado_kWh': float(energia_sem_lote)
+    }
+    if energia_processo is not None and massa is not None:
+        resultado['consumo_especifico'] = (np.asarray(energia_processo, dtype=float) + utilidades_kWh) / massa
+    return resultado
+
+
+def janelas_fermentacao(inicios_lotes_h, inicio_equipamentos=None, duracao_h=None):
+    """
+    Janela de cada lote usada pelo modelo atual de utilidades (fermentação no FR-101)
+
+    Returns:
+        (inicio_h, fim_h)
+    """
+    inicio_equipamentos = C.inicio_equipamentos if inicio_equipamentos is None else inicio_equipamentos
+    duracao_h = C.equipamentos_processo['FR-101']['tempo'] if duracao_h is None else duracao_h
+    inicio = np.asarray(inicios_lotes_h, dtype=float) + inicio_equipamentos['FR-101']
+    return inicio, inicio + duracao_h
+
+
+# Exemplo de uso
+if __name__ == "__main__":
+    import time
+
+    from src.lotes import avaliar_lotes
+
+    # Verificação com grade de 1 h em um caso pequeno
+    inicio, fim = np.array([0.0, 24.0, 300.0]), np.array([168.0, 192.0, 468.0])
+    massa = np.array([80.0, 100.0, 90.0])
+    rateio = ratear_utilidades(inicio, fim, 'massa', massa=massa)
+    horas = np.arange(500) + 0.5
+    ativos = (horas[:, None] >= inicio) & (horas[:, None] < fim)
+    P = sum(potencias_utilidades().values())
+    grade = (ativos * massa / np.maximum((ativos * massa).sum(axis=1, keepdims=True), 1e-300)).sum(axis=0) * P
+    print("=== 3 LOTES (critério massa) ===")
+    print(f"Varredura: {np.round(rateio['utilidades_kWh'], 1)} | grade horária: {np.round(grade, 1)}")
+
+    # Campanha: 20 000 lotes iniciados a cada 6 h (~28 simultâneos na fermentação)
+    rng = np.random.default_rng(0)
+    n_lotes = 20_000
+    inicios = np.sort(np.arange(n_lotes) * 6.0 + rng.uniform(0, 3, n_lotes))
+    colunas = avaliar_lotes({'m_cristais_secos': C.m_cristais_secos * rng.uniform(0.9, 1.1, n_lotes)})
+    inicio, fim = janelas_fermentacao(inicios)
+
+    print(f"\n=== {n_lotes} LOTES SOBREPOSTOS ===")
+    for criterio in CRITERIOS:
+        t0 = time.perf_counter()
+        rateio = ratear_utilidades(inicio, fim, criterio, energia_processo=colunas['energia_processo'],
+                                   massa=colunas['massa_produto'])
+        duracao = (time.perf_counter() - t0) * 1e3
+        print(f"{criterio:8} ({duracao:5.1f} ms): utilidades {rateio['utilidades_kWh'].mean():6.1f} kWh/lote | "
+              f"{rateio['consumo_especifico'].mean():5.2f} kWh/kg | "
+              f"lotes ativos {rateio['lotes_ativos_medio'].mean():.1f}")
+    instalacao = P * (fim.max() - inicio.min())
+    cobrado = n_lotes * C.E_utilidades_fixas_total
+    print(f"Modelo atual: {C.E_utilidades_fixas_total} kWh/lote "
+          f"({cobrado / instalacao:.0f}x a energia da instalação) | {colunas['consumo_especifico'].mean():.2f} kWh/kg")
+    print(f"Soma rateada = energia da instalação: {np.isclose(rateio['utilidades_kWh'].sum(), instalacao)}")
@@ -0,0 +1,245 @@
+"""
+relatorios.py - Relatórios Executivo e de Validações em Texto
+Renderiza os relatórios a partir do dicionário de resultados do main() com
+templates compilados uma vez e números formatados em bloco no padrão
+brasileiro. Para campanhas, os lotes são divididos entre processos de
+trabalho e cada arquivo é gravado de forma atômica; a saída de um lote é
+sempre idêntica byte a byte (sem datas nem ordem dependente de execução).
+"""
+
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from string import Template
+
+from formatacao_brasileira import formatar_numeros_brasileiro
+from src import calculations as calc
+
+TEMPLATE_EXECUTIVO = Template("""\
+=== RELATÓRIO EXECUTIVO - BALANÇO DE ENERGIA ===
+Lote: $lote
+
+RESULTADOS PRINCIPAIS:
+- Energia Elétrica Total: $energia_total kWh/lote
+- Equipamentos de Processo: $energia_processo kWh ($pct_processo%)
+- Utilidades Fixas: $energia_utilidades kWh ($pct_utilidades%)
+- Massa de Produto: $massa_produto kg
+- Consumo Específico: $consumo_especifico kWh/kg produto
+
+CHILLER (FT-101):
+- Calor removido: $Q_chiller kJ
+- Energia elétrica: $E_chiller kWh
+- Potência média: $P_chiller kW
+
+SECADOR (TDR-101):
+- Calor útil: $Q_util_secador kJ
+- Perdas para o ambiente: $Q_perdas_secador kJ
+- Energia elétrica: $E_secador kWh
+- Potência média: $P_secador kW
+
+PRINCIPAIS CONSUMIDORES ELÉTRICOS:
+$consumidores
+VERIFICAÇÕES: $n_aprovadas de $n_verificacoes aprovadas
+""")
+
+TEMPLATE_VALIDACOES = Template("""\
+=== RELATÓRIO DE VALIDAÇÕES ===
+Lote: $lote
+
+$secoes""")
+
+N_CONSUMIDORES = 5
+
+
+def verificacoes_lote(resultado, tolerancia=1e-6):
+    """
+    Verificações de consistência de um lote
+
+    Args:
+        resultado: dict no formato do retorno de main()
+        tolerancia: tolerância relativa dos fechamentos
+
+    Returns:
+        {seção: [(nome, passou), ...]} em ordem fixa
+    """
+    chiller, secador, equipamentos = resultado['chiller'], resultado['secador'], resultado['equipamentos']
+    fecha = lambda a, b: abs(a - b) <= tolerancia * max(abs(a), abs(b), 1.0)
+    energias = [calc.calcular_energia_equipamento(dados) for dados in equipamentos.values()]
+
+    return {
+        'FAIXAS_ESPERADAS': [
+            ('chiller_3_a_4_kWh', resultado['verificacoes']['chiller_ok']),
+            ('secador_30_a_35_kWh', resultado['verificacoes']['secador_ok']),
+            ('consumo_especifico_abaixo_100_kWh_kg', resultado['consumo_especifico'] < 100)
+        ],
+        'BALANCO_CHILLER': [
+            ('partes_somam_total', fecha(chiller['Q_part1_kJ'] + chiller['Q_part2_kJ'] + chiller['Q_part3_kJ'],
+                                         chiller['Q_total_remover_kJ'])),
+            ('calor_removido_positivo', chiller['Q_total_remover_kJ'] > 0)
+        ],
+        'BALANCO_SECADOR': [
+            ('util_mais_perdas_igual_fornecido', fecha(secador['Q_total_util_kJ'] + secador['Q_perdas_kJ'],
+                                                       secador['Q_total_fornecer_kJ'])),
+            ('eletrica_cobre_calor_fornecido', calc.converter_kWh_para_kJ(secador['E_eletrica_total_kWh'])
+             >= secador['Q_total_fornecer_kJ'] * (1 - tolerancia))
+        ],
+        'FECHAMENTO_ENERGETICO': [
+            ('energias_positivas', all(e > 0 for e in energias)),
+            ('processo_soma_equipamentos', fecha(sum(energias), resultado['energia_processo'])),
+            ('total_processo_mais_utilidades', fecha(resultado['energia_processo'] + resultado['energia_utilidades'],
+                                                     resultado['energia_total'])),
+            ('potencia_chiller_consistente', fecha(equipamentos['FT-101']['P_nom'] * equipamentos['FT-101']['tempo'],
+                                                   chiller['E_eletrica_total_kWh'])),
+            ('potencia_secador_consistente', fecha(equipamentos['TDR-101']['P_nom'] * equipamentos['TDR-101']['tempo'],
+                                                   secador['E_eletrica_total_kWh']))
+        ]
+    }
+
+
+def renderizar_executivo(resultado, lote='1'):
+    """Relatório executivo de um lote (texto)"""
+    chiller, secador, equipamentos = resultado['chiller'], resultado['secador'], resultado['equipamentos']
+    total = resultado['energia_total']
+    verificacoes = [passou for itens in verificacoes_lote(resultado).values() for _, passou in itens]
+
+    energias = {codigo: calc.calcular_energia_equipamento(dados) for codigo, dados in equipamentos.items()}
+    consumidores = sorted(((energia, codigo) for codigo, energia in energias.items()),
+                          key=lambda item: (-item[0], item[1]))[:N_CONSUMIDORES]
+
+    # Todos os números do relatório formatados numa única chamada, por casas decimais
+    campos_1 = {
+        'energia_total': total,
+        'energia_processo': resultado['energia_processo'],
+        'pct_processo': resultado['energia_processo'] / total * 100,
+        'energia_utilidades': resultado['energia_utilidades'],
+        'pct_utilidades': resultado['energia_utilidades'] / total * 100,
+        'massa_produto': resultado['massa_produto'],
+        'consumo_especifico': resultado['consumo_especifico'],
+        'Q_chiller': chiller['Q_total_remover_kJ'],
+        'Q_util_secador': secador['Q_total_util_kJ'],
+        'Q_perdas_secador': secador['Q_perdas_kJ']
+    }
+    campos_2 = {
+        'E_chiller': chiller['E_eletrica_total_kWh'],
+        'P_chiller': equipamentos['FT-101']['P_nom'],
+        'E_secador': secador['E_eletrica_total_kWh'],
+        'P_secador': equipamentos['TDR-101']['P_nom']
+    }
+    campos = dict(zip(campos_1, formatar_numeros_brasileiro(campos_1.values(), 1)))
+    campos.update(zip(campos_2, formatar_numeros_brasileiro(campos_2.values(), 2)))
+    energias_consumidores = formatar_numeros_brasileiro((e for e, _ in consumidores), 1)
+    pcts_consumidores = formatar_numeros_brasileiro((e / total * 100 for e, _ in consumidores), 1)
+
+    campos['consumidores'] = ''.join(f"- {codigo}: {energia} kWh ({pct}%)\n" for (_, codigo), energia, pct
+                                     in zip(consumidores, energias_consumidores, pcts_consumidores))
+    campos['n_aprovadas'] = sum(verificacoes)
+    campos['n_verificacoes'] = len(verificacoes)
+    campos['lote'] = lote
+    return TEMPLATE_EXECUTIVO.substitute(campos)
+
+
+def renderizar_validacoes(resultado, lote='1'):
+    """Relatório de validações de um lote (texto)"""
+    secoes = '\n'.join(
+        f"{secao}:\n" + ''.join(f"  - {nome}: {'✓ PASSOU' if passou else '✗ FALHOU'}\n" for nome, passou in itens)
+        for secao, itens in verificacoes_lote(resultado).items()
+    )
+    return TEMPLATE_VALIDACOES.substitute(lote=lote, secoes=secoes)
+
+
+def gravar_atomico(caminho, texto):
+    """Grava o arquivo via temporário + os.replace (nunca fica meio escrito)"""
+    pasta = os.path.dirname(os.path.abspath(caminho))
+    with tempfile.NamedTemporaryFile('w', dir=pasta, suffix='.tmp', delete=False, encoding='utf-8',
+                                     newline='\n') as f:
+        f.write(texto)
+    os.chmod(f.name, 0o644)
+    os.replace(f.name, caminho)
+
+
+def gerar_relatorios_lote(resultado, pasta, lote='1'):
+    """
+    Grava relatorio_executivo.txt e relatorio_validacoes.txt de um lote na pasta
+
+    Returns:
+        lista de arquivos gravados
+    """
+    os.makedirs(pasta, exist_ok=True)
+    arquivos = [os.path.join(pasta, 'relatorio_executivo.txt'), os.path.join(pasta, 'relatorio_validacoes.txt')]
+    gravar_atomico(arquivos[0], renderizar_executivo(resultado, lote))
+    gravar_atomico(arquivos[1], renderizar_validacoes(resultado, lote))
+    return arquivos
+
+
+def _gerar_bloco(resultados, pastas, lotes):
+    """Trabalho de um processo: um bloco de lotes"""
+    arquivos = []
+    for resultado, pasta, lote in zip(resultados, pastas, lotes):
+        arquivos.extend(gerar_relatorios_lote(resultado, pasta, lote))
+    return arquivos
+
+
+def gerar_relatorios(resultados, pasta, ids_lotes=None, n_processos=None, tamanho_bloco=256):
+    """
+    Gera os relatórios de muitos lotes em paralelo (um subdiretório por lote)
+
+    Args:
+        resultados: lista de dicts no formato do retorno de main()
+        pasta: pasta da campanha (lote_<id>/relatorio_*.txt)
+        ids_lotes: identificação de cada lote (padrão: 1..N)
+        n_processos: processos de trabalho (padrão: núcleos disponíveis; 1 = serial)
+        tamanho_bloco: lotes por tarefa enviada a um processo
+
+    Returns:
+        lista de arquivos gravados, na ordem dos lotes
+    """
+    ids_lotes = [str(i + 1) for i in range(len(resultados))] if ids_lotes is None else [str(i) for i in ids_lotes]
+    pastas = [os.path.join(pasta, f'lote_{lote}') for lote in ids_lotes]
+    blocos = [(resultados[i:i + tamanho_bloco], pastas[i:i + tamanho_bloco], ids_lotes[i:i + tamanho_bloco])
+              for i in range(0, len(resultados), tamanho_bloco)]
+
+    n_processos = n_processos or min(len(blocos), os.cpu_count() or 1)
+    if n_processos <= 1:
+        partes = [_gerar_bloco(*bloco) for bloco in blocos]
+    else:
+        with ProcessPoolExecutor(max_workers=n_processos) as executor:
+            partes = list(executor.map(_gerar_bloco, *zip(*blocos)))
+    return [arquivo for parte in partes for arquivo in parte]
+
+
+# Exemplo de uso
+if __name__ == "__main__":
+    import contextlib
+    import io
+    import time
+    import numpy as np
+
+    from main import main
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        base = main()
+
+    # Campanha sintética: variações do lote nominal
+    rng = np.random.default_rng(0)
+    resultados = []
+    P_FR101 = base['equipamentos']['FR-101']['P_nom']
+    for fator in rng.uniform(0.9, 1.1, 2000):
+        r = dict(base, equipamentos=base['equipamentos'].sobrepor({'FR-101': {'P_nom': fator * P_FR101}}))
+        r['energia_processo'] += (fator - 1) * P_FR101 * 168
+        r['energia_total'] = r['energia_processo'] + r['energia_utilidades']
+        r['consumo_especifico'] = r['energia_total'] / r['massa_produto']
+        resultados.append(r)
+
+    with tempfile.TemporaryDirectory() as pasta:
+        t0 = time.perf_counter()
+        arquivos = gerar_relatorios(resultados, pasta)
+        duracao = time.perf_counter() - t0
+        with open(arquivos[0], encoding='utf-8') as f:
+            primeiro = f.read()
+        gerar_relatorios(resultados[:1], pasta)
+        with open(arquivos[0], encoding='utf-8') as f:
+            identico = f.read() == primeiro
+
+    print(f"=== {len(arquivos)} relatórios em {duracao:.2f} s (reexecução idêntica: {identico}) ===")
+    print(primeiro)
+    print(renderizar_validacoes(base))
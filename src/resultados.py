@@ -0,0 +1,159 @@
+"""
+resultados.py - Tipos Compactos para os Resultados do Chiller e do Secador
+Registros com __slots__ (sem dicionário por instância) que continuam
+acessíveis como dict (resultado['Q_part1_kJ'], .items(), .keys()), e tabelas
+NumPy estruturadas para guardar muitos lotes. Um registro criado a partir de
+uma tabela expõe os campos como views, sem cópia.
+Memória por lote do chiller: empilhar() grava em FORMATO_LOTES ('f4', ~7
+dígitos significativos, erro relativo < 1e-7) e fica ~15x menor que um dict
+de floats; com 'f8' (sem perda de precisão, padrão de tabela()) a redução é
+de ~7x.
+"""
+
+from collections.abc import Mapping
+
+import numpy as np
+
+# Formato das tabelas de muitos lotes: 4 bytes por campo (kJ/kWh com ~7 dígitos)
+FORMATO_LOTES = 'f4'
+
+
+class _Resultado(Mapping):
+    """Base: campos em __slots__ com interface de Mapping somente leitura"""
+
+    __slots__ = ()
+    CAMPOS = ()
+
+    def __init__(self, **campos):
+        for campo in self.CAMPOS:
+            setattr(self, campo, campos.pop(campo))
+        if campos:
+            raise KeyError(f"Campos desconhecidos: {sorted(campos)}")
+
+    def __getitem__(self, campo):
+        try:
+            return getattr(self, campo)
+        except (AttributeError, TypeError):
+            raise KeyError(campo) from None
+
+    def __iter__(self):
+        return iter(self.CAMPOS)
+
+    def __len__(self):
+        return len(self.CAMPOS)
+
+    def __contains__(self, campo):
+        return campo in self.CAMPOS
+
+    def __repr__(self):
+        return f"{type(self).__name__}({', '.join(f'{c}={getattr(self, c)!r}' for c in self.CAMPOS)})"
+
+    def como_dict(self):
+        """Cópia em dict comum (ex. para JSON)"""
+        return {campo: getattr(self, campo) for campo in self.CAMPOS}
+
+    @classmethod
+    def dtype(cls, formato='f8'):
+        """dtype estruturado com um número por campo ('f8' ou 'f4' para metade da memória)"""
+        return np.dtype([(campo, formato) for campo in cls.CAMPOS])
+
+    def tabela(self, formato='f8'):
+        """Tabela estruturada (um registro por lote) a partir de campos escalares ou arrays"""
+        valores = np.broadcast_arrays(*(np.asarray(getattr(self, c), dtype=float) for c in self.CAMPOS))
+        tabela = np.empty(valores[0].shape, dtype=self.dtype(formato))
+        for campo, valor in zip(self.CAMPOS, valores):
+            tabela[campo] = valor
+        return tabela
+
+    @classmethod
+    def de_tabela(cls, tabela):
+        """Registro cujos campos são views das colunas da tabela (sem cópia)"""
+        return cls(**{campo: tabela[campo] for campo in cls.CAMPOS})
+
+    @classmethod
+    def empilhar(cls, resultados, formato=FORMATO_LOTES):
+        """Tabela estruturada a partir de uma sequência de registros escalares ('f8' para precisão total)"""
+        return np.fromiter((tuple(getattr(r, c) for c in cls.CAMPOS) for r in resultados),
+                           dtype=cls.dtype(formato))
+
+
+class ResultadoChiller(_Resultado):
+    """Resultado de balanco_chiller_completo"""
+
+    CAMPOS = (
+        'Q_sf_sensivel_kJ', 'Q_sf_latente_kJ', 'Q_biomassa_inicial_kJ', 'Q_HCl_inicial_kJ',
+        'Q_etanol_sensivel_kJ', 'Q_perdas_total_kJ', 'Q_part1_kJ', 'Q_part2_kJ', 'Q_part3_kJ',
+        'Q_total_remover_kJ', 'E_eletrica_total_kWh', 'm_parte2_kg', 'm_parte3_kg'
+    )
+    __slots__ = CAMPOS
+
+
+class ResultadoSecador(_Resultado):
+    """Resultado de balanco_secador_completo"""
+
+    CAMPOS = (
+        'Q_cristais_sensivel_kJ', 'Q_agua_sensivel_kJ', 'Q_agua_latente_kJ', 'Q_etanol_sensivel_kJ',
+        'Q_etanol_latente_kJ', 'Q_total_util_kJ', 'Q_perdas_kJ', 'Q_total_fornecer_kJ', 'E_eletrica_total_kWh'
+    )
+    __slots__ = CAMPOS
+
+    @property
+    def Q_sensivel_kJ(self):
+        """Aquecimento de cristais, água e etanol"""
+        return calor_sensivel_secador(self)
+
+    @property
+    def Q_latente_kJ(self):
+        """Evaporação de água e etanol"""
+        return calor_latente_secador(self)
+
+
+def calor_sensivel_secador(secador):
+    """Aquecimento de cristais, água e etanol (kJ) - ResultadoSecador ou qualquer Mapping com os campos"""
+    return secador['Q_cristais_sensivel_kJ'] + secador['Q_agua_sensivel_kJ'] + secador['Q_etanol_sensivel_kJ']
+
+
+def calor_latente_secador(secador):
+    """Evaporação de água e etanol (kJ) - ResultadoSecador ou qualquer Mapping com os campos"""
+    return secador['Q_agua_latente_kJ'] + secador['Q_etanol_latente_kJ']
+
+
+# Exemplo de uso
+if __name__ == "__main__":
+    import sys
+    import tracemalloc
+
+    from src.lotes import avaliar_lotes
+
+    def memoria(criar, n):
+        tracemalloc.start()
+        objetos = criar(n)
+        usado = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del objetos
+        return usado / n
+
+    # Cada resultado com seus próprios floats, como sai de balanco_chiller_completo
+    rng = np.random.default_rng(0)
+    valores = rng.random((100_000, len(ResultadoChiller.CAMPOS)))
+    registros = lambda n: (ResultadoChiller(**dict(zip(ResultadoChiller.CAMPOS, v.tolist()))) for v in valores[:n])
+    por_dict = memoria(lambda n: [dict(zip(ResultadoChiller.CAMPOS, v.tolist())) for v in valores[:n]], 100_000)
+    por_registro = memoria(lambda n: list(registros(n)), 100_000)
+    por_tabela_f8 = memoria(lambda n: ResultadoChiller.empilhar(registros(n), 'f8'), 100_000)
+    por_tabela = memoria(lambda n: ResultadoChiller.empilhar(registros(n)), 100_000)
+
+    print("=== MEMÓRIA POR LOTE (resultado do chiller, 13 campos) ===")
+    print(f"dict:               {por_dict:6.0f} B")
+    print(f"registro __slots__: {por_registro:6.0f} B")
+    print(f"tabela 'f8':        {por_tabela_f8:6.0f} B ({por_dict / por_tabela_f8:.0f}x menos que dict)")
+    print(f"tabela de lotes:    {por_tabela:6.0f} B ({por_dict / por_tabela:.0f}x menos que dict, '{FORMATO_LOTES}')")
+    tabela = ResultadoChiller.empilhar(registros(100_000))
+    erro = max(np.abs(tabela[c] / valores[:, k] - 1).max() for k, c in enumerate(ResultadoChiller.CAMPOS))
+    print(f"erro relativo máximo de '{FORMATO_LOTES}': {erro:.1e}")
+
+    colunas = avaliar_lotes({'COP_chiller': rng.uniform(2.5, 3.5, 5)})
+    secador = ResultadoSecador(**{c: colunas[f'secador.{c}'] for c in ResultadoSecador.CAMPOS})
+    tabela = secador.tabela()
+    visao = ResultadoSecador.de_tabela(tabela)
+    print(f"\nview sem cópia: {np.shares_memory(visao['Q_perdas_kJ'], tabela)} | "
+          f"Q sensível = {visao.Q_sensivel_kJ[0]:.1f} kJ | {sys.getsizeof(tabela) / len(tabela):.0f} B/lote")
@@ -0,0 +1,307 @@
+"""
+simulacao.py - Simulação de Eventos Discretos da Produção com Equipamentos Compartilhados
+Os lotes chegam ao longo do tempo e seguem a sequência de equipamentos_processo
+(início nominal e precedências). O trem V-102/FT-101, as centrífugas e o
+TDR-101 são recursos únicos disputados pelos lotes em fila FIFO; o trem do
+chiller retém o lote no V-102 refrigerado até a centrífuga seguinte ficar
+livre, gastando energia de espera (Q_perdas_V102 / COP). Uma fila de
+prioridade (heapq) de eventos simula anos de operação em segundos.
+"""
+
+import heapq
+from collections import deque
+
+import numpy as np
+
+from src import constants as C
+from src.lotes import avaliar_lotes
+
+HORAS_SEMANA = 168
+
+# Tipos de evento (a ordem desempata eventos simultâneos: términos liberam recursos antes de novas chegadas)
+FIM, PRONTA, CHEGADA = 0, 1, 2
+
+
+def chegadas_poisson(lotes_por_semana, horizonte_h, semente=0):
+    """Instantes de chegada (h) de um processo de Poisson até horizonte_h"""
+    rng = np.random.default_rng(semente)
+    n = rng.poisson(lotes_por_semana * horizonte_h / HORAS_SEMANA)
+    return np.sort(rng.uniform(0, horizonte_h, n))
+
+
+def chegadas_regulares(lotes_por_semana, horizonte_h):
+    """Um lote a cada 168/lotes_por_semana h"""
+    return np.arange(0, horizonte_h, HORAS_SEMANA / lotes_por_semana)
+
+
+def roteiro_lote(equipamentos=None, inicio_equipamentos=None, precedencias=None, recursos=None):
+    """
+    Tarefas de um lote agrupadas em etapas (um recurso compartilhado por etapa)
+
+    Cada equipamento é uma tarefa pronta em max(chegada + início nominal,
+    término dos antecessores). Equipamentos do mesmo recurso formam uma etapa,
+    que só começa quando todas as suas tarefas estão prontas e o recurso livre;
+    equipamentos fora de 'recursos' são exclusivos do lote (sem disputa).
+
+    Args:
+        equipamentos: {codigo: {'tempo': h, ...}} (padrão: C.equipamentos_processo)
+        inicio_equipamentos: início nominal de cada equipamento (padrão: C.inicio_equipamentos)
+        precedencias: pares (antecessor, sucessor) término → início (padrão: C.precedencias_processo)
+        recursos: {recurso: {'equipamentos', 'unidades', 'retem_lote', 'perdas_espera'}}
+                  (padrão: C.recursos_planta); retem_lote = o recurso só é liberado quando o lote
+                  começa a etapa seguinte; perdas_espera = constante de ganho térmico (kW)
+                  removido pelo chiller enquanto retém o lote
+
+    Returns:
+        dict com codigos, tempo, nominal, antecessores, sucessores e, por etapa, recurso e tarefas
+    """
+    equipamentos = C.equipamentos_processo if equipamentos is None else equipamentos
+    inicio_equipamentos = C.inicio_equipamentos if inicio_equipamentos is None else inicio_equipamentos
+    precedencias = C.precedencias_processo if precedencias is None else precedencias
+    recursos = C.recursos_planta if recursos is None else recursos
+
+    codigos = list(equipamentos)
+    indice = {c: i for i, c in enumerate(codigos)}
+    antecessores = [[] for _ in codigos]
+    sucessores = [[] for _ in codigos]
+    for a, b in precedencias:
+        antecessores[indice[b]].append(indice[a])
+        sucessores[indice[a]].append(indice[b])
+
+    etapa_da_tarefa = [None] * len(codigos)
+    etapas = []
+    for recurso, dados in recursos.items():
+        tarefas = [indice[c] for c in dados['equipamentos'] if c in indice]
+        for i in tarefas:
+            etapa_da_tarefa[i] = len(etapas)
+        etapas.append({'recurso': recurso, 'tarefas': tarefas, 'unidades': int(dados.get('unidades', 1)),
+                       'retem_lote': bool(dados.get('retem_lote')), 'perdas_espera': dados.get('perdas_espera')})
+    for i in range(len(codigos)):
+        if etapa_da_tarefa[i] is None:
+            etapa_da_tarefa[i] = len(etapas)
+            etapas.append({'recurso': None, 'tarefas': [i], 'unidades': 0, 'retem_lote': False,
+                           'perdas_espera': None})
+
+    for etapa in etapas:
+        # Sucessores fora da etapa: com retem_lote, o recurso só é liberado quando todos começarem
+        etapa['sucessores_externos'] = sorted({s for i in etapa['tarefas'] for s in sucessores[i]
+                                               if etapa_da_tarefa[s] != etapa_da_tarefa[i]})
+    return {
+        'codigos': codigos,
+        'tempo': [float(equipamentos[c]['tempo']) for c in codigos],
+        'nominal': [float(inicio_equipamentos[c]) for c in codigos],
+        'antecessores': antecessores,
+        'sucessores': sucessores,
+        'etapa_da_tarefa': etapa_da_tarefa,
+        'etapas': etapas
+    }
+
+
+def simular_producao(chegadas_h, horizonte_h=None, roteiro=None, energia_lote_kWh=None, perdas_espera_kW=None,
+                     massa_lote_kg=None, variabilidade=0.0, semente=0):
+    """
+    Simula a campanha com disputa pelos recursos compartilhados
+
+    Args:
+        chegadas_h: instantes de inoculação dos lotes (h)
+        horizonte_h: fim da simulação (padrão: até o último lote terminar)
+        roteiro: saída de roteiro_lote (padrão: roteiro_lote())
+        energia_lote_kWh: energia de um lote sem espera (padrão: energia_total de avaliar_lotes)
+        perdas_espera_kW: {recurso: kW elétricos enquanto retém um lote já processado}
+                          (padrão: constante 'perdas_espera' do recurso / COP_chiller)
+        massa_lote_kg: produto por lote (padrão: massa_produto de avaliar_lotes)
+        variabilidade: coeficiente de variação das durações (gama com média = tempo nominal);
+                       0 = durações fixas. A energia do lote continua a nominal.
+        semente: semente das durações sorteadas
+
+    Returns:
+        dict com 'lotes_concluidos', 'lotes_por_semana', 'ciclo_medio_h', 'ciclo_max_h',
+        'utilizacao' {recurso: fração do horizonte ocupada}, 'espera_media_h' e 'espera_max_h'
+        {recurso: fila antes do início}, 'retencao_media_h' {recurso}, 'fila_max' {recurso},
+        'energia_espera_kWh', 'energia_total_kWh', 'consumo_especifico', 'inicio_h', 'fim_h'
+        (arrays por lote; NaN = não concluído) e 'eventos'
+    """
+    roteiro = roteiro_lote() if roteiro is None else roteiro
+    if energia_lote_kWh is None or massa_lote_kg is None:
+        nominal = avaliar_lotes()
+        energia_lote_kWh = float(nominal['energia_total']) if energia_lote_kWh is None else energia_lote_kWh
+        massa_lote_kg = float(nominal['massa_produto']) if massa_lote_kg is None else massa_lote_kg
+    if perdas_espera_kW is None:
+        perdas_espera_kW = {e['recurso']: getattr(C, e['perdas_espera']) / C.COP_chiller
+                            for e in roteiro['etapas'] if e['perdas_espera']}
+
+    tempo, nominal = roteiro['tempo'], roteiro['nominal']
+    antecessores, sucessores = roteiro['antecessores'], roteiro['sucessores']
+    etapa_da_tarefa, etapas = roteiro['etapa_da_tarefa'], roteiro['etapas']
+    n_tarefas, n_etapas = len(tempo), len(etapas)
+    # Etapas que retêm o lote até o início de cada tarefa
+    retida_por = [[e for e, etapa in enumerate(etapas) if etapa['retem_lote'] and i in etapa['sucessores_externos']]
+                  for i in range(n_tarefas)]
+    chegadas_h = np.sort(np.asarray(chegadas_h, dtype=float))
+    n_lotes = len(chegadas_h)
+    horizonte_h = np.inf if horizonte_h is None else float(horizonte_h)
+
+    recursos = sorted({e['recurso'] for e in etapas if e['recurso'] is not None})
+    livres = {r: next(e['unidades'] for e in etapas if e['recurso'] == r) for r in recursos}
+    filas = {r: deque() for r in recursos}
+    ocupado = dict.fromkeys(recursos, 0.0)
+    espera = {r: [] for r in recursos}
+    retencao = {r: [] for r in recursos}
+    fila_max = dict.fromkeys(recursos, 0)
+
+    # Estado por lote (criado na chegada)
+    pendentes_ant, pronta_em, tarefas_prontas, fins_pendentes, sucessores_pendentes = {}, {}, {}, {}, {}
+    fim_tarefas, restantes = {}, {}
+    em_uso = {}                      # (lote, etapa) com recurso ocupado -> instante de início
+    fim_lote = np.full(n_lotes, np.nan)
+    energia_espera = 0.0
+
+    if variabilidade > 0:
+        forma = 1 / variabilidade ** 2
+        duracoes = np.random.default_rng(semente).gamma(forma, np.array(tempo) / forma, (n_lotes, n_tarefas)).tolist()
+    else:
+        duracoes = [tempo] * n_lotes
+
+    eventos = [(t, CHEGADA, k, -1) for k, t in enumerate(chegadas_h)]
+    heapq.heapify(eventos)
+    n_eventos = 0
+
+    def iniciar_etapa(agora, lote, e):
+        """Recurso concedido: inicia as tarefas da etapa"""
+        if etapas[e]['recurso'] is not None:
+            em_uso[lote, e] = agora
+        base = min(nominal[i] for i in etapas[e]['tarefas'])
+        for i in etapas[e]['tarefas']:
+            heapq.heappush(eventos, (agora + nominal[i] - base + duracoes[lote][i], FIM, lote, i))
+            for e_retida in retida_por[i]:
+                sucessores_pendentes[lote][e_retida] -= 1
+                if sucessores_pendentes[lote][e_retida] == 0 and fins_pendentes[lote][e_retida] == 0:
+                    liberar(agora, lote, e_retida)
+
+    def liberar(agora, lote, e):
+        """Devolve o recurso da etapa e atende o próximo da fila"""
+        nonlocal energia_espera
+        etapa = etapas[e]
+        recurso = etapa['recurso']
+        ocupado[recurso] += agora - em_uso.pop((lote, e))
+        retido = agora - fim_tarefas[lote][e]
+        retencao[recurso].append(retido)
+        energia_espera += perdas_espera_kW.get(recurso, 0.0) * retido
+        if filas[recurso]:
+            t_pedido, proximo, e_proximo = filas[recurso].popleft()
+            espera[recurso].append(agora - t_pedido)
+            iniciar_etapa(agora, proximo, e_proximo)
+        else:
+            livres[recurso] += 1
+
+    def pedir_etapa(agora, lote, e):
+        """Todas as tarefas da etapa prontas: pega o recurso ou entra na fila"""
+        recurso = etapas[e]['recurso']
+        if recurso is None:
+            iniciar_etapa(agora, lote, e)
+        elif livres[recurso] > 0:
+            livres[recurso] -= 1
+            espera[recurso].append(0.0)
+            iniciar_etapa(agora, lote, e)
+        else:
+            filas[recurso].append((agora, lote, e))
+            fila_max[recurso] = max(fila_max[recurso], len(filas[recurso]))
+
+    while eventos:
+        agora, tipo, lote, i = heapq.heappop(eventos)
+        if agora > horizonte_h:
+            break
+        n_eventos += 1
+
+        if tipo == CHEGADA:
+            pendentes_ant[lote] = [len(a) for a in antecessores]
+            pronta_em[lote] = [0.0] * n_tarefas
+            tarefas_prontas[lote] = [0] * n_etapas
+            fins_pendentes[lote] = [len(e['tarefas']) for e in etapas]
+            sucessores_pendentes[lote] = [len(e['sucessores_externos']) if e['retem_lote'] else 0 for e in etapas]
+            fim_tarefas[lote] = [0.0] * n_etapas
+            restantes[lote] = n_tarefas
+            for j in range(n_tarefas):
+                if not antecessores[j]:
+                    heapq.heappush(eventos, (agora + nominal[j], PRONTA, lote, j))
+
+        elif tipo == PRONTA:
+            e = etapa_da_tarefa[i]
+            tarefas_prontas[lote][e] += 1
+            if tarefas_prontas[lote][e] == len(etapas[e]['tarefas']):
+                pedir_etapa(agora, lote, e)
+
+        else:   # FIM
+            e = etapa_da_tarefa[i]
+            fins_pendentes[lote][e] -= 1
+            if fins_pendentes[lote][e] == 0:
+                fim_tarefas[lote][e] = agora
+                if etapas[e]['recurso'] is not None and sucessores_pendentes[lote][e] == 0:
+                    liberar(agora, lote, e)
+            for s in sucessores[i]:
+                pronta_em[lote][s] = max(pronta_em[lote][s], agora)
+                pendentes_ant[lote][s] -= 1
+                if pendentes_ant[lote][s] == 0:
+                    inicio = max(chegadas_h[lote] + nominal[s], pronta_em[lote][s])
+                    heapq.heappush(eventos, (inicio, PRONTA, lote, s))
+            restantes[lote] -= 1
+            if restantes[lote] == 0:
+                fim_lote[lote] = agora
+                for estado in (pendentes_ant, pronta_em, tarefas_prontas, fins_pendentes, sucessores_pendentes,
+                               fim_tarefas, restantes):
+                    del estado[lote]
+
+    fim_simulacao = horizonte_h if np.isfinite(horizonte_h) else float(np.nanmax(fim_lote, initial=0.0))
+    for (lote, e), inicio in em_uso.items():          # etapas ainda em curso no fim do horizonte
+        ocupado[etapas[e]['recurso']] += fim_simulacao - inicio
+    concluidos = ~np.isnan(fim_lote)
+    ciclo = fim_lote[concluidos] - chegadas_h[concluidos]
+    n_concluidos = int(concluidos.sum())
+    energia_total = n_concluidos * energia_lote_kWh + energia_espera
+
+    def media(valores):
+        return float(np.mean(valores)) if len(valores) else 0.0
+
+    return {
+        'lotes_concluidos': n_concluidos,
+        'lotes_por_semana': n_concluidos / fim_simulacao * HORAS_SEMANA if fim_simulacao > 0 else 0.0,
+        'ciclo_medio_h': media(ciclo),
+        'ciclo_max_h': float(ciclo.max()) if n_concluidos else 0.0,
+        'utilizacao': {r: ocupado[r] / fim_simulacao for r in recursos},
+        'espera_media_h': {r: media(espera[r]) for r in recursos},
+        'espera_max_h': {r: max(espera[r], default=0.0) for r in recursos},
+        'retencao_media_h': {r: media(retencao[r]) for r in recursos},
+        'fila_max': fila_max,
+        'energia_espera_kWh': energia_espera,
+        'energia_total_kWh': energia_total,
+        'consumo_especifico': energia_total / (n_concluidos * massa_lote_kg) if n_concluidos else np.nan,
+        'inicio_h': chegadas_h,
+        'fim_h': fim_lote,
+        'eventos': n_eventos
+    }
+
+
+# Exemplo de uso
+if __name__ == "__main__":
+    import time
+
+    roteiro = roteiro_lote()
+    print("=== LOTE ISOLADO ===")
+    isolado = simular_producao([0.0], roteiro=roteiro)
+    print(f"Ciclo: {isolado['ciclo_medio_h']:.0f} h (duracao_lote_h = {C.duracao_lote_h} h)")
+
+    anos = 10
+    horizonte = anos * 8760
+    for variabilidade in (0.0, 0.2):
+        print(f"\n=== {anos} ANOS, CHEGADAS DE POISSON, CV DAS DURAÇÕES {variabilidade:.0%} ===")
+        for taxa in (6, 9, 11, 12):
+            t0 = time.perf_counter()
+            r = simular_producao(chegadas_poisson(taxa, horizonte), horizonte, roteiro=roteiro,
+                                 variabilidade=variabilidade)
+            duracao = time.perf_counter() - t0
+            print(f"{taxa:2d} lotes/sem → {r['lotes_por_semana']:5.2f}/sem | ciclo {r['ciclo_medio_h']:4.0f} h | "
+                  f"fila do trem {r['espera_media_h']['trem_chiller']:5.1f} h | "
+                  f"retido no V-102 {r['retencao_media_h']['trem_chiller']:4.2f} h | "
+                  f"{r['energia_espera_kWh']:6,.0f} kWh de espera | {r['consumo_especifico']:.3f} kWh/kg | "
+                  f"{r['eventos']:,} eventos em {duracao:.2f} s")
+        print("Ocupação a 12 lotes/sem: " + " | ".join(f"{k} {v:.0%}" for k, v in r['utilizacao'].items()))
@@ -0,0 +1,414 @@
+"""
+substituto.py - Modelo Substituto (Surrogate) do Balanço Completo
+Amostra avaliar_lotes (os cálculos do main()) por hipercubo latino nas
+faixas declaradas e ajusta um polinômio de Legendre (caos polinomial com
+entradas uniformes) por mínimos quadrados. Depois do ajuste os termos são
+convertidos para monômios: consultas em massa custam um produto por
+monômio e um produto de matrizes por bloco; consultas pontuais usam uma
+função Python gerada em forma de Horner. Pontos fora do domínio de treino
+voltam ao modelo exato.
+"""
+
+from itertools import combinations_with_replacement, product
+from math import prod
+
+import numpy as np
+from numpy.polynomial import legendre as polinomio_legendre
+
+from src import constants as C
+from src.lotes import avaliar_lotes
+
+SAIDAS = ('energia_total', 'consumo_especifico')
+
+
+def indices_multiplos(d, grau):
+    """
+    Multi-índices de grau total ≤ grau em d variáveis
+
+    Returns:
+        array (m, d) de inteiros - linha k = graus do termo k em cada variável
+    """
+    termos = [np.zeros(d, dtype=np.int64)]
+    for g in range(1, grau + 1):
+        for variaveis in combinations_with_replacement(range(d), g):
+            termos.append(np.bincount(variaveis, minlength=d))
+    return np.array(termos)
+
+
+def legendre(z, grau):
+    """
+    Polinômios de Legendre P_0..P_grau (normalizados: média quadrática 1 em [-1, 1])
+
+    Args:
+        z: array (...) em [-1, 1]
+        grau: grau máximo
+
+    Returns:
+        array (grau + 1, ...)
+    """
+    P = np.empty((grau + 1,) + np.shape(z), dtype=float)
+    P[0] = 1.0
+    if grau > 0:
+        P[1] = z
+    for k in range(1, grau):
+        np.multiply(z, P[k], out=P[k + 1])
+        P[k + 1] *= (2 * k + 1) / (k + 1)
+        P[k + 1] -= k / (k + 1) * P[k - 1]
+    for k in range(1, grau + 1):
+        P[k] *= np.sqrt(2 * k + 1)
+    return P
+
+
+def _fechar(multi_indices, manter):
+    """Termos marcados mais os ancestrais (última variável zerada, recursivamente) - ordem preservada"""
+    manter = np.array(manter, dtype=bool)
+    posicao = {tuple(linha): k for k, linha in enumerate(multi_indices.tolist())}
+    for k in range(len(multi_indices) - 1, 0, -1):
+        if manter[k]:
+            linha = multi_indices[k].tolist()
+            linha[max(i for i, g in enumerate(linha) if g > 0)] = 0
+            manter[posicao[tuple(linha)]] = True
+    manter[0] = True
+    return multi_indices[manter]
+
+
+def hipercubo_latino(limites, n, rng):
+    """n pontos estratificados em {nome: (mín, máx)} - array (n, d) em unidades físicas"""
+    matriz = np.array(list(limites.values()), dtype=float)
+    estratos = np.stack([rng.permutation(n) for _ in limites], axis=1)
+    u = (estratos + rng.random(estratos.shape)) / n
+    return matriz[:, 0] + u * (matriz[:, 1] - matriz[:, 0])
+
+
+def _horner(termos, v):
+    """
+    Expressão Python de {expoentes: coeficiente} em forma de Horner nas variáveis z{v}, z{v+1}, ...
+
+    p = c_0 + z_v·(c_1 + z_v·(c_2 + ...)), com cada c_k (polinômio nas variáveis seguintes)
+    também em Horner. Retorna None se não há termos.
+    """
+    if not termos:
+        return None
+    if v == len(next(iter(termos))):
+        return repr(sum(termos.values()))
+    grupos = {}
+    for expoentes, coeficiente in termos.items():
+        grupos.setdefault(expoentes[v], {})[expoentes] = coeficiente
+    expressao = None
+    for k in range(max(grupos), -1, -1):
+        parcela = _horner(grupos.get(k, {}), v + 1)
+        if expressao is None:
+            expressao = parcela
+        elif parcela is None:
+            expressao = f'z{v} * ({expressao})'
+        else:
+            expressao = f'{parcela} + z{v} * ({expressao})'
+    return expressao
+
+
+class ModeloSubstituto:
+    """
+    Polinômio de Legendre ajustado às saídas de avaliar_lotes num hipercubo de entradas
+
+    As demais constantes (e as opções de avaliar_lotes) ficam fixas nos valores
+    do treino; só as variáveis de 'limites' podem variar nas consultas.
+    """
+
+    def __init__(self, limites, multi_indices, coeficientes, saidas=SAIDAS, erro_validacao=None, opcoes=None):
+        self.limites = {nome: (float(a), float(b)) for nome, (a, b) in limites.items()}
+        self.nomes = tuple(self.limites)
+        self.multi_indices = np.asarray(multi_indices, dtype=np.int64)
+        self.coeficientes = np.asarray(coeficientes, dtype=float)          # (m, len(saidas))
+        self.saidas = tuple(saidas)
+        self.erro_validacao = erro_validacao or {}
+        self.opcoes = opcoes or {}
+        self.grau = int(self.multi_indices.sum(axis=1).max())
+        matriz = np.array(list(self.limites.values()))
+        self._centro = matriz.mean(axis=1)
+        self._meia_largura = (matriz[:, 1] - matriz[:, 0]) / 2
+        self._escala = 1 / self._meia_largura
+        # Termo k = termo 'pai' (mesmo multi-índice com a última variável zerada) × P_g(x_j):
+        # o conjunto de multi-índices é fechado para baixo, então cada termo custa um produto
+        posicao = {tuple(linha): k for k, linha in enumerate(self.multi_indices.tolist())}
+        self._recorrencia = []
+        for linha in self.multi_indices.tolist()[1:]:
+            j = max(i for i, g in enumerate(linha) if g > 0)
+            pai = list(linha)
+            pai[j] = 0
+            self._recorrencia.append((posicao[tuple(pai)], j, linha[j]))
+        self._compilar()
+
+    @classmethod
+    def treinar(cls, limites=None, saidas=SAIDAS, grau=3, n_amostras=None, n_validacao=2000, semente=0,
+                regularizacao=1e-10, tolerancia_termos=1e-6, **opcoes):
+        """
+        Amostra o modelo exato e ajusta o polinômio
+
+        Args:
+            limites: {constante: (mín, máx)} (padrão: C.dominio_substituto)
+            saidas: colunas de avaliar_lotes a aproximar
+            grau: grau total do polinômio
+            n_amostras: pontos de treino (padrão: 10 × número de termos)
+            n_validacao: pontos independentes para o erro de validação
+            semente: semente da amostragem
+            regularizacao: ridge relativo (estabiliza termos mal determinados)
+            tolerancia_termos: termos com |coeficiente| < tolerância × |termo constante| em todas
+                               as saídas são removidos e o ajuste é refeito (0 = mantém todos)
+            **opcoes: repassadas a avaliar_lotes (mapa_cop, equipamentos, ...)
+
+        Returns:
+            ModeloSubstituto com erro_validacao {saida: {'rms_rel', 'max_rel'}}
+        """
+        limites = C.dominio_substituto if limites is None else limites
+        multi_indices = indices_multiplos(len(limites), grau)
+        n_amostras = n_amostras or 10 * len(multi_indices)
+        rng = np.random.default_rng(semente)
+
+        modelo = cls(limites, multi_indices, np.zeros((len(multi_indices), len(saidas))), saidas, opcoes=opcoes)
+        X = hipercubo_latino(limites, n_amostras, rng)
+        Y = modelo._exato(X)
+        modelo._ajustar(X, Y, regularizacao)
+        if tolerancia_termos > 0:
+            # Saídas aditivas (chiller + secador + ...) deixam a maioria das interações nulas
+            relevante = np.any(np.abs(modelo.coeficientes) > tolerancia_termos * np.abs(modelo.coeficientes[0]),
+                               axis=1)
+            modelo = cls(limites, _fechar(multi_indices, relevante), modelo.coeficientes, saidas, opcoes=opcoes)
+            modelo._ajustar(X, Y, regularizacao)
+
+        X_val = hipercubo_latino(limites, n_validacao, rng)
+        Y_val = modelo._exato(X_val)
+        erro = (modelo.prever_matriz(X_val) - Y_val) / np.abs(Y_val)
+        modelo.erro_validacao = {s: {'rms_rel': float(np.sqrt(np.mean(erro[:, k] ** 2))),
+                                     'max_rel': float(np.abs(erro[:, k]).max())}
+                                 for k, s in enumerate(saidas)}
+        return modelo
+
+    def _ajustar(self, X, Y, regularizacao):
+        """Mínimos quadrados com ridge relativo para os termos atuais"""
+        A = self._base(X)
+        AAt = A @ A.T
+        AAt[np.diag_indices_from(AAt)] += regularizacao * np.trace(AAt) / len(AAt)
+        self.coeficientes = np.linalg.solve(AAt, A @ Y)
+        self._compilar()
+
+    def _compilar(self):
+        """
+        Forma monomial em z = (x − centro) / meia_largura dos termos mantidos
+
+        Cada termo de Legendre vira a soma dos monômios de ∏ P_g(z_j). O
+        conjunto é completado com os 'pais' (último expoente não nulo − 1,
+        coeficiente zero) para que cada monômio custe um produto em lote.
+        Para consultas pontuais gera uma função com o polinômio de cada saída
+        em forma de Horner (uma multiplicação e uma soma por monômio).
+        """
+        potencias = [np.sqrt(2 * g + 1) * polinomio_legendre.leg2poly(np.eye(g + 1)[g])
+                     for g in range(self.grau + 1)]
+        monomios = {}
+        for alfa, coeficiente in zip(self.multi_indices.tolist(), self.coeficientes):
+            fatores = [[(p, c) for p, c in enumerate(potencias[g]) if c != 0] for g in alfa]
+            for combinacao in product(*fatores):
+                expoentes = tuple(p for p, _ in combinacao)
+                peso = prod(c for _, c in combinacao) * coeficiente
+                monomios[expoentes] = monomios[expoentes] + peso if expoentes in monomios else peso
+        for expoentes in list(monomios):
+            pai = list(expoentes)
+            while any(pai):
+                pai[max(i for i, g in enumerate(pai) if g > 0)] -= 1
+                monomios.setdefault(tuple(pai), np.zeros(len(self.saidas)))
+
+        ordem = sorted(monomios, key=lambda e: (sum(e), e))
+        posicao = {e: k for k, e in enumerate(ordem)}
+        self._monomios_coeficientes = np.array([monomios[e] for e in ordem])            # (m, len(saidas))
+        self._monomios_recorrencia = []
+        for expoentes in ordem[1:]:
+            j = max(i for i, g in enumerate(expoentes) if g > 0)
+            pai = list(expoentes)
+            pai[j] -= 1
+            self._monomios_recorrencia.append((posicao[tuple(pai)], j))
+
+        d = len(self.nomes)
+        argumentos = ', '.join(f'x{j}' for j in range(d))
+        dentro = ' and '.join(f'{a!r} <= x{j} <= {b!r}' for j, (a, b) in enumerate(self.limites.values()))
+        expressoes = [_horner({e: float(c[k]) for e, c in monomios.items() if c[k] != 0}, 0) or '0.0'
+                      for k in range(len(self.saidas))]
+        self._fonte_ponto = '\n'.join(
+            [f'def ponto({argumentos}):',
+             f'    if not ({dentro}):',
+             '        return None']
+            + [f'    z{j} = (x{j} - {c!r}) * {s!r}' for j, (c, s) in enumerate(zip(self._centro.tolist(),
+                                                                                   self._escala.tolist()))]
+            + [f'    return ({", ".join(expressoes)},)'])
+        escopo = {}
+        exec(compile(self._fonte_ponto, '<ModeloSubstituto.ponto>', 'exec'), escopo)
+        self._ponto = escopo['ponto']
+
+    def _exato(self, X):
+        """Saídas do modelo exato para X (n, d) - array (n, len(saidas))"""
+        resultado = avaliar_lotes({nome: X[:, j] for j, nome in enumerate(self.nomes)}, **self.opcoes)
+        return np.stack([np.broadcast_to(resultado[s], (len(X),)) for s in self.saidas], axis=1)
+
+    def _base(self, X):
+        """Matriz dos termos de Legendre (m, n) para pontos X (n, d) - usada no ajuste"""
+        z = np.ascontiguousarray(np.clip((X - self._centro) / self._meia_largura, -1, 1).T)
+        P = legendre(z, self.grau)                                                       # (grau+1, d, n)
+        A = np.empty((len(self.multi_indices), len(X)))
+        A[0] = 1.0
+        for k, (pai, j, g) in enumerate(self._recorrencia, start=1):
+            np.multiply(A[pai], P[g, j], out=A[k])
+        return A
+
+    def dentro_dominio(self, X):
+        """Máscara (n,) dos pontos X (n, d) dentro do hipercubo de treino"""
+        matriz = np.array(list(self.limites.values()))
+        return np.all((X >= matriz[:, 0]) & (X <= matriz[:, 1]), axis=1)
+
+    def _avaliar(self, colunas, tamanho_bloco=8192):
+        """
+        Polinômio em forma monomial para as colunas de entrada (d arrays (n,)), sem verificar o domínio
+
+        Returns:
+            array (len(saidas), n)
+        """
+        n = len(colunas[0])
+        coeficientes = self._monomios_coeficientes.T                                   # (len(saidas), m)
+        Y = np.empty((len(self.saidas), n))
+        z = np.empty((len(colunas), min(tamanho_bloco, n)))
+        M = np.empty((len(coeficientes[0]), min(tamanho_bloco, n)))
+        M[0] = 1.0
+        for inicio in range(0, n, tamanho_bloco):
+            fim = min(inicio + tamanho_bloco, n)
+            b = fim - inicio
+            for j, coluna in enumerate(colunas):
+                np.subtract(coluna[inicio:fim], self._centro[j], out=z[j, :b])
+                z[j, :b] *= self._escala[j]
+            for k, (pai, j) in enumerate(self._monomios_recorrencia, start=1):
+                np.multiply(M[pai, :b], z[j, :b], out=M[k, :b])
+            np.matmul(coeficientes, M[:, :b], out=Y[:, inicio:fim])
+        return Y
+
+    def prever_matriz(self, X, tamanho_bloco=8192):
+        """
+        Predição do polinômio para X (n, d), sem verificar o domínio
+
+        Returns:
+            array (n, len(saidas))
+        """
+        X = np.atleast_2d(np.asarray(X, dtype=float))
+        return self._avaliar(list(X.T), tamanho_bloco).T
+
+    def prever_ponto(self, *valores):
+        """
+        Consulta pontual: valores na ordem de self.nomes, tupla na ordem de self.saidas
+
+        Avalia a função gerada em _compilar (floats Python, sem arrays); fora do
+        domínio usa o modelo exato.
+        """
+        resultado = self._ponto(*valores)
+        if resultado is None:
+            resultado = tuple(self._exato(np.array([valores], dtype=float))[0].tolist())
+        return resultado
+
+    def prever(self, parametros, exato_fora=True):
+        """
+        Saídas para um conjunto de pontos
+
+        Args:
+            parametros: {constante: array (N,) ou escalar} - só variáveis do domínio; as omitidas
+                        ficam no valor de src.constants
+            exato_fora: avalia com avaliar_lotes os pontos fora do domínio (senão: NaN)
+
+        Returns:
+            dict {saida: array (N,)} e 'exato' (máscara dos pontos avaliados pelo modelo exato)
+        """
+        desconhecidos = set(parametros) - set(self.nomes)
+        if desconhecidos:
+            raise KeyError(f"Variáveis fora do modelo substituto: {sorted(desconhecidos)}")
+        n = max((np.size(v) for v in parametros.values()), default=1)
+        if n == 1:
+            # Um ponto: função Horner gerada, sem o custo fixo das operações em arrays
+            valores = [float(np.asarray(parametros.get(nome, getattr(C, nome))).reshape(-1)[0]) for nome in self.nomes]
+            Y = self._ponto(*valores)
+            if Y is not None or not exato_fora:
+                resultado = {s: np.array([y]) for s, y in zip(self.saidas, Y or [np.nan] * len(self.saidas))}
+                resultado['exato'] = np.zeros(1, dtype=bool)
+                return resultado
+        # Colunas contíguas (fatias X[:, j] têm passo d e dobram o custo de _avaliar); escalares só por broadcast
+        colunas = [np.asarray(parametros.get(nome, getattr(C, nome)), dtype=float) for nome in self.nomes]
+        colunas = [np.ascontiguousarray(c) if c.size == n > 1 else np.broadcast_to(c, (n,)) for c in colunas]
+        fora = np.zeros(n, dtype=bool)
+        for coluna, (a, b) in zip(colunas, self.limites.values()):
+            fora |= ~((coluna >= a) & (coluna <= b))
+
+        Y = self._avaliar(colunas)
+        if fora.any():
+            Y[:, fora] = self._exato(np.stack([c[fora] for c in colunas], axis=1)).T if exato_fora else np.nan
+        resultado = dict(zip(self.saidas, Y))
+        resultado['exato'] = fora if exato_fora else np.zeros(n, dtype=bool)
+        return resultado
+
+    def salvar(self, caminho):
+        """Grava o modelo (sem as opções de avaliar_lotes) num .npz"""
+        np.savez(caminho, nomes=np.array(self.nomes), limites=np.array(list(self.limites.values())),
+                 multi_indices=self.multi_indices, coeficientes=self.coeficientes, saidas=np.array(self.saidas),
+                 erro=np.array([[e['rms_rel'], e['max_rel']] for e in self.erro_validacao.values()]))
+
+    @classmethod
+    def carregar(cls, caminho, **opcoes):
+        """Lê um modelo gravado por salvar; opcoes = as mesmas de avaliar_lotes usadas no treino"""
+        with np.load(caminho) as dados:
+            saidas = dados['saidas'].tolist()
+            erro = {s: {'rms_rel': float(r), 'max_rel': float(m)} for s, (r, m) in zip(saidas, dados['erro'])}
+            return cls(dict(zip(dados['nomes'].tolist(), dados['limites'])), dados['multi_indices'],
+                       dados['coeficientes'], saidas, erro, opcoes)
+
+
+# Exemplo de uso
+if __name__ == "__main__":
+    import time
+
+    from src.desempenho import MapaCOPChiller, MapaEficienciaSecador
+
+    opcoes = {'mapa_cop': MapaCOPChiller.padrao(), 'mapa_secador': MapaEficienciaSecador.padrao()}
+    t0 = time.perf_counter()
+    modelo = ModeloSubstituto.treinar(**opcoes)
+    print(f"=== SUBSTITUTO (com mapas de desempenho): {len(modelo.nomes)} variáveis, grau {modelo.grau}, "
+          f"{len(modelo.multi_indices)} termos (treino em {time.perf_counter() - t0:.2f} s) ===")
+    for saida, erro in modelo.erro_validacao.items():
+        print(f"{saida:20}: erro RMS {erro['rms_rel']:.2e} | máximo {erro['max_rel']:.2e} (relativo)")
+
+    # Consulta em massa: 2 milhões de pontos, 1% deles fora do domínio (COP 6)
+    rng = np.random.default_rng(1)
+    n = 2_000_000
+    X = hipercubo_latino(modelo.limites, n, rng)
+    X[:n // 100, modelo.nomes.index('COP_chiller')] = 6.0
+    parametros = {nome: X[:, j] for j, nome in enumerate(modelo.nomes)}
+
+    t0 = time.perf_counter()
+    previsto = modelo.prever(parametros)
+    duracao_substituto = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    exato = avaliar_lotes(parametros, **opcoes)
+    duracao_exato = time.perf_counter() - t0
+    erro = np.abs(previsto['consumo_especifico'] - exato['consumo_especifico']) / exato['consumo_especifico']
+    print(f"\n{n:,} pontos: substituto {n / duracao_substituto / 1e6:.1f} milhões/s "
+          f"({previsto['exato'].sum():,} pelo modelo exato) | avaliar_lotes {n / duracao_exato / 1e6:.1f} milhões/s")
+    print(f"Erro máximo em kWh/kg: {erro[~previsto['exato']].max():.2e} (domínio) | "
+          f"{erro[previsto['exato']].max():.1e} (fora)")
+
+    t0 = time.perf_counter()
+    modelo.prever_matriz(X[n // 100:])
+    print(f"prever_matriz (sem verificar domínio): {(n - n // 100) / (time.perf_counter() - t0) / 1e6:.1f} milhões/s")
+
+    # Consulta pontual (ex. controle deslizante): latência por chamada
+    valores = X[-1].tolist()
+    ponto = dict(zip(modelo.nomes, valores))
+    assert np.allclose(modelo.prever_ponto(*valores), [previsto[s][-1] for s in modelo.saidas])
+    latencias = {}
+    for nome, funcao, repeticoes in (('prever_ponto', lambda: modelo.prever_ponto(*valores), 100_000),
+                                     ('prever (dict)', lambda: modelo.prever(ponto), 2_000),
+                                     ('avaliar_lotes', lambda: avaliar_lotes(ponto, **opcoes), 200)):
+        t0 = time.perf_counter()
+        for _ in range(repeticoes):
+            funcao()
+        latencias[nome] = (time.perf_counter() - t0) / repeticoes * 1e6
+    print("Latência de 1 ponto: " + " | ".join(f"{k} {v:.2f} µs" for k, v in latencias.items()))
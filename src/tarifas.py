@@ -0,0 +1,232 @@
+"""
+tarifas.py - Custo, Demanda e Emissões de CO2 por Lote
+Mapeia a programação dos lotes (P × tempo dos equipamentos) sobre tarifas
+horo-sazonais, encargos de demanda e fatores de emissão horários.
+Integrais por somas de prefixo - sem laços por hora.
+"""
+
+import numpy as np
+
+from src import constants as C
+from src import calculations as calc
+
+CODIGO_UTILIDADES = 'UTILIDADES'
+
+
+def montar_janelas(inicios_lotes_h, equipamentos, inicio_equipamentos=None, incluir_utilidades=True):
+    """
+    Monta as janelas de operação (início, fim, potência) de cada equipamento em cada lote
+
+    Args:
+        inicios_lotes_h: início de cada lote (h desde o início do horizonte)
+        equipamentos: dicionário {codigo: {'P_nom': kW, 'tempo': h}} com FT-101/TDR-101 já calculados
+        inicio_equipamentos: {codigo: h após o início do lote} - escalar ou array por lote
+                             (padrão: C.inicio_equipamentos)
+        incluir_utilidades: adiciona as utilidades fixas como carga constante durante o FR-101
+
+    Returns:
+        dict com 'codigos' (lista K) e arrays (n_lotes, K): 'inicio', 'fim', 'potencia_kW'
+        (potência média na janela quando o equipamento tem perfil de carga)
+    """
+    inicio_equipamentos = C.inicio_equipamentos if inicio_equipamentos is None else inicio_equipamentos
+    inicios_lotes_h = np.asarray(inicios_lotes_h, dtype=float)
+
+    codigos, inicios, duracoes, potencias = [], [], [], []
+    for codigo, dados in equipamentos.items():
+        codigos.append(codigo)
+        inicios.append(inicios_lotes_h + inicio_equipamentos[codigo])
+        duracoes.append(np.broadcast_to(dados['tempo'], inicios_lotes_h.shape))
+        potencias.append(np.broadcast_to(calc.calcular_energia_equipamento(dados) / dados['tempo'],
+                                         inicios_lotes_h.shape))
+
+    if incluir_utilidades:
+        # Utilidades fixas (kWh/lote) distribuídas ao longo da fermentação (168 h)
+        t_utilidades = equipamentos['FR-101']['tempo']
+        codigos.append(CODIGO_UTILIDADES)
+        inicios.append(inicios_lotes_h + inicio_equipamentos['FR-101'])
+        duracoes.append(np.broadcast_to(t_utilidades, inicios_lotes_h.shape))
+        potencias.append(np.broadcast_to(C.E_utilidades_fixas_total / t_utilidades, inicios_lotes_h.shape))
+
+    inicio = np.stack(inicios, axis=-1).astype(float)
+    return {
+        'codigos': codigos,
+        'inicio': inicio,
+        'fim': inicio + np.stack(duracoes, axis=-1),
+        'potencia_kW': np.stack(potencias, axis=-1).astype(float)
+    }
+
+
+def calendario_horario(n_horas, inicio='2026-01-01'):
+    """
+    Calendário do horizonte em passos de 1 h
+
+    Returns:
+        (hora do dia, dia da semana 0=segunda, índice do mês desde o início, limites dos meses em h)
+    """
+    horas = np.datetime64(inicio, 'h') + np.arange(n_horas)
+    hora_dia = horas.astype('int64') % 24
+    dia_semana = (horas.astype('datetime64[D]').astype('int64') + 3) % 7   # 1970-01-01 = quinta
+    mes = horas.astype('datetime64[M]').astype('int64')
+    mes = mes - mes[0]
+    limites_meses = np.append(np.flatnonzero(np.diff(mes, prepend=-1)), n_horas)
+    return hora_dia, dia_semana, mes, limites_meses
+
+
+def perfil_tarifa(n_horas, tarifa=None, inicio='2026-01-01'):
+    """
+    Preço horário da energia (R$/kWh) na tarifa horo-sazonal
+
+    Args:
+        n_horas: tamanho do horizonte (h)
+        tarifa: dict como C.tarifa_energia
+        inicio: data de início do horizonte
+
+    Returns:
+        array (n_horas,) com preço em cada hora
+    """
+    tarifa = C.tarifa_energia if tarifa is None else tarifa
+    hora_dia, dia_semana, _, _ = calendario_horario(n_horas, inicio)
+    h0, h1 = tarifa['horas_ponta']
+    ponta = (hora_dia >= h0) & (hora_dia < h1) & (dia_semana < 5)
+    return np.where(ponta, tarifa['ponta'], tarifa['fora_ponta'])
+
+
+def acumular(valores_horarios):
+    """Soma de prefixo ao longo do último eixo: (..., H) → (..., H+1), começando em 0"""
+    valores = np.asarray(valores_horarios, dtype=float)
+    acumulado = np.zeros(valores.shape[:-1] + (valores.shape[-1] + 1,))
+    np.cumsum(valores, axis=-1, out=acumulado[..., 1:])
+    return acumulado
+
+
+def integrar_janelas(valores_horarios, acumulado, inicio, fim):
+    """
+    Integral de uma grandeza horária constante por hora entre inicio e fim (h fracionárias)
+
+    F(t) = acumulado[⌊t⌋] + (t - ⌊t⌋) × valor[⌊t⌋]; integral = F(fim) - F(inicio)
+
+    Args:
+        valores_horarios: array (..., H) - ex. preço por cenário
+        acumulado: acumular(valores_horarios)
+        inicio, fim: arrays de janelas (qualquer formato) em h
+
+    Returns:
+        array (..., *formato das janelas) - por 1 kW de carga
+    """
+    n_horas = valores_horarios.shape[-1]
+
+    def F(t):
+        t = np.clip(t, 0, n_horas)
+        i = np.minimum(np.floor(t).astype(np.int64), n_horas - 1)
+        return acumulado[..., i] + (t - i) * valores_horarios[..., i]
+
+    return F(fim) - F(inicio)
+
+
+def carga_horaria(janelas, n_horas):
+    """
+    Energia consumida em cada hora (kWh/h = kW médio) somando todas as janelas
+
+    Usa a energia acumulada L(t) = Σ P·(min(max(t, s), e) - s), montada com
+    diferenças nos pontos de mudança de inclinação - O(janelas + horas).
+
+    Returns:
+        array (n_horas,) com carga média horária (kW)
+    """
+    P = janelas['potencia_kW'].ravel()
+    s = np.clip(janelas['inicio'].ravel(), 0, n_horas)
+    e = np.clip(janelas['fim'].ravel(), 0, n_horas)
+
+    # L(t) inteiro = t·ΣP(pontos < t) - ΣP·ponto(pontos < t)
+    pontos = np.concatenate([s, e])
+    pesos = np.concatenate([P, -P])
+    idx = np.floor(pontos).astype(np.int64) + 1
+    inclinacao = np.bincount(idx, weights=pesos, minlength=n_horas + 2)[:n_horas + 1].cumsum()
+    deslocamento = np.bincount(idx, weights=pesos * pontos, minlength=n_horas + 2)[:n_horas + 1].cumsum()
+    energia_acumulada = np.arange(n_horas + 1) * inclinacao - deslocamento
+    return np.diff(energia_acumulada)
+
+
+def custo_lotes(janelas, horizonte_h, preco_horario=None, fator_emissao=None, tarifa_demanda=None,
+                inicio='2026-01-01', massa_produto=None):
+    """
+    Custo de energia, encargo de demanda e CO2 por lote e por kg de produto
+
+    Cenários: preco_horario/fator_emissao podem ser (H,) ou (S, H); tarifa_demanda
+    escalar ou (S,). Os resultados ganham o eixo de cenários à frente quando houver.
+
+    Args:
+        janelas: saída de montar_janelas
+        horizonte_h: número de horas do horizonte
+        preco_horario: R$/kWh por hora (padrão: perfil_tarifa(C.tarifa_energia))
+        fator_emissao: kg CO2/kWh - escalar, (H,) ou (S, H) (padrão: C.fator_emissao_rede)
+        tarifa_demanda: R$/kW·mês (padrão: C.tarifa_energia['demanda'])
+        inicio: data de início do horizonte
+        massa_produto: kg de produto por lote (padrão: C.m_cristais_secos)
+
+    Returns:
+        dict com arrays por lote e 'pico_mensal_kW'
+    """
+    preco_horario = perfil_tarifa(horizonte_h, inicio=inicio) if preco_horario is None else preco_horario
+    fator_emissao = C.fator_emissao_rede if fator_emissao is None else fator_emissao
+    tarifa_demanda = C.tarifa_energia['demanda'] if tarifa_demanda is None else tarifa_demanda
+    massa_produto = C.m_cristais_secos if massa_produto is None else massa_produto
+
+    inicio_j, fim_j = np.clip(janelas['inicio'], 0, horizonte_h), np.clip(janelas['fim'], 0, horizonte_h)
+    P = janelas['potencia_kW']
+    energia_lote = (P * (fim_j - inicio_j)).sum(axis=-1)
+
+    # Energia: R$ = Σ P × ∫preço dt
+    preco_horario = np.asarray(preco_horario, dtype=float)
+    custo_energia = (P * integrar_janelas(preco_horario, acumular(preco_horario), inicio_j, fim_j)).sum(axis=-1)
+
+    # Emissões
+    fator_emissao = np.asarray(fator_emissao, dtype=float)
+    if fator_emissao.ndim == 0:
+        CO2 = energia_lote * fator_emissao
+    else:
+        CO2 = (P * integrar_janelas(fator_emissao, acumular(fator_emissao), inicio_j, fim_j)).sum(axis=-1)
+
+    # Demanda: pico mensal da carga agregada, rateado pela energia de cada lote no mês
+    _, _, _, limites = calendario_horario(horizonte_h, inicio)
+    carga = carga_horaria(janelas, horizonte_h)
+    pico_mensal = np.maximum.reduceat(carga, limites[:-1])
+    energia_mensal = np.add.reduceat(carga, limites[:-1])
+    sobreposicao = np.clip(np.minimum(fim_j[..., None], limites[1:]) -
+                           np.maximum(inicio_j[..., None], limites[:-1]), 0, None)
+    energia_lote_mes = (P[..., None] * sobreposicao).sum(axis=-2)            # (n_lotes, M)
+    fracao = energia_lote_mes / np.where(energia_mensal > 0, energia_mensal, 1.0)
+    custo_demanda = np.multiply.outer(np.asarray(tarifa_demanda, dtype=float), fracao @ pico_mensal)
+
+    custo_total = custo_energia + custo_demanda
+    return {
+        'energia_kWh': energia_lote,
+        'custo_energia': custo_energia,
+        'custo_demanda': custo_demanda,
+        'custo_total': custo_total,
+        'CO2_kg': CO2,
+        'custo_por_kg': custo_total / massa_produto,
+        'CO2_por_kg': CO2 / massa_produto,
+        'pico_mensal_kW': pico_mensal
+    }
+
+
+# Exemplo de uso
+if __name__ == "__main__":
+    from formatacao_brasileira import formatar_numero_brasileiro
+    from src.cenarios import sobrepor_equipamentos
+
+    # Campanha de 1 ano: um lote iniciado por semana, FT-101/TDR-101 com potências calculadas
+    equipamentos = sobrepor_equipamentos(C.equipamentos_processo,
+                                         {'FT-101': {'P_nom': 0.27}, 'TDR-101': {'P_nom': 2.75}})
+
+    horizonte = 8760
+    janelas = montar_janelas(np.arange(0, horizonte - C.duracao_lote_h, 168), equipamentos)
+    resultado = custo_lotes(janelas, horizonte)
+
+    print("=== CUSTO POR LOTE (1º lote) ===")
+    print(f"Energia: {formatar_numero_brasileiro(resultado['energia_kWh'][0], 1)} kWh")
+    print(f"Custo energia: R$ {formatar_numero_brasileiro(resultado['custo_energia'][0], 2)}")
+    print(f"Custo demanda: R$ {formatar_numero_brasileiro(resultado['custo_demanda'][0], 2)}")
+    print(f"Custo por kg: R$ {formatar_numero_brasileiro(resultado['custo_por_kg'][0], 2)}/kg")
+    print(f"CO2 por kg: {formatar_numero_brasileiro(resultado['CO2_por_kg'][0], 2)} kg/kg")
@@ -0,0 +1,330 @@
+"""
+unidades.py - Dimensões Declaradas e Verificadas das Fórmulas
+Cada fórmula de calculations.py declara a unidade das entradas e das saídas
+com o decorador @unidades, que só anota a função (sem invólucro: nenhum
+custo por chamada). verificar_modulo executa uma vez todo o grafo de
+fórmulas do módulo com grandezas dimensionais (valor em SI + expoentes de
+kg, m, s, K): somas de dimensões diferentes, chamadas com a unidade errada e
+fatores de conversão errados (ex. um 3600 a mais ou a menos) são apontados
+antes de qualquer avaliação em lote, que roda sobre floats/arrays puros.
+"""
+
+import inspect
+import types
+
+import numpy as np
+
+ADIMENSIONAL = (0, 0, 0, 0)
+_ENERGIA = (1, 2, -2, 0)
+
+# Unidade: (valor em SI de 1 unidade, expoentes de kg, m, s, K)
+# Temperaturas entram só como diferenças (°C e K têm a mesma escala)
+UNIDADES = {
+    '1': (1.0, ADIMENSIONAL),
+    'kg': (1.0, (1, 0, 0, 0)),
+    'K': (1.0, (0, 0, 0, 1)),
+    'h': (3600.0, (0, 0, 1, 0)),
+    'kJ': (1e3, _ENERGIA),
+    'kWh': (3.6e6, _ENERGIA),
+    'kW': (1e3, (1, 2, -3, 0)),
+    'kJ/kg': (1e3, (0, 2, -2, 0)),
+    'kJ/(kg·K)': (1e3, (0, 2, -2, -1)),
+}
+
+# Sufixos dos nomes de campo do projeto (Q_total_kJ, E_eletrica_total_kWh, m_parte2_kg, ...)
+SUFIXOS = {'_kJ': 'kJ', '_kWh': 'kWh', '_kW': 'kW', '_kg': 'kg', '_h': 'h'}
+
+
+class ErroDimensional(ValueError):
+    """Fórmula com dimensões ou fatores de conversão inconsistentes"""
+
+
+class Grandeza:
+    """Valor em SI (escalar ou array) com a dimensão - usado só na verificação"""
+
+    __slots__ = ('valor', 'dimensao')
+
+    def __init__(self, valor, dimensao=ADIMENSIONAL):
+        self.valor = valor
+        self.dimensao = tuple(dimensao)
+
+    @classmethod
+    def em(cls, valor, unidade):
+        escala, dimensao = UNIDADES[unidade]
+        return cls(valor * escala, dimensao)
+
+    def para(self, unidade):
+        """Valor numérico na unidade (confere a dimensão)"""
+        escala, dimensao = UNIDADES[unidade]
+        if dimensao != self.dimensao:
+            raise ErroDimensional(f"{_descrever(self.dimensao)} não pode ser expresso em {unidade}")
+        return self.valor / escala
+
+    def _outra(self, outra, operacao):
+        if isinstance(outra, Grandeza):
+            return outra
+        if np.ndim(outra) == 0 and outra == 0:          # zero serve a qualquer dimensão (ex. total = 0)
+            return Grandeza(0.0, self.dimensao)
+        if self.dimensao != ADIMENSIONAL:
+            raise ErroDimensional(f"{operacao} de {_descrever(self.dimensao)} com número sem unidade")
+        return Grandeza(outra)
+
+    def __add__(self, outra):
+        outra = self._outra(outra, 'soma')
+        if outra.dimensao != self.dimensao:
+            raise ErroDimensional(f"soma de {_descrever(self.dimensao)} com {_descrever(outra.dimensao)}")
+        return Grandeza(self.valor + outra.valor, self.dimensao)
+
+    __radd__ = __add__
+
+    def __sub__(self, outra):
+        return self + (-self._outra(outra, 'subtração'))
+
+    def __rsub__(self, outra):
+        return self._outra(outra, 'subtração') + (-self)
+
+    def __neg__(self):
+        return Grandeza(-self.valor, self.dimensao)
+
+    def __mul__(self, outra):
+        if not isinstance(outra, Grandeza):
+            return Grandeza(self.valor * outra, self.dimensao)
+        return Grandeza(self.valor * outra.valor, tuple(a + b for a, b in zip(self.dimensao, outra.dimensao)))
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, outra):
+        if not isinstance(outra, Grandeza):
+            return Grandeza(self.valor / outra, self.dimensao)
+        return Grandeza(self.valor / outra.valor, tuple(a - b for a, b in zip(self.dimensao, outra.dimensao)))
+
+    def __rtruediv__(self, outra):
+        return Grandeza(outra) / self
+
+    def __pow__(self, expoente):
+        return Grandeza(self.valor ** expoente, tuple(a * expoente for a in self.dimensao))
+
+    def __repr__(self):
+        return f"Grandeza({self.valor!r}, {_descrever(self.dimensao)})"
+
+
+def _descrever(dimensao):
+    """Dimensão legível (ex. 'kg·m^2·s^-2')"""
+    if tuple(dimensao) == ADIMENSIONAL:
+        return 'adimensional'
+    nomes = [f"{b}^{e}" if e != 1 else b for b, e in zip(('kg', 'm', 's', 'K'), dimensao) if e]
+    return '·'.join(nomes)
+
+
+def unidades(retorno=None, **entradas):
+    """
+    Declara as unidades de uma fórmula (só anota; a função não é envolvida)
+
+    Args:
+        retorno: unidade do resultado (str) ou {campo: unidade} para dicts/registros
+        **entradas: {parametro: unidade}; None = parâmetro não dimensional (ex. perfil);
+                    {campo: unidade} para dicts de entrada (aninháveis)
+
+    Em {campo: unidade}, '*' vale para as demais chaves (ex. {codigo: kWh}); a
+    verificação usa uma entrada de exemplo com a chave '*'.
+    """
+    def decorar(funcao):
+        funcao.__unidades__ = {'entradas': entradas, 'retorno': retorno}
+        return funcao
+    return decorar
+
+
+def unidades_por_sufixo(campos):
+    """{campo: unidade} a partir do sufixo do nome (_kJ, _kWh, _kW, _kg, _h)"""
+    resultado = {}
+    for campo in campos:
+        sufixo = next((s for s in SUFIXOS if campo.endswith(s)), None)
+        if sufixo is None:
+            raise ErroDimensional(f"Campo sem sufixo de unidade: {campo}")
+        resultado[campo] = SUFIXOS[sufixo]
+    return resultado
+
+
+def _campos(valor, unidade):
+    """Trios (campo, valor, unidade) de um dict/registro declarado ('*' = demais chaves)"""
+    trios = [(campo, valor[campo], u) for campo, u in unidade.items() if campo != '*']
+    if '*' in unidade:
+        trios += [(campo, v, unidade['*']) for campo, v in valor.items() if campo not in unidade]
+    return trios
+
+
+def _saidas(resultado, retorno):
+    """Trios (nome, valor, unidade) do resultado declarado"""
+    if isinstance(retorno, str):
+        return [('retorno', resultado, retorno)]
+    return _campos(resultado, retorno)
+
+
+def _conferir(rotulo, valor, unidade):
+    """Levanta ErroDimensional se o valor (Grandeza, número ou dict) não tem a dimensão declarada"""
+    if unidade is None:
+        return
+    if isinstance(unidade, dict):
+        for campo, v, u in _campos(valor, unidade):
+            _conferir(f"{rotulo}[{campo!r}]", v, u)
+        return
+    dimensao = valor.dimensao if isinstance(valor, Grandeza) else ADIMENSIONAL
+    if dimensao != UNIDADES[unidade][1]:
+        raise ErroDimensional(f"{rotulo} tem {_descrever(dimensao)}, declarado {unidade}")
+
+
+def _amostra(unidade, rng):
+    """Entrada de teste nas unidades declaradas: (números, Grandezas em SI)"""
+    if isinstance(unidade, dict):
+        pares = {campo: _amostra(u, rng) for campo, u in unidade.items() if u is not None}
+        return {c: p[0] for c, p in pares.items()}, {c: p[1] for c, p in pares.items()}
+    numero = rng.uniform(1.0, 2.0)
+    return numero, Grandeza.em(numero, unidade)
+
+
+def _verificadora(nome, sombra, declaracao):
+    """Versão da fórmula que confere as unidades dos argumentos recebidos (só na verificação)"""
+    assinatura = inspect.signature(sombra)
+
+    def verificar(*args, **kwargs):
+        ligados = assinatura.bind(*args, **kwargs)
+        for parametro, unidade in declaracao['entradas'].items():
+            if parametro in ligados.arguments:
+                _conferir(f"{nome}({parametro}=...)", ligados.arguments[parametro], unidade)
+        resultado = sombra(*args, **kwargs)
+        for campo, valor, unidade in _saidas(resultado, declaracao['retorno']):
+            _conferir(f"{nome} → {campo}", valor, unidade)
+        return resultado
+
+    return verificar
+
+
+def verificar_modulo(modulo, conversoes=('kJ_para_kWh', 'kWh_para_kJ'), semente=0):
+    """
+    Verifica uma vez todas as fórmulas de um módulo
+
+    Toda função pública definida no módulo precisa de @unidades: as que não
+    têm são apontadas como problema, em vez de ficarem de fora em silêncio.
+
+    Cada fórmula é executada duas vezes com as mesmas entradas: com números
+    nas unidades declaradas (a função real) e com Grandeza em SI numa cópia
+    cujas fórmulas chamadas também conferem unidades e cujos fatores de
+    conversão são a identidade física. As dimensões precisam bater em toda
+    chamada e os valores, convertidos às unidades declaradas, precisam ser
+    iguais - um fator de conversão errado ou um número mágico aparece aí.
+
+    Args:
+        modulo: módulo com funções anotadas por @unidades
+        conversoes: nomes globais de fatores de conversão de unidade (kJ ↔ kWh)
+        semente: semente das entradas de teste
+
+    Returns:
+        lista dos nomes das fórmulas verificadas
+
+    Raises:
+        ErroDimensional com todos os problemas encontrados
+    """
+    funcoes = {nome: f for nome, f in vars(modulo).items()
+               if inspect.isfunction(f) and f.__module__ == modulo.__name__}
+    declaradas = {nome: f for nome, f in funcoes.items() if hasattr(f, '__unidades__')}
+    problemas = [f"{nome}: função pública sem @unidades" for nome in funcoes
+                 if nome not in declaradas and not nome.startswith('_')]
+    globais = dict(vars(modulo))
+    globais.update({nome: Grandeza(1.0) for nome in conversoes if nome in globais})
+    for nome, f in declaradas.items():
+        sombra = types.FunctionType(f.__code__, globais, nome, f.__defaults__, f.__closure__)
+        globais[nome] = _verificadora(nome, sombra, f.__unidades__)
+
+    rng = np.random.default_rng(semente)
+    for nome, f in declaradas.items():
+        entradas = f.__unidades__['entradas']
+        parametros = [p for p in inspect.signature(f).parameters.values() if p.default is inspect.Parameter.empty]
+        faltando = [p.name for p in parametros if p.name not in entradas]
+        if faltando:
+            problemas.append(f"{nome}: parâmetros sem unidade declarada {faltando}")
+            continue
+        amostras = {p: _amostra(u, rng) for p, u in entradas.items() if u is not None}
+        try:
+            numerico = f(**{p: numeros for p, (numeros, _) in amostras.items()})
+            simbolico = globais[nome](**{p: grandezas for p, (_, grandezas) in amostras.items()})
+            for (campo, valor, unidade), (_, esperado, _) in zip(_saidas(simbolico, f.__unidades__['retorno']),
+                                                                  _saidas(numerico, f.__unidades__['retorno'])):
+                obtido = valor.para(unidade) if isinstance(valor, Grandeza) else valor
+                if not np.isclose(obtido, esperado, rtol=1e-9, atol=0):
+                    problemas.append(f"{nome} → {campo}: {esperado:.6g} {unidade} no código, "
+                                     f"{obtido:.6g} {unidade} pela análise dimensional (fator de conversão?)")
+        except ErroDimensional as erro:
+            problemas.append(f"{nome}: {erro}")
+    if problemas:
+        raise ErroDimensional("Unidades inconsistentes:\n  " + "\n  ".join(problemas))
+    return list(declaradas)
+
+
+# Exemplo de uso
+if __name__ == "__main__":
+    import time
+
+    from src import calculations as calc
+    from src import constants as C
+
+    t0 = time.perf_counter()
+    verificadas = verificar_modulo(calc)
+    print(f"=== {len(verificadas)} fórmulas verificadas em {(time.perf_counter() - t0) * 1e3:.1f} ms ===")
+    print(f"Funções anotadas continuam as originais (sem invólucro): "
+          f"{not hasattr(calc.balanco_chiller_completo, '__wrapped__')}")
+
+    # Um fator de conversão esquecido e uma fórmula sem declaração são apontados na verificação
+    @unidades(retorno='kJ', potencia_perdas_kW='kW', tempo_h='h')
+    def perdas_sem_conversao(potencia_perdas_kW, tempo_h):
+        return potencia_perdas_kW * tempo_h
+
+    def energia_sem_declaracao(potencia_kW, tempo_h):
+        return potencia_kW * tempo_h
+
+    modulo = types.ModuleType('exemplo')
+    for funcao in (perdas_sem_conversao, energia_sem_declaracao):
+        funcao.__module__ = 'exemplo'
+        setattr(modulo, funcao.__name__, funcao)
+    try:
+        verificar_modulo(modulo)
+    except ErroDimensional as erro:
+        print(f"\n{erro}")
+
+    # Benchmark: balanços do chiller e do secador em 1 milhão de lotes
+    n = 1_000_000
+    rng = np.random.default_rng(0)
+    m_sf = C.m_sf_inicial * rng.uniform(0.9, 1.1, n)
+    perdas = rng.uniform(0.3, 0.7, n)
+    argumentos_chiller = dict(
+        m_sf_inicial=m_sf, m_biomassa_inicial=C.m_biomassa_inicial, m_HCl_inicial=C.m_HCl_inicial,
+        m_biomassa_residual=C.m_biomassa_residual, m_HCl_residual=C.m_HCl_residual,
+        m_sf_cristalizar=C.m_sf_cristalizar, m_etanol_lavagem=C.m_etanol_lavagem,
+        Cp_soforolipideos=C.Cp_soforolipideos, Cp_biomassa=C.Cp_biomassa, Cp_HCl_solucao=C.Cp_HCl_solucao,
+        Cp_etanol_70=C.Cp_etanol_70, T_inicial=C.T_entrada_chiller, T_final=C.T_cristalizacao,
+        T_ambiente=C.T_ambiente, L_cristalizacao_SL=C.L_cristalizacao_SL, perdas_ambiente_kW=perdas,
+        t_resfriamento_28_4=C.t_resfriamento_28_4, t_manutencao_cristalizacao=C.t_manutencao_cristalizacao,
+        t_manutencao_lavagem=C.t_manutencao_lavagem, COP=C.COP_chiller)
+    unidades_chiller = calc.balanco_chiller_completo.__unidades__['entradas']
+
+    # Referência sem unidades: o mesmo código com os fatores como literais
+    globais_literais = {**vars(calc), 'kJ_para_kWh': 1 / 3600, 'kWh_para_kJ': 3600}
+    sem_unidades = types.FunctionType(calc.balanco_chiller_completo.__code__, globais_literais)
+    # Alternativa evitada: unidades carregadas em tempo de execução sobre os arrays
+    globais_grandeza = {**vars(calc), 'kJ_para_kWh': Grandeza(1.0), 'kWh_para_kJ': Grandeza(1.0)}
+    com_grandezas = types.FunctionType(calc.balanco_chiller_completo.__code__, globais_grandeza)
+    argumentos_grandeza = {p: Grandeza.em(v, unidades_chiller[p]) for p, v in argumentos_chiller.items()}
+
+    variantes = {'sem unidades': (sem_unidades, argumentos_chiller),
+                 'anotado': (calc.balanco_chiller_completo, argumentos_chiller),
+                 'unidades em execução': (com_grandezas, argumentos_grandeza)}
+    tempos = dict.fromkeys(variantes, np.inf)
+    for _ in range(10):                        # rodadas alternadas
+        for nome, (funcao, argumentos) in variantes.items():
+            t0 = time.perf_counter()
+            funcao(**argumentos)
+            tempos[nome] = min(tempos[nome], time.perf_counter() - t0)
+    iguais = np.array_equal(sem_unidades(**argumentos_chiller)['E_eletrica_total_kWh'],
+                            calc.balanco_chiller_completo(**argumentos_chiller)['E_eletrica_total_kWh'])
+    print(f"\nbalanco_chiller_completo, {n:,} lotes (melhor de 10; resultados idênticos: {iguais}):")
+    for nome, t in tempos.items():
+        print(f"  {nome:22}: {t * 1e3:6.1f} ms ({t / tempos['sem unidades']:.2f}x)")
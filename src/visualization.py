@@ -3,6 +3,8 @@ visualization.py - Visualizações do Balanço Energético dos Soforolipídeos
 Versão robusta com fallbacks para problemas de dependências
 """
 
+import matplotlib
+matplotlib.use('Agg')  # renderização sem interface gráfica (arquivos)
 import matplotlib.pyplot as plt
 import seaborn as sns
 import plotly.graph_objects as go
@@ -13,6 +15,16 @@ import numpy as np
 from matplotlib.patches import Rectangle
 import matplotlib.patches as mpatches
 import warnings
+import html
+import os
+import tempfile
+
+from plotly.offline import get_plotlyjs
+
+from src import constants as C
+from src import calculations as calc
+from src import fluxos
+from src.resultados import calor_latente_secador, calor_sensivel_secador
 
 # Configuração de estilo
 plt.style.use('default')  # Mudança para evitar problemas com seaborn
@@ -61,7 +73,7 @@ def criar_dashboard_completo(resultado_chiller, resultado_secador, equipamentos_
     """
     
     # Preparar dados
-    energia_processo = sum([dados['P_nom'] * dados['tempo'] 
+    energia_processo = sum([calc.calcular_energia_equipamento(dados)
                            for codigo, dados in equipamentos_atualizados.items() 
                            if isinstance(dados['P_nom'], (int, float))])
     
@@ -98,7 +110,7 @@ def criar_dashboard_completo(resultado_chiller, resultado_secador, equipamentos_
     equipamentos_energia = []
     for codigo, dados in equipamentos_atualizados.items():
         if isinstance(dados['P_nom'], (int, float)):
-            energia = dados['P_nom'] * dados['tempo']
+            energia = calc.calcular_energia_equipamento(dados)
             equipamentos_energia.append({'Equipamento': codigo, 'Energia': energia})
     
     df_equip = pd.DataFrame(equipamentos_energia).sort_values('Energia', ascending=True).tail(10)
@@ -120,14 +132,11 @@ def criar_dashboard_completo(resultado_chiller, resultado_secador, equipamentos_
         'Processo': ['Chiller - Resfriamento', 'Chiller - Cristalização', 'Chiller - Lavagem', 
                     'Secador - Aquecimento', 'Secador - Evaporação'],
         'Energia (kWh)': [
-            resultado_chiller['Q_part1_kJ']/3600,
-            resultado_chiller['Q_part2_kJ']/3600, 
-            resultado_chiller['Q_part3_kJ']/3600,
-            (resultado_secador['Q_cristais_sensivel_kJ'] + 
-             resultado_secador['Q_agua_sensivel_kJ'] + 
-             resultado_secador['Q_etanol_sensivel_kJ'])/3600,
-            (resultado_secador['Q_agua_latente_kJ'] + 
-             resultado_secador['Q_etanol_latente_kJ'])/3600
+            calc.converter_kJ_para_kWh(resultado_chiller['Q_part1_kJ']),
+            calc.converter_kJ_para_kWh(resultado_chiller['Q_part2_kJ']), 
+            calc.converter_kJ_para_kWh(resultado_chiller['Q_part3_kJ']),
+            calc.converter_kJ_para_kWh(calor_sensivel_secador(resultado_secador)),
+            calc.converter_kJ_para_kWh(calor_latente_secador(resultado_secador))
         ]
     }
     
@@ -189,100 +198,188 @@ def criar_dashboard_completo(resultado_chiller, resultado_secador, equipamentos_
     
     return fig
 
-def criar_sankey_melhorado(resultado_chiller, resultado_secador, equipamentos_atualizados):
+def decimar_min_max(y, max_pontos=2000):
     """
-    Cria diagrama de Sankey com cores diferenciadas e bem visíveis
+    Decimação min-max: mantém o mínimo e o máximo de cada bloco da série
+
+    Preserva picos e vales com no máximo max_pontos pontos, qualquer que seja o
+    número de lotes.
+
+    Returns:
+        (indices, valores) - índices originais em ordem crescente
     """
-    
-    # Definir nós
-    nodes = [
-        "Energia Elétrica\nda Rede",         # 0
-        "Biorreator\nPrincipal",             # 1
-        "Soprador\nAeração",                 # 2  
-        "Chiller",                           # 3
-        "Secador",                           # 4
-        "Outros\nEquipamentos",              # 5
-        "Utilidades\nFixas",                 # 6
-        "Calor\nRejeitado",                  # 7
-        "Trabalho\nMecânico",               # 8
-        "Produto\nFinal"                     # 9
-    ]
-    
-    # Calcular energias
-    energia_biorreator = 504  # FR-101
-    energia_soprador = 168    # BLW-101
-    energia_chiller = resultado_chiller['E_eletrica_total_kWh']
-    energia_secador = resultado_secador['E_eletrica_total_kWh']
-    energia_outros = 908.3 - energia_biorreator - energia_soprador - energia_chiller - energia_secador
-    energia_utilidades = 3461
-    
-    # Definir fluxos com cores específicas
-    fluxos = [
-        # Da rede para equipamentos (cores azuis)
-        (0, 1, energia_biorreator, 'rgba(142, 68, 173, 0.6)'),      # Roxo - Biorreator
-        (0, 2, energia_soprador, 'rgba(46, 134, 193, 0.6)'),       # Azul - Soprador
-        (0, 3, energia_chiller, 'rgba(22, 160, 133, 0.6)'),        # Verde - Chiller
-        (0, 4, energia_secador, 'rgba(231, 76, 60, 0.6)'),         # Vermelho - Secador
-        (0, 5, energia_outros, 'rgba(149, 165, 166, 0.6)'),        # Cinza - Outros
-        (0, 6, energia_utilidades, 'rgba(243, 156, 18, 0.6)'),     # Laranja - Utilidades
-        
-        # Transformações energéticas (cores específicas por tipo)
-        (1, 8, energia_biorreator * 0.65, 'rgba(39, 174, 96, 0.7)'),   # Verde - Trabalho útil
-        (1, 7, energia_biorreator * 0.35, 'rgba(230, 126, 34, 0.7)'),  # Laranja - Calor perdido
-        (2, 8, energia_soprador * 0.8, 'rgba(39, 174, 96, 0.7)'),      # Verde - Trabalho útil
-        (2, 7, energia_soprador * 0.2, 'rgba(230, 126, 34, 0.7)'),     # Laranja - Calor perdido
-        (3, 7, energia_chiller, 'rgba(52, 152, 219, 0.8)'),            # Azul - Calor removido
-        (4, 7, energia_secador * 0.8, 'rgba(231, 76, 60, 0.8)'),       # Vermelho - Calor fornecido
-        (4, 9, energia_secador * 0.2, 'rgba(155, 89, 182, 0.8)'),      # Roxo - Contribuição produto
-        (5, 7, energia_outros * 0.7, 'rgba(230, 126, 34, 0.7)'),       # Laranja - Calor perdido
-        (5, 8, energia_outros * 0.3, 'rgba(39, 174, 96, 0.7)'),        # Verde - Trabalho útil
-        (6, 7, energia_utilidades, 'rgba(243, 156, 18, 0.8)'),         # Laranja - Calor rejeitado
-        
-        # Trabalho final para produto
-        (8, 9, energia_biorreator * 0.65 + energia_soprador * 0.8 + energia_outros * 0.3, 'rgba(155, 89, 182, 0.9)')
-    ]
-    
-    # Separar dados
-    source = [f[0] for f in fluxos]
-    target = [f[1] for f in fluxos]
-    value = [f[2] for f in fluxos]
-    link_colors = [f[3] for f in fluxos]
-    
-    # Cores dos nós (mais contrastantes)
-    node_colors = [
-        '#1f77b4',  # Rede (azul forte)
-        '#8E44AD',  # Biorreator (roxo)
-        '#2E86C1',  # Soprador (azul médio)
-        '#16A085',  # Chiller (verde água)
-        '#E74C3C',  # Secador (vermelho)
-        '#95A5A6',  # Outros (cinza)
-        '#F39C12',  # Utilidades (laranja)
-        '#E67E22',  # Calor (laranja escuro)
-        '#27AE60',  # Trabalho (verde)
-        '#9B59B6'   # Produto (roxo claro)
-    ]
-    
+    y = np.asarray(y, dtype=float).ravel()
+    n_blocos = max(max_pontos // 2, 1)
+    if len(y) <= max_pontos:
+        return np.arange(len(y)), y
+    tamanho = -(-len(y) // n_blocos)
+    preenchido = np.pad(y, (0, tamanho * n_blocos - len(y)), mode='edge').reshape(n_blocos, tamanho)
+    base = np.arange(n_blocos) * tamanho
+    indices = np.concatenate([base + preenchido.argmin(axis=1), base + preenchido.argmax(axis=1)])
+    indices = np.unique(np.minimum(indices, len(y) - 1))
+    return indices, y[indices]
+
+
+def resumo_percentis(valores, percentis=(5, 50, 95)):
+    """Percentis por coluna de um array (n_amostras, n_series)"""
+    return np.percentile(np.asarray(valores, dtype=float), percentis, axis=0)
+
+
+def criar_dashboard_campanha(colunas, max_pontos=2000, n_bins=60):
+    """
+    Dashboard de campanha (10^5+ lotes ou amostras de Monte Carlo) a partir das
+    colunas de avaliar_lotes
+
+    Séries por lote em Scattergl com decimação min-max e distribuições como
+    histogramas pré-calculados: o HTML guarda só os pontos desenhados.
+
+    Args:
+        colunas: dict de avaliar_lotes (arrays 1D por lote)
+        max_pontos: pontos por série após a decimação
+        n_bins: classes dos histogramas
+    """
+    consumo = np.ravel(colunas['consumo_especifico'])
+    n_lotes = len(consumo)
+    codigos = [nome.split('.', 1)[1] for nome in colunas if nome.startswith('equipamento.')]
+
+    fig = make_subplots(
+        rows=2, cols=2,
+        subplot_titles=('Consumo Específico por Lote', 'Distribuição do Consumo Específico',
+                        'Chiller e Secador por Lote', 'Energia por Equipamento (P5–P50–P95)')
+    )
+
+    # 1. kWh/kg por lote (decimado)
+    indices, valores = decimar_min_max(consumo, max_pontos)
+    fig.add_trace(
+        go.Scattergl(x=indices, y=valores, mode='lines', line=dict(color=CORES['processo'], width=1),
+                     name='kWh/kg'),
+        row=1, col=1
+    )
+
+    # 2. Histograma calculado no servidor
+    contagens, bordas = np.histogram(consumo, bins=n_bins)
+    fig.add_trace(
+        go.Bar(x=(bordas[:-1] + bordas[1:]) / 2, y=contagens, width=np.diff(bordas),
+               marker_color=CORES['processo'], name='lotes'),
+        row=1, col=2
+    )
+
+    # 3. Chiller e secador por lote (decimados)
+    for campo, nome, cor in (('chiller.E_eletrica_total_kWh', 'Chiller', CORES['chiller']),
+                             ('secador.E_eletrica_total_kWh', 'Secador', CORES['secador'])):
+        indices, valores = decimar_min_max(np.ravel(colunas[campo]), max_pontos)
+        fig.add_trace(
+            go.Scattergl(x=indices, y=valores, mode='lines', line=dict(color=cor, width=1), name=nome),
+            row=2, col=1
+        )
+
+    # 4. Percentis por equipamento
+    energias = np.column_stack([np.broadcast_to(colunas[f'equipamento.{codigo}'], (n_lotes,))
+                                for codigo in codigos])
+    p_baixo, mediana, p_alto = resumo_percentis(energias)
+    ordem = np.argsort(mediana)
+    fig.add_trace(
+        go.Bar(
+            y=np.array(codigos)[ordem],
+            x=mediana[ordem],
+            orientation='h',
+            marker_color=CORES['processo'],
+            error_x=dict(type='data', symmetric=False, array=(p_alto - mediana)[ordem],
+                         arrayminus=(mediana - p_baixo)[ordem]),
+            name='mediana'
+        ),
+        row=2, col=2
+    )
+
+    fig.update_layout(
+        title={
+            'text': f'DASHBOARD DA CAMPANHA - {n_lotes:,} LOTES'.replace(',', '.'),
+            'x': 0.5,
+            'font': {'size': 20, 'color': CORES['texto']}
+        },
+        showlegend=False,
+        height=800,
+        plot_bgcolor='white',
+        paper_bgcolor=CORES['fundo']
+    )
+
+    fig.update_xaxes(title_text="Lote", row=1, col=1)
+    fig.update_xaxes(title_text="Consumo Específico (kWh/kg)", row=1, col=2)
+    fig.update_xaxes(title_text="Lote", row=2, col=1)
+    fig.update_xaxes(title_text="Energia (kWh)", row=2, col=2)
+    fig.update_yaxes(title_text="Consumo Específico (kWh/kg)", row=1, col=1)
+    fig.update_yaxes(title_text="Lotes", row=1, col=2)
+    fig.update_yaxes(title_text="Energia Elétrica (kWh)", row=2, col=1)
+
+    return fig
+
+# Cores dos nós do grafo de fluxos (demais equipamentos em cinza)
+CORES_NOS_SANKEY = {
+    fluxos.REDE: '#1f77b4',
+    'FR-101': '#8E44AD',
+    'BLW-101': '#2E86C1',
+    'FT-101': '#16A085',
+    'TDR-101': '#E74C3C',
+    fluxos.OUTROS: '#95A5A6',
+    fluxos.UTILIDADES: '#F39C12',
+    fluxos.CALOR: '#E67E22',
+    fluxos.TRABALHO: '#27AE60',
+    fluxos.PRODUTO: '#9B59B6'
+}
+
+# Cores dos fluxos pelo destino (fluxos saindo da rede herdam a cor do equipamento)
+CORES_FLUXOS_SANKEY = {
+    fluxos.CALOR: 'rgba(230, 126, 34, 0.7)',
+    fluxos.TRABALHO: 'rgba(39, 174, 96, 0.7)',
+    fluxos.PRODUTO: 'rgba(155, 89, 182, 0.8)'
+}
+
+
+def _rgba(cor_hex, alfa):
+    r, g, b = (int(cor_hex[i:i + 2], 16) for i in (1, 3, 5))
+    return f'rgba({r}, {g}, {b}, {alfa})'
+
+
+def criar_sankey_grafo(grafo, titulo="FLUXO ENERGÉTICO - PRODUÇÃO DE SOFOROLIPÍDEOS",
+                       subtitulo="Valores em kWh por lote"):
+    """
+    Cria diagrama de Sankey a partir de um grafo de fluxos {(origem, destino): kWh}
+
+    Use src.fluxos.reduzir_grafo/agrupar_nos antes para campanhas com muitos lotes
+    ou equipamentos - o diagrama recebe um valor por fluxo.
+    """
+    fluxos_validos = {chave: valor for chave, valor in grafo.items() if valor > 0}
+    nos = list(dict.fromkeys(no for chave in fluxos_validos for no in chave))
+    indice = {no: i for i, no in enumerate(nos)}
+    cor_no = lambda no: CORES_NOS_SANKEY.get(no, CORES['outros'])
+
+    source, target, value, link_colors = [], [], [], []
+    for (origem, destino), valor in fluxos_validos.items():
+        source.append(indice[origem])
+        target.append(indice[destino])
+        value.append(valor)
+        link_colors.append(CORES_FLUXOS_SANKEY.get(destino, _rgba(cor_no(destino), 0.6)))
+
     fig = go.Figure(data=[go.Sankey(
         node=dict(
             pad=20,
             thickness=25,
             line=dict(color="black", width=1),
-            label=nodes,
-            color=node_colors,
-            # font=dict(size=12, color="white")
+            label=nos,
+            color=[cor_no(no) for no in nos]
         ),
         link=dict(
             source=source,
             target=target,
             value=value,
-            color=link_colors,  # Cores específicas por link
+            color=link_colors,
             line=dict(color="rgba(0,0,0,0.3)", width=0.5)
         )
     )])
-    
+
     fig.update_layout(
         title={
-            'text': "FLUXO ENERGÉTICO - PRODUÇÃO DE SOFOROLIPÍDEOS<br><sub>Valores em kWh por lote</sub>",
+            'text': f"{titulo}<br><sub>{subtitulo}</sub>",
             'x': 0.5,
             'font': {'size': 18, 'color': '#2C3E50'}
         },
@@ -292,9 +389,32 @@ def criar_sankey_melhorado(resultado_chiller, resultado_secador, equipamentos_at
         height=700,
         margin=dict(t=80, b=40, l=40, r=40)
     )
-    
+
     return fig
 
+def criar_sankey_melhorado(resultado_chiller, resultado_secador, equipamentos_atualizados,
+                           utilidades_fixas_total=None, limite_fracao=0.02):
+    """
+    Cria diagrama de Sankey com cores diferenciadas e bem visíveis
+
+    Os fluxos vêm do grafo montado com as energias calculadas e os fatores de
+    dissipação de src.constants; equipamentos pequenos são agrupados em "Outros".
+    """
+    utilidades_fixas_total = C.E_utilidades_fixas_total if utilidades_fixas_total is None else utilidades_fixas_total
+
+    energias = {}
+    for codigo, dados in equipamentos_atualizados.items():
+        if codigo == 'FT-101':
+            energias[codigo] = resultado_chiller['E_eletrica_total_kWh']
+        elif codigo == 'TDR-101':
+            energias[codigo] = resultado_secador['E_eletrica_total_kWh']
+        else:
+            energias[codigo] = calc.calcular_energia_equipamento(dados)
+
+    grafo = fluxos.grafo_energetico(energias, resultado_secador, utilidades_fixas_total)
+    grafo = fluxos.agrupar_nos(grafo, limite_fracao=limite_fracao, manter=('FT-101', 'TDR-101'))
+    return criar_sankey_grafo(grafo)
+
 # Função para adicionar anotações explicativas
 def adicionar_anotacoes_sankey(fig):
     """
@@ -332,144 +452,350 @@ def adicionar_anotacoes_sankey(fig):
     fig.update_layout(annotations=annotations)
     return fig
 
+# Perfis de renderização das figuras matplotlib
+# (compressao_png: nível zlib 0-9 - menor é mais rápido e gera arquivo maior)
+PERFIS_RENDERIZACAO = {
+    'preview':   {'dpi': 72,  'bbox_inches': None,    'formato': 'png', 'compressao_png': 1},  # conferência em lote
+    'relatorio': {'dpi': 150, 'bbox_inches': 'tight', 'formato': 'png', 'compressao_png': 6},
+    'impressao': {'dpi': 300, 'bbox_inches': 'tight', 'formato': 'png', 'compressao_png': 6}
+}
+
+def salvar_figura(fig, caminho, perfil='relatorio', formato=None):
+    """
+    Salva uma figura matplotlib conforme o perfil de renderização
+
+    Args:
+        fig: figura matplotlib
+        caminho: arquivo de saída (a extensão é trocada pela do formato)
+        perfil: 'preview', 'relatorio' ou 'impressao' (ver PERFIS_RENDERIZACAO)
+        formato: 'png', 'svg' ou 'webp' (padrão: o do perfil)
+
+    Returns:
+        caminho efetivamente gravado
+    """
+    config = PERFIS_RENDERIZACAO[perfil]
+    formato = formato or config['formato']
+    caminho = f"{os.path.splitext(caminho)[0]}.{formato}"
+    extras = {'pil_kwargs': {'compress_level': config['compressao_png']}} if formato == 'png' else {}
+    fig.savefig(caminho, format=formato, dpi=config['dpi'], bbox_inches=config['bbox_inches'],
+                facecolor='white', edgecolor='none', **extras)
+    return caminho
+
+def _atualizar_pizza(wedges, textos, autotextos, valores, startangle=90, labeldistance=1.1, pctdistance=0.6):
+    """Reposiciona fatias, rótulos e percentuais de um ax.pie já desenhado"""
+    fracoes = np.asarray(valores, dtype=float) / np.sum(valores)
+    theta1 = startangle
+    for wedge, texto, autotexto, fracao in zip(wedges, textos, autotextos, fracoes):
+        theta2 = theta1 + 360 * fracao
+        wedge.set_theta1(theta1)
+        wedge.set_theta2(theta2)
+        meio = np.deg2rad((theta1 + theta2) / 2)
+        x, y = np.cos(meio), np.sin(meio)
+        texto.set_position((labeldistance * x, labeldistance * y))
+        texto.set_horizontalalignment('left' if x > 0 else 'right')
+        autotexto.set_position((pctdistance * x, pctdistance * y))
+        autotexto.set_text(f'{100 * fracao:.1f}%')
+        theta1 = theta2
+
+def _atualizar_barras(ax, barras, valores, textos=(), deslocamento=0, horizontal=False):
+    """Troca alturas (ou larguras) das barras e seus rótulos e reajusta a escala"""
+    for barra, valor in zip(barras, valores):
+        if horizontal:
+            barra.set_width(valor)
+        else:
+            barra.set_height(valor)
+    for barra, texto, valor in zip(barras, textos, valores):
+        texto.set_position((barra.get_x() + barra.get_width() / 2, valor + deslocamento))
+        texto.set_text(f'{valor:.1f}')
+    ax.relim()
+    ax.autoscale_view()
+
+class PainelTermodinamico:
+    """
+    Comparativo termodinâmico (pizzas do chiller e do secador) criado uma vez
+
+    atualizar() troca apenas os dados - figura, eixos e layout são reaproveitados
+    entre lotes.
+    """
+
+    LABELS_CHILLER = ['SF Sensível', 'SF Latente', 'Biomassa', 'HCl', 'Etanol', 'Perdas']
+    LABELS_SECADOR = ['Cristais', 'Água Sensível', 'Água Latente', 'Etanol Sensível', 'Etanol Latente', 'Perdas']
+
+    def __init__(self, resultado_chiller, resultado_secador):
+        self.fig, (self.ax1, self.ax2) = plt.subplots(1, 2, figsize=(15, 6))
+        self.fig.suptitle('ANÁLISE TERMODINÂMICA COMPARATIVA', fontsize=16, fontweight='bold')
+
+        valores_chiller, valores_secador = self._valores(resultado_chiller, resultado_secador)
+
+        # Gráfico 1: Breakdown Chiller
+        cores_chiller = ['#3498DB', '#E74C3C', '#2ECC71', '#F39C12', '#9B59B6', '#95A5A6']
+        self.pizza_chiller = self.ax1.pie(valores_chiller, labels=self.LABELS_CHILLER, colors=cores_chiller,
+                                          autopct='%1.1f%%', startangle=90)
+
+        # Gráfico 2: Breakdown Secador
+        cores_secador = ['#E67E22', '#3498DB', '#2980B9', '#8E44AD', '#9B59B6', '#BDC3C7']
+        self.pizza_secador = self.ax2.pie(valores_secador, labels=self.LABELS_SECADOR, colors=cores_secador,
+                                          autopct='%1.1f%%', startangle=90)
+
+        self._titulos(valores_chiller, valores_secador)
+        self.fig.tight_layout()
+
+    @staticmethod
+    def _valores(resultado_chiller, resultado_secador):
+        valores_chiller = [
+            resultado_chiller['Q_sf_sensivel_kJ'],
+            abs(resultado_chiller['Q_sf_latente_kJ']),  # Valor absoluto
+            resultado_chiller['Q_biomassa_inicial_kJ'],
+            resultado_chiller['Q_HCl_inicial_kJ'],
+            resultado_chiller['Q_etanol_sensivel_kJ'],
+            resultado_chiller['Q_perdas_total_kJ']
+        ]
+        valores_secador = [
+            resultado_secador['Q_cristais_sensivel_kJ'],
+            resultado_secador['Q_agua_sensivel_kJ'],
+            resultado_secador['Q_agua_latente_kJ'],
+            resultado_secador['Q_etanol_sensivel_kJ'],
+            resultado_secador['Q_etanol_latente_kJ'],
+            resultado_secador['Q_perdas_kJ']
+        ]
+        return valores_chiller, valores_secador
+
+    def _titulos(self, valores_chiller, valores_secador):
+        self.ax1.set_title(f'CHILLER - Distribuição de Calor\n(Total: {sum(valores_chiller) / 1000:.1f} MJ)',
+                           fontweight='bold')
+        self.ax2.set_title(f'SECADOR - Distribuição de Calor\n(Total: {sum(valores_secador) / 1000:.1f} MJ)',
+                           fontweight='bold')
+
+    def atualizar(self, resultado_chiller, resultado_secador):
+        valores_chiller, valores_secador = self._valores(resultado_chiller, resultado_secador)
+        _atualizar_pizza(*self.pizza_chiller, valores_chiller)
+        _atualizar_pizza(*self.pizza_secador, valores_secador)
+        self._titulos(valores_chiller, valores_secador)
+        return self.fig
+
+class PainelDashboardMatplotlib:
+    """
+    Dashboard matplotlib (distribuição, top 10, balanço térmico, benchmarking) criado uma vez
+
+    atualizar() troca apenas os dados - figura, eixos e layout são reaproveitados
+    entre lotes.
+    """
+
+    BENCHMARK_PROCESSOS = ['Soforolipídeos\n(Este trabalho)', 'Antibióticos\n(Penicilina)',
+                           'Enzimas\n(α-amilase)', 'Etanol\n(2ª geração)', 'Surfactantes\n(Petroquímicos)']
+    BENCHMARK_CONSUMOS = [120, 85, 15, 8]
+
+    def __init__(self, resultado_chiller, resultado_secador, equipamentos_atualizados,
+                 energia_total, consumo_especifico, utilidades_fixas_total):
+        # Configurar subplots
+        self.fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(16, 12))
+        self.axes = (ax1, ax2, ax3, ax4)
+        self.fig.suptitle('DASHBOARD ENERGÉTICO - PRODUÇÃO DE SOFOROLIPÍDEOS', fontsize=16, fontweight='bold')
+        dados = self._dados(resultado_chiller, resultado_secador, equipamentos_atualizados,
+                            consumo_especifico, utilidades_fixas_total)
+
+        # 1. Distribuição Energética (Pizza)
+        labels = ['Equipamentos\nde Processo', 'Utilidades\nFixas']
+        colors = [CORES['processo'], CORES['utilidades']]
+        self.pizza = ax1.pie(dados['distribuicao'], labels=labels, colors=colors, autopct='%1.1f%%', startangle=90)
+        ax1.set_title('Distribuição Energética Total')
+
+        # 2. Top 10 Equipamentos (Barras Horizontais)
+        nomes, energias = dados['top10']
+        self.barras_top10 = ax2.barh(nomes, energias, color=CORES['processo'])
+        ax2.set_xlabel('Energia (kWh)')
+        ax2.set_title('Top 10 Equipamentos - Consumo Energético')
+
+        # 3. Balanço Térmico
+        thermal_labels = ['Chiller\nResfriamento', 'Chiller\nCristalização', 'Chiller\nLavagem',
+                         'Secador\nAquecimento', 'Secador\nEvaporação']
+        cores_thermal = [CORES['chiller'], CORES['chiller'], CORES['chiller'],
+                        CORES['secador'], CORES['secador']]
+        self.barras_termicas = ax3.bar(thermal_labels, dados['termico'], color=cores_thermal)
+        ax3.set_ylabel('Energia Térmica (kWh)')
+        ax3.set_title('Balanço Térmico Detalhado')
+        ax3.tick_params(axis='x', rotation=45)
+
+        # Adicionar valores nas barras
+        self.textos_termicos = [ax3.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.01,
+                                         f'{value:.1f}', ha='center', va='bottom')
+                                for bar, value in zip(self.barras_termicas, dados['termico'])]
+
+        # 4. Benchmarking
+        cores_benchmark = [CORES['processo'] if i == 0 else CORES['outros'] for i in range(5)]
+        self.barras_benchmark = ax4.bar(self.BENCHMARK_PROCESSOS, dados['benchmark'], color=cores_benchmark)
+        ax4.set_ylabel('Consumo Específico (kWh/kg)')
+        ax4.set_title('Benchmarking Industrial')
+        ax4.tick_params(axis='x', rotation=45)
+
+        # Adicionar valores nas barras
+        self.textos_benchmark = [ax4.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 1,
+                                          f'{value:.1f}', ha='center', va='bottom')
+                                 for bar, value in zip(self.barras_benchmark, dados['benchmark'])]
+
+        self.fig.tight_layout()
+
+    def _dados(self, resultado_chiller, resultado_secador, equipamentos_atualizados,
+               consumo_especifico, utilidades_fixas_total):
+        equipamentos_energia = [(codigo, calc.calcular_energia_equipamento(dados))
+                                for codigo, dados in equipamentos_atualizados.items()
+                                if isinstance(dados['P_nom'], (int, float))]
+        energia_processo = sum(energia for _, energia in equipamentos_energia)
+        equipamentos_energia.sort(key=lambda x: x[1], reverse=True)
+        top10 = equipamentos_energia[:10]
+
+        termico = [
+            calc.converter_kJ_para_kWh(resultado_chiller['Q_part1_kJ']),
+            calc.converter_kJ_para_kWh(resultado_chiller['Q_part2_kJ']),
+            calc.converter_kJ_para_kWh(resultado_chiller['Q_part3_kJ']),
+            calc.converter_kJ_para_kWh(calor_sensivel_secador(resultado_secador)),
+            calc.converter_kJ_para_kWh(calor_latente_secador(resultado_secador))
+        ]
+        return {
+            'distribuicao': [energia_processo, utilidades_fixas_total],
+            'top10': ([eq[0] for eq in top10], [eq[1] for eq in top10]),
+            'termico': termico,
+            'benchmark': [consumo_especifico] + self.BENCHMARK_CONSUMOS
+        }
+
+    def atualizar(self, resultado_chiller, resultado_secador, equipamentos_atualizados,
+                  energia_total, consumo_especifico, utilidades_fixas_total):
+        ax1, ax2, ax3, ax4 = self.axes
+        dados = self._dados(resultado_chiller, resultado_secador, equipamentos_atualizados,
+                            consumo_especifico, utilidades_fixas_total)
+        _atualizar_pizza(*self.pizza, dados['distribuicao'])
+        nomes, energias = dados['top10']
+        _atualizar_barras(ax2, self.barras_top10, energias, horizontal=True)
+        ax2.set_yticks(range(len(nomes)), nomes)
+        _atualizar_barras(ax3, self.barras_termicas, dados['termico'], self.textos_termicos, 0.01)
+        _atualizar_barras(ax4, self.barras_benchmark, dados['benchmark'], self.textos_benchmark, 1)
+        return self.fig
+
 def criar_comparativo_termodinamico(resultado_chiller, resultado_secador):
     """
     Gráfico comparativo dos processos termodinâmicos
     """
-    
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
-    fig.suptitle('ANÁLISE TERMODINÂMICA COMPARATIVA', fontsize=16, fontweight='bold')
-    
-    # Gráfico 1: Breakdown Chiller
-    labels_chiller = ['SF Sensível', 'SF Latente', 'Biomassa', 'HCl', 'Etanol', 'Perdas']
-    valores_chiller = [
-        resultado_chiller['Q_sf_sensivel_kJ'],
-        abs(resultado_chiller['Q_sf_latente_kJ']),  # Valor absoluto
-        resultado_chiller['Q_biomassa_inicial_kJ'],
-        resultado_chiller['Q_HCl_inicial_kJ'],
-        resultado_chiller['Q_etanol_sensivel_kJ'],
-        resultado_chiller['Q_perdas_total_kJ']
-    ]
-    
-    cores_chiller = ['#3498DB', '#E74C3C', '#2ECC71', '#F39C12', '#9B59B6', '#95A5A6']
-    
-    wedges, texts, autotexts = ax1.pie(valores_chiller, labels=labels_chiller, colors=cores_chiller,
-                                      autopct='%1.1f%%', startangle=90)
-    ax1.set_title('CHILLER - Distribuição de Calor\n(Total: 38.4 MJ)', fontweight='bold')
-    
-    # Gráfico 2: Breakdown Secador
-    labels_secador = ['Cristais', 'Água Sensível', 'Água Latente', 'Etanol Sensível', 'Etanol Latente', 'Perdas']
-    valores_secador = [
-        resultado_secador['Q_cristais_sensivel_kJ'],
-        resultado_secador['Q_agua_sensivel_kJ'],
-        resultado_secador['Q_agua_latente_kJ'],
-        resultado_secador['Q_etanol_sensivel_kJ'],
-        resultado_secador['Q_etanol_latente_kJ'],
-        resultado_secador['Q_perdas_kJ']
-    ]
-    
-    cores_secador = ['#E67E22', '#3498DB', '#2980B9', '#8E44AD', '#9B59B6', '#BDC3C7']
-    
-    wedges2, texts2, autotexts2 = ax2.pie(valores_secador, labels=labels_secador, colors=cores_secador,
-                                         autopct='%1.1f%%', startangle=90)
-    ax2.set_title('SECADOR - Distribuição de Calor\n(Total: 95.3 MJ)', fontweight='bold')
-    
-    plt.tight_layout()
-    return fig
+    return PainelTermodinamico(resultado_chiller, resultado_secador).fig
 
 def criar_graficos_alternativos_matplotlib(resultado_chiller, resultado_secador, equipamentos_atualizados,
                                          energia_total, consumo_especifico, utilidades_fixas_total):
     """
     Cria gráficos usando apenas matplotlib como fallback
     """
-    
-    # Configurar subplots
-    fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(16, 12))
-    fig.suptitle('DASHBOARD ENERGÉTICO - PRODUÇÃO DE SOFOROLIPÍDEOS', fontsize=16, fontweight='bold')
-    
-    # 1. Distribuição Energética (Pizza)
-    energia_processo = sum([dados['P_nom'] * dados['tempo'] 
-                           for codigo, dados in equipamentos_atualizados.items() 
-                           if isinstance(dados['P_nom'], (int, float))])
-    
-    labels = ['Equipamentos\nde Processo', 'Utilidades\nFixas']
-    sizes = [energia_processo, utilidades_fixas_total]
-    colors = [CORES['processo'], CORES['utilidades']]
-    
-    ax1.pie(sizes, labels=labels, colors=colors, autopct='%1.1f%%', startangle=90)
-    ax1.set_title('Distribuição Energética Total')
-    
-    # 2. Top 10 Equipamentos (Barras Horizontais)
-    equipamentos_energia = []
-    for codigo, dados in equipamentos_atualizados.items():
-        if isinstance(dados['P_nom'], (int, float)):
-            energia = dados['P_nom'] * dados['tempo']
-            equipamentos_energia.append((codigo, energia))
-    
-    equipamentos_energia.sort(key=lambda x: x[1], reverse=True)
-    top10 = equipamentos_energia[:10]
-    
-    nomes = [eq[0] for eq in top10]
-    energias = [eq[1] for eq in top10]
-    
-    ax2.barh(nomes, energias, color=CORES['processo'])
-    ax2.set_xlabel('Energia (kWh)')
-    ax2.set_title('Top 10 Equipamentos - Consumo Energético')
-    
-    # 3. Balanço Térmico
-    thermal_labels = ['Chiller\nResfriamento', 'Chiller\nCristalização', 'Chiller\nLavagem', 
-                     'Secador\nAquecimento', 'Secador\nEvaporação']
-    thermal_values = [
-        resultado_chiller['Q_part1_kJ']/3600,
-        resultado_chiller['Q_part2_kJ']/3600, 
-        resultado_chiller['Q_part3_kJ']/3600,
-        (resultado_secador['Q_cristais_sensivel_kJ'] + 
-         resultado_secador['Q_agua_sensivel_kJ'] + 
-         resultado_secador['Q_etanol_sensivel_kJ'])/3600,
-        (resultado_secador['Q_agua_latente_kJ'] + 
-         resultado_secador['Q_etanol_latente_kJ'])/3600
-    ]
-    
-    cores_thermal = [CORES['chiller'], CORES['chiller'], CORES['chiller'], 
-                    CORES['secador'], CORES['secador']]
-    
-    bars = ax3.bar(thermal_labels, thermal_values, color=cores_thermal)
-    ax3.set_ylabel('Energia Térmica (kWh)')
-    ax3.set_title('Balanço Térmico Detalhado')
-    ax3.tick_params(axis='x', rotation=45)
-    
-    # Adicionar valores nas barras
-    for bar, value in zip(bars, thermal_values):
-        ax3.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.01,
-                f'{value:.1f}', ha='center', va='bottom')
-    
-    # 4. Benchmarking
-    benchmark_processos = ['Soforolipídeos\n(Este trabalho)', 'Antibióticos\n(Penicilina)', 
-                          'Enzimas\n(α-amilase)', 'Etanol\n(2ª geração)', 'Surfactantes\n(Petroquímicos)']
-    benchmark_consumos = [consumo_especifico, 120, 85, 15, 8]
-    cores_benchmark = [CORES['processo'] if i == 0 else CORES['outros'] for i in range(5)]
-    
-    bars = ax4.bar(benchmark_processos, benchmark_consumos, color=cores_benchmark)
-    ax4.set_ylabel('Consumo Específico (kWh/kg)')
-    ax4.set_title('Benchmarking Industrial')
-    ax4.tick_params(axis='x', rotation=45)
-    
-    # Adicionar valores nas barras
-    for bar, value in zip(bars, benchmark_consumos):
-        ax4.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 1,
-                f'{value:.1f}', ha='center', va='bottom')
-    
-    plt.tight_layout()
-    return fig
+    return PainelDashboardMatplotlib(resultado_chiller, resultado_secador, equipamentos_atualizados,
+                                     energia_total, consumo_especifico, utilidades_fixas_total).fig
+
+def renderizar_lotes(resultados_lotes, pasta, perfil='preview', formato=None):
+    """
+    Renderiza as figuras matplotlib de muitos lotes reaproveitando figura e eixos
+
+    Args:
+        resultados_lotes: iterável de dicts no formato do retorno de main()
+                          ('chiller', 'secador', 'equipamentos', 'energia_total',
+                          'consumo_especifico', 'energia_utilidades')
+        pasta: pasta de saída (arquivos lote_<n>_termodinamica / lote_<n>_dashboard)
+        perfil: perfil de renderização (ver PERFIS_RENDERIZACAO)
+        formato: 'png', 'svg' ou 'webp' (padrão: o do perfil)
+
+    Returns:
+        lista de arquivos gravados
+    """
+    os.makedirs(pasta, exist_ok=True)
+    arquivos = []
+    painel_termo = painel_dashboard = None
+    for i, r in enumerate(resultados_lotes):
+        args = (r['chiller'], r['secador'], r['equipamentos'], r['energia_total'],
+                r['consumo_especifico'], r['energia_utilidades'])
+        if painel_termo is None:
+            painel_termo = PainelTermodinamico(r['chiller'], r['secador'])
+            painel_dashboard = PainelDashboardMatplotlib(*args)
+        else:
+            painel_termo.atualizar(r['chiller'], r['secador'])
+            painel_dashboard.atualizar(*args)
+        arquivos.append(salvar_figura(painel_termo.fig, os.path.join(pasta, f'lote_{i:05d}_termodinamica'),
+                                      perfil, formato))
+        arquivos.append(salvar_figura(painel_dashboard.fig, os.path.join(pasta, f'lote_{i:05d}_dashboard'),
+                                      perfil, formato))
+    if painel_termo is not None:
+        plt.close(painel_termo.fig)
+        plt.close(painel_dashboard.fig)
+    return arquivos
+
+ARQUIVO_PLOTLYJS = 'plotly.min.js'
+
+def escrever_plotlyjs(pasta):
+    """
+    Grava o plotly.js local uma única vez na pasta (reutilizado por todos os HTMLs leves)
+    """
+    caminho = os.path.join(pasta, ARQUIVO_PLOTLYJS)
+    if not os.path.exists(caminho):
+        os.makedirs(pasta, exist_ok=True)
+        with tempfile.NamedTemporaryFile('w', dir=pasta, suffix='.tmp', delete=False, encoding='utf-8') as f:
+            f.write(get_plotlyjs())
+        os.chmod(f.name, 0o644)
+        os.replace(f.name, caminho)
+    return caminho
+
+def _referencia_plotlyjs(caminho_html, asset_plotlyjs):
+    """Caminho relativo do HTML até o plotly.js compartilhado (criado se faltar)"""
+    pasta = os.path.dirname(os.path.abspath(caminho_html))
+    asset = escrever_plotlyjs(os.path.dirname(os.path.abspath(asset_plotlyjs)) if asset_plotlyjs else pasta)
+    return os.path.relpath(asset, pasta).replace(os.sep, '/')
+
+def salvar_html(fig, caminho, modo_html='completo', asset_plotlyjs=None):
+    """
+    Salva uma figura Plotly em HTML
+
+    Args:
+        modo_html: 'completo' (embute o plotly.js, alguns MB por arquivo) ou
+                   'compartilhado' (referencia um plotly.min.js local - poucos kB, funciona offline)
+        asset_plotlyjs: plotly.min.js compartilhado (padrão: na pasta do HTML); ex. um único
+                        asset na pasta da campanha para os relatórios de todos os lotes
+    """
+    if modo_html == 'completo':
+        fig.write_html(caminho)
+    else:
+        fig.write_html(caminho, include_plotlyjs=_referencia_plotlyjs(caminho, asset_plotlyjs))
+
+def salvar_pagina_html(figuras, caminho, titulo="RELATÓRIO ENERGÉTICO - PRODUÇÃO DE SOFOROLIPÍDEOS",
+                       asset_plotlyjs=None):
+    """
+    Salva várias figuras Plotly numa única página HTML que referencia o plotly.js compartilhado
+
+    Args:
+        figuras: {titulo da seção: figura}
+        caminho: arquivo HTML
+        titulo: título da página
+        asset_plotlyjs: ver salvar_html
+    """
+    secoes = [f'<h2>{html.escape(nome)}</h2>\n' + fig.to_html(full_html=False, include_plotlyjs=False)
+              for nome, fig in figuras.items()]
+    pagina = (
+        '<!DOCTYPE html>\n<html>\n<head>\n<meta charset="utf-8" />\n'
+        f'<title>{html.escape(titulo)}</title>\n'
+        f'<script src="{_referencia_plotlyjs(caminho, asset_plotlyjs)}"></script>\n'
+        f'</head>\n<body style="font-family: sans-serif; background: {CORES["fundo"]}">\n'
+        f'<h1>{html.escape(titulo)}</h1>\n' + '\n'.join(secoes) + '\n</body>\n</html>\n'
+    )
+    with open(caminho, 'w', encoding='utf-8') as f:
+        f.write(pagina)
 
 def salvar_relatorio_completo(resultado_chiller, resultado_secador, equipamentos_atualizados, 
-                            energia_total, consumo_especifico, utilidades_fixas_total):
+                            energia_total, consumo_especifico, utilidades_fixas_total,
+                            pasta='.', modo_html='completo', asset_plotlyjs=None, perfil='impressao'):
     """
     Salva todos os gráficos com tratamento robusto de erros
+
+    modo_html: 'completo' (um HTML autocontido por figura), 'compartilhado' (HTMLs leves
+    com plotly.min.js local) ou 'pagina_unica' (relatorio_energetico.html com as duas figuras)
+    perfil: perfil de renderização das figuras matplotlib (ver PERFIS_RENDERIZACAO)
     """
     
     sucesso_count = 0
     erro_count = 0
+    figuras_html = {}
+    os.makedirs(pasta, exist_ok=True)
+    arquivo = lambda nome: os.path.join(pasta, nome)
     
     print("📊 Salvando gráficos...")
     
@@ -481,12 +807,15 @@ def salvar_relatorio_completo(resultado_chiller, resultado_secador, equipamentos
         )
         
         # Sempre salva HTML (nunca falha)
-        fig_dashboard.write_html("dashboard_energetico.html")
-        print("✅ dashboard_energetico.html")
-        sucesso_count += 1
+        if modo_html == 'pagina_unica':
+            figuras_html['Dashboard Energético'] = fig_dashboard
+        else:
+            salvar_html(fig_dashboard, arquivo("dashboard_energetico.html"), modo_html, asset_plotlyjs)
+            print("✅ dashboard_energetico.html")
+            sucesso_count += 1
         
         # Tenta salvar PNG
-        sucesso, metodo = tentar_salvar_imagem(fig_dashboard, "dashboard_energetico.png", 1200, 800)
+        sucesso, metodo = tentar_salvar_imagem(fig_dashboard, arquivo("dashboard_energetico.png"), 1200, 800)
         if sucesso:
             print(f"✅ dashboard_energetico.png ({metodo})")
             sucesso_count += 1
@@ -499,16 +828,20 @@ def salvar_relatorio_completo(resultado_chiller, resultado_secador, equipamentos
     
     # 2. Sankey (Plotly)
     try:
-        fig_sankey = criar_sankey_melhorado(resultado_chiller, resultado_secador, equipamentos_atualizados)
+        fig_sankey = criar_sankey_melhorado(resultado_chiller, resultado_secador, equipamentos_atualizados,
+                                            utilidades_fixas_total)
         fig_sankey = adicionar_anotacoes_sankey(fig_sankey)
 
         # Sempre salva HTML
-        fig_sankey.write_html("fluxo_energetico_sankey.html")
-        print("✅ fluxo_energetico_sankey.html")
-        sucesso_count += 1
+        if modo_html == 'pagina_unica':
+            figuras_html['Fluxo Energético'] = fig_sankey
+        else:
+            salvar_html(fig_sankey, arquivo("fluxo_energetico_sankey.html"), modo_html, asset_plotlyjs)
+            print("✅ fluxo_energetico_sankey.html")
+            sucesso_count += 1
         
         # Tenta salvar PNG
-        sucesso, metodo = tentar_salvar_imagem(fig_sankey, "fluxo_energetico_sankey.png", 1000, 600)
+        sucesso, metodo = tentar_salvar_imagem(fig_sankey, arquivo("fluxo_energetico_sankey.png"), 1000, 600)
         if sucesso:
             print(f"✅ fluxo_energetico_sankey.png ({metodo})")
             sucesso_count += 1
@@ -522,10 +855,9 @@ def salvar_relatorio_completo(resultado_chiller, resultado_secador, equipamentos
     # 3. Análise termodinâmica (Matplotlib)
     try:
         fig_termo = criar_comparativo_termodinamico(resultado_chiller, resultado_secador)
-        fig_termo.savefig("analise_termodinamica.png", dpi=300, bbox_inches='tight', 
-                         facecolor='white', edgecolor='none')
+        caminho = salvar_figura(fig_termo, arquivo("analise_termodinamica.png"), perfil)
         plt.close(fig_termo)
-        print("✅ analise_termodinamica.png")
+        print(f"✅ {os.path.basename(caminho)}")
         sucesso_count += 1
     except Exception as e:
         print(f"❌ Erro na análise termodinâmica: {e}")
@@ -537,15 +869,24 @@ def salvar_relatorio_completo(resultado_chiller, resultado_secador, equipamentos
             resultado_chiller, resultado_secador, equipamentos_atualizados,
             energia_total, consumo_especifico, utilidades_fixas_total
         )
-        fig_alt.savefig("dashboard_matplotlib.png", dpi=300, bbox_inches='tight', 
-                       facecolor='white', edgecolor='none')
+        caminho = salvar_figura(fig_alt, arquivo("dashboard_matplotlib.png"), perfil)
         plt.close(fig_alt)
-        print("✅ dashboard_matplotlib.png (fallback)")
+        print(f"✅ {os.path.basename(caminho)} (fallback)")
         sucesso_count += 1
     except Exception as e:
         print(f"❌ Erro no dashboard matplotlib: {e}")
         erro_count += 1
     
+    # Página única com as figuras Plotly
+    if modo_html == 'pagina_unica':
+        try:
+            salvar_pagina_html(figuras_html, arquivo("relatorio_energetico.html"), asset_plotlyjs=asset_plotlyjs)
+            print("✅ relatorio_energetico.html")
+            sucesso_count += len(figuras_html)
+        except Exception as e:
+            print(f"❌ Erro na página HTML: {e}")
+            erro_count += len(figuras_html)
+
     # Resumo
     total_arquivos = 6  # HTML x2 + PNG x4
     print(f"\n📈 Resumo: {sucesso_count}/{total_arquivos} arquivos salvos com sucesso")
@@ -556,9 +897,11 @@ def salvar_relatorio_completo(resultado_chiller, resultado_secador, equipamentos
     return sucesso_count, erro_count
 
 def gerar_visualizacoes_completas(resultado_chiller, resultado_secador, equipamentos_atualizados,
-                                 energia_total, consumo_especifico, utilidades_fixas_total):
+                                 energia_total, consumo_especifico, utilidades_fixas_total, **kwargs):
     """
     Função principal robusta que gera todas as visualizações
+
+    kwargs (pasta, modo_html, asset_plotlyjs, perfil) são repassados a salvar_relatorio_completo
     """
     print("\n🎨 GERANDO VISUALIZAÇÕES...")
     print("=" * 50)
@@ -566,7 +909,7 @@ def gerar_visualizacoes_completas(resultado_chiller, resultado_secador, equipame
     # Salvar arquivos com tratamento robusto
     sucesso, erro = salvar_relatorio_completo(
         resultado_chiller, resultado_secador, equipamentos_atualizados,
-        energia_total, consumo_especifico, utilidades_fixas_total
+        energia_total, consumo_especifico, utilidades_fixas_total, **kwargs
     )
     
     print("\n✨ Visualizações processadas!")